@@ -1,9 +1,19 @@
 import os
+import time
+import threading
+import bisect
+import hashlib
+import functools
 import pymysql
 import datetime
 import certifi
 from dotenv import load_dotenv
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request, jsonify, url_for, g
+from app.db_pool import ConnectionPool
+from app.cache import TTLCache, LRUCache
+from app.search_index import SearchIndex, SEARCH_FIELDS
+from app.vector_index import VectorIndex
+import metrics
 
 load_dotenv()
 
@@ -12,6 +22,118 @@ SUBCATEGORIES = [
     "과학일반", "보안/해킹", "컴퓨터", "게임/리뷰"
 ]
 ARTICLES_PER_PAGE = 10
+# /home 결과 캐시 유지 시간(초), 지나면 새 기사가 들어왔는지 MAX(id)로 확인
+HOME_CACHE_TTL = int(os.getenv("HOME_CACHE_TTL", 60))
+# 목록 전체 개수 캐시 시간(초) / 검색 색인에 새 기사를 반영하는 주기(초)
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", 300))
+SEARCH_REFRESH_INTERVAL = int(os.getenv("SEARCH_REFRESH_INTERVAL", 60))
+# 의미 검색/관련 기사용 벡터 색인 (파일 위치, 사용 차원 수, 결과 수)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(".cache", "vector_index"))
+VECTOR_INDEX_DIMS = int(os.getenv("VECTOR_INDEX_DIMS", 256))
+SEMANTIC_TOP_K = 50
+RELATED_ARTICLES = 5
+# 렌더링된 페이지/조회 결과 캐시 크기, data_version을 다시 읽는 주기(초)
+PAGE_CACHE_ENTRIES = int(os.getenv("PAGE_CACHE_ENTRIES", 512))
+PAGE_CACHE_BYTES = int(os.getenv("PAGE_CACHE_BYTES", 64 * 1024 * 1024))
+DATA_VERSION_TTL = int(os.getenv("DATA_VERSION_TTL", 10))
+# /metrics (Prometheus 텍스트 형식) 노출 여부
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+# 목록/기사 화면에서 쓰는 열만 조회 (임베딩 등 큰 열 제외, 표시용 값은 저장 시 계산됨)
+LIST_COLUMNS = (
+    "id, press, title, summary, subcategory, publish_time,"
+    " headline_score, relevance_percent, relevance_hue, stimulus_hue, outlet_count"
+)
+ARTICLE_COLUMNS = LIST_COLUMNS + ", link, journalist, canonical_hash"
+
+# 카테고리별 연관성 1위 / 자극성 1위 기사를 한 번에 뽑는 쿼리
+# publish_time 범위 조건으로 인덱스를 쓸 수 있게 함 (DATE(publish_time) = ... 대신)
+HOME_QUERY = """
+    SELECT id, title, summary, subcategory, rel_rank, stim_rank
+    FROM (
+        SELECT id, title, summary, subcategory,
+               ROW_NUMBER() OVER (PARTITION BY subcategory ORDER BY relevance_score DESC, id) AS rel_rank,
+               ROW_NUMBER() OVER (PARTITION BY subcategory ORDER BY headline_score DESC, id) AS stim_rank
+        FROM newsdata
+        WHERE publish_time >= %s AND publish_time < %s
+          AND subcategory IN ({placeholders})
+    ) ranked
+    WHERE rel_rank = 1 OR stim_rank = 1
+"""
+
+def total_pages_of(total, per_page):
+    return (total + per_page - 1) // per_page
+
+
+# 키셋 커서: "발행시각_id"
+def encode_cursor(article):
+    return f"{article['publish_time']}_{article['id']}"
+
+
+def parse_cursor(value):
+    if not value or "_" not in value:
+        return None
+    publish_time, _, article_id = value.rpartition("_")
+    if not article_id.isdigit():
+        return None
+    return publish_time, int(article_id)
+
+
+# 검색 결과(내림차순 정렬 키)에서 현재 페이지 부분만 잘라내기 (커서 위치는 이분 탐색)
+def slice_keys(keys, page, per_page, after=None, before=None, skip=0, last=False):
+    ascending = keys[::-1]
+    if after:
+        cursor = (str(after[0]), after[1])
+        start = len(keys) - bisect.bisect_left(ascending, cursor) + skip * per_page
+    elif before:
+        cursor = (str(before[0]), before[1])
+        end = len(keys) - bisect.bisect_right(ascending, cursor) - skip * per_page
+        start = max(end - per_page, 0)
+        return keys[start:max(end, 0)]
+    elif last:
+        start = (total_pages_of(len(keys), per_page) - 1) * per_page
+    else:
+        start = (page - 1) * per_page
+    return keys[max(start, 0):max(start, 0) + per_page]
+
+
+# 페이지 링크: 앞뒤 페이지는 현재 페이지 첫/마지막 기사 커서에서 몇 페이지 건너뛰는지로 표현
+# (의미 검색처럼 점수순 목록은 keyset=False로 페이지 번호만 사용)
+def build_page_links(current_page, total_pages, articles, base_args, keyset=True):
+    links = []
+    if total_pages <= 1:
+        return links
+
+    first = encode_cursor(articles[0]) if articles else None
+    last = encode_cursor(articles[-1]) if articles else None
+
+    def page_url(p):
+        args = dict(base_args, page=p)
+        if p == 1 or not keyset:
+            pass
+        elif p == total_pages:
+            args["last"] = 1
+        elif p > current_page and last:
+            args.update(after=last, skip=p - current_page - 1)
+        elif p < current_page and first:
+            args.update(before=first, skip=current_page - p - 1)
+        return url_for("index", **args)
+
+    start_page = ((current_page - 1) // 10) * 10 + 1
+    end_page = min(start_page + 9, total_pages)
+
+    if current_page > 1:
+        links.append({"label": "처음", "url": page_url(1)})
+    if start_page > 1:
+        links.append({"label": "«", "url": page_url(start_page - 1)})
+    for p in range(start_page, end_page + 1):
+        links.append({"label": p, "url": page_url(p), "current": p == current_page})
+    if end_page < total_pages:
+        links.append({"label": "»", "url": page_url(end_page + 1)})
+    if current_page < total_pages:
+        links.append({"label": "끝", "url": page_url(total_pages)})
+    return links
+
 
 def create_app():
     app = Flask(__name__)
@@ -25,7 +147,7 @@ def create_app():
             name, url = line.split(" : ", 1)
             press_logos[name.strip()] = url.strip()
 
-    def get_db_connection():
+    def connect():
         try:
             return pymysql.connect(
                 host=os.getenv("DB_HOST"),
@@ -39,92 +161,285 @@ def create_app():
             print(f"Database Connection Error: {e}")
             raise e
 
-
-    def get_articles_from_db(category, page, per_page=10, query=None, field=None):
-        conn = get_db_connection()
-        cur = conn.cursor(pymysql.cursors.DictCursor)
-        offset = (page - 1) * per_page
-
-        base_query = "SELECT * FROM newsdata"
-        count_query = "SELECT COUNT(*) FROM newsdata"
-        where_clauses = []
-        params = []
-
-        if category != "전체":
-            where_clauses.append("subcategory = %s")
-            params.append(category)
-
-        if query and field in ("title", "journalist", "summary", "press"):
-            where_clauses.append(f"{field} LIKE %s")
-            params.append(f"%{query}%")
-
-        where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-
-        final_query = f"{base_query}{where_sql} ORDER BY publish_time DESC LIMIT %s OFFSET %s"
-        final_count_query = f"{count_query}{where_sql}"
-
-        cur.execute(final_query, params + [per_page, offset])
-        articles = cur.fetchall()
-        cur.execute(final_count_query, params)
-        total_articles = cur.fetchone()['COUNT(*)']
-        cur.close()
-        conn.close()
-
-        for article in articles:
-            relevance = (article.get("relevance_score", 0) / 75) * 100
-            if relevance > 100:
-                relevance = 100
-            elif relevance < 0:
-                relevance = 0
-            article["relevance_score"] = int(relevance)
-            stimulus = article.get("headline_score", 0)
-            article["relevance_hue"] = 120 * ((relevance) / 100)
-            article["stimulus_hue"] = 120 - (stimulus / 10) * 120
+    # 요청마다 TLS 연결을 새로 맺지 않도록 커넥션 풀 공유 (커넥션은 첫 요청 때 만들어 fork에 안전)
+    pool = ConnectionPool(
+        connect,
+        min_size=int(os.getenv("DB_POOL_MIN", 1)),
+        max_size=int(os.getenv("DB_POOL_MAX", 10)),
+        max_lifetime=int(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+        wait_timeout=float(os.getenv("DB_POOL_WAIT_TIMEOUT", 5)),
+    )
+    app.extensions["db_pool"] = pool
+    get_db_connection = pool.connection
+
+
+    vector_index = VectorIndex(VECTOR_INDEX_DIR, get_db_connection, dims=VECTOR_INDEX_DIMS)
+
+    # 검색어 임베딩 (수집 스크립트와 같은 임베딩 모듈/캐시/OpenAI 클라이언트 사용, 클라이언트는 처음 쓸 때 생성)
+    def embed_query(text):
+        from embedding import get_embeddings, failed_rows
+        from openai_scheduler import get_client
+        vectors = get_embeddings(get_client(), [text])
+        return None if failed_rows(vectors)[0] else vectors[0]
+
+    def fetch_articles_by_ids(ids, columns=LIST_COLUMNS):
+        if not ids:
+            return []
+        with get_db_connection() as conn:
+            cur = conn.cursor(pymysql.cursors.DictCursor)
+            cur.execute(
+                f"SELECT {columns} FROM newsdata WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                ids,
+            )
+            by_id = {row["id"]: row for row in cur.fetchall()}
+            cur.close()
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    # 의미 검색: (고른 카테고리 안에서) 상위 SEMANTIC_TOP_K개를 유사도 순으로, 페이지 번호로 자름
+    def get_semantic_articles(category, page, per_page, query):
+        vector = embed_query(query)
+        if vector is None:
+            return [], 0
+        ids = [
+            doc_id
+            for doc_id, _ in vector_index.search(
+                vector, k=SEMANTIC_TOP_K, category=None if category == "전체" else category
+            )
+        ]
+        articles = fetch_articles_by_ids(ids)
+        total_articles = len(articles)
+        return articles[(page - 1) * per_page:page * per_page], total_articles
+
+    # 같은 근사 중복 묶음(canonical_hash)의 다른 언론사 기사
+    def get_same_story_articles(article):
+        if not article.get("canonical_hash") or (article.get("outlet_count") or 1) < 2:
+            return []
+        with get_db_connection() as conn:
+            cur = conn.cursor(pymysql.cursors.DictCursor)
+            cur.execute(
+                "SELECT id, title, press FROM newsdata WHERE canonical_hash = %s AND id <> %s ORDER BY id",
+                (article["canonical_hash"], article["id"]),
+            )
+            articles = list(cur.fetchall())
+            cur.close()
+        return articles
+
+    def get_related_articles(article_id):
+        ids = [doc_id for doc_id, _ in vector_index.related(article_id, k=RELATED_ARTICLES)]
+        return fetch_articles_by_ids(ids, "id, title, press")
+
+    # 페이지/조회 결과 캐시: 키에 data_version을 넣어 main.py/summary.py가 버전을 올리면 새로 만듦
+    # (예전 버전 항목은 LRU로 밀려남)
+    version_cache = TTLCache(DATA_VERSION_TTL)
+    page_cache = LRUCache(PAGE_CACHE_ENTRIES, PAGE_CACHE_BYTES)
+    result_cache = LRUCache(PAGE_CACHE_ENTRIES)
+
+    # {테이블: (version, updated_at)}, 테이블이 없으면(마이그레이션 004 전) 빈 dict → 캐시 안 함
+    def get_data_versions():
+        versions = version_cache.get("all")
+        if versions is None:
+            try:
+                with get_db_connection() as conn:
+                    cur = conn.cursor(pymysql.cursors.DictCursor)
+                    cur.execute("SELECT name, version, updated_at FROM data_version")
+                    versions = {row["name"]: (row["version"], row["updated_at"]) for row in cur.fetchall()}
+                    cur.close()
+            except pymysql.MySQLError as e:
+                print(f"Data Version Error: {e}")
+                versions = {}
+            version_cache.set("all", versions)
+        return versions
+
+    def cached_query(table, key, load):
+        stamp = get_data_versions().get(table)
+        if stamp is None:
+            return load()
+        key = (table, stamp[0]) + key
+        result = result_cache.get(key)
+        if result is None:
+            result = load()
+            result_cache.set(key, result)
+        return result
+
+    # 뷰 응답을 캐시하고 ETag/Last-Modified로 조건부 GET 처리
+    # 키: 경로+쿼리스트링, 테이블 버전, 오늘 날짜(/home 등 날짜 기준 화면이 자정에 바뀌도록)
+    def cached_page(table):
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                stamp = get_data_versions().get(table)
+                if stamp is None:
+                    return view(*args, **kwargs)
+                version, updated_at = stamp
+                key = (request.full_path, table, version, str(datetime.date.today()))
+                etag = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+                if etag in request.if_none_match:
+                    response = app.response_class(status=304)
+                    response.set_etag(etag)
+                    return response
+
+                cached = page_cache.get(key)
+                if cached is None:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    page_cache.set(key, (body, response.mimetype), size=len(body))
+                else:
+                    body, mimetype = cached
+                    response = app.response_class(body, mimetype=mimetype)
+
+                response.set_etag(etag)
+                response.last_modified = updated_at
+                # 브라우저는 저장해 두되 매번 ETag로 확인
+                response.cache_control.no_cache = True
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    count_cache = TTLCache(COUNT_CACHE_TTL)
+    search_index = SearchIndex(get_db_connection, refresh_interval=SEARCH_REFRESH_INTERVAL)
+    seen_versions = {}
+    seen_versions_lock = threading.Lock()
+
+    # 이 프로세스의 name 캐시가 마지막으로 본 뒤 newsdata 버전이 바뀌었으면 True
+    # 기사 수/홈 기사/검색 색인은 자체 TTL로 갱신하므로, 버전이 오르면 바로 맞춰야
+    # 버전을 키로 쓰는 페이지 캐시에 예전 값이 새 버전으로 굳지 않음
+    def newsdata_changed(name):
+        stamp = get_data_versions().get("newsdata")
+        version = stamp[0] if stamp else None
+        with seen_versions_lock:
+            changed = seen_versions.get(name, version) != version
+            seen_versions[name] = version
+        return changed
+
+    # 카테고리별 전체 기사 수 (COUNT_CACHE_TTL 동안, newsdata 버전이 바뀌기 전까지 재사용)
+    def count_articles(cur, category, where_sql, params):
+        if newsdata_changed("count"):
+            count_cache.clear()
+        total = count_cache.get(category)
+        if total is None:
+            cur.execute(f"SELECT COUNT(*) AS total FROM newsdata{where_sql}", params)
+            total = cur.fetchone()["total"]
+            count_cache.set(category, total)
+        return total
+
+    # 목록 조회: (publish_time, id) 기준 키셋 페이지네이션
+    # - after/before: 현재 페이지 마지막/첫 기사 커서, skip: 커서에서 건너뛸 페이지 수 (최대 한 블록)
+    # - last: 마지막 페이지, 커서가 없으면 page로 OFFSET 조회 (첫 페이지/예전 링크)
+    # - 검색어가 있으면 DB LIKE 대신 메모리 역색인에서 찾은 뒤 해당 id만 조회
+    def get_articles_from_db(category, page, per_page=10, query=None, field=None,
+                             after=None, before=None, skip=0, last=False):
+        if query and field in SEARCH_FIELDS:
+            if newsdata_changed("search"):
+                search_index.refresh(force=True)
+            keys = search_index.search(field, query, None if category == "전체" else category)
+            total_articles = len(keys)
+            page_keys = slice_keys(keys, page, per_page, after, before, skip, last)
+            articles = fetch_articles_by_ids([doc_id for _, doc_id in page_keys])
+        else:
+            where_clauses = []
+            params = []
+            if category != "전체":
+                where_clauses.append("subcategory = %s")
+                params.append(category)
+            where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+
+            with get_db_connection() as conn:
+                cur = conn.cursor(pymysql.cursors.DictCursor)
+                total_articles = count_articles(cur, category, where_sql, params)
+
+                order, reverse = "DESC", False
+                limit, offset = per_page, skip * per_page
+                cursor_clauses, cursor_params = [], []
+                if after:
+                    cursor_clauses.append("(publish_time < %s OR (publish_time = %s AND id < %s))")
+                    cursor_params = [after[0], after[0], after[1]]
+                elif before:
+                    cursor_clauses.append("(publish_time > %s OR (publish_time = %s AND id > %s))")
+                    cursor_params = [before[0], before[0], before[1]]
+                    order, reverse = "ASC", True
+                elif last:
+                    # 마지막 페이지는 오래된 순으로 남은 개수만큼 읽어 뒤집음
+                    order, reverse = "ASC", True
+                    limit = total_articles - (total_pages_of(total_articles, per_page) - 1) * per_page
+                    offset = 0
+                else:
+                    offset = (page - 1) * per_page
+
+                clauses = where_clauses + cursor_clauses
+                page_where = " WHERE " + " AND ".join(clauses) if clauses else ""
+                cur.execute(
+                    f"SELECT {LIST_COLUMNS} FROM newsdata{page_where}"
+                    f" ORDER BY publish_time {order}, id {order} LIMIT %s OFFSET %s",
+                    params + cursor_params + [max(limit, 0), offset],
+                )
+                articles = list(cur.fetchall())
+                cur.close()
+            if reverse:
+                articles.reverse()
 
         return articles, total_articles
 
     def get_article_by_id(article_id):
-        conn = get_db_connection()
-        cur = conn.cursor(pymysql.cursors.DictCursor)
-        cur.execute("SELECT * FROM newsdata WHERE id = %s", (article_id,))
-        article = cur.fetchone()
-        cur.close()
-        conn.close()
-        if article:
-            relevance = (article.get("relevance_score", 0) / 75) * 100
-            if relevance > 100:
-                relevance = 100
-            elif relevance < 0:
-                relevance = 0
-            article["relevance_score"] = int(relevance)
-            stimulus = article.get("headline_score", 0)
-            article["relevance_hue"] = 120 * ((relevance) / 100)
-            article["stimulus_hue"] = 120 - (stimulus / 10) * 120
+        with get_db_connection() as conn:
+            cur = conn.cursor(pymysql.cursors.DictCursor)
+            cur.execute(f"SELECT {ARTICLE_COLUMNS} FROM newsdata WHERE id = %s", (article_id,))
+            article = cur.fetchone()
+            cur.close()
         return article
     
-    def get_summary_from_db(): #데이터베이스에서 요약 가져오기 추가했습니다
-        conn = get_db_connection()
-        cur = conn.cursor(pymysql.cursors.DictCursor)
-        cur.execute("""
-            SELECT summary_date, summary
-            FROM summarydata
-            ORDER BY summary_date DESC
-        """)
-        summary_data = cur.fetchall()
-        cur.close()
-        conn.close()
-        return summary_data
+    # 요약 날짜 목록만 (본문 HTML은 읽지 않음)
+    def get_summary_dates():
+        def load():
+            with get_db_connection() as conn:
+                cur = conn.cursor(pymysql.cursors.DictCursor)
+                cur.execute("SELECT summary_date FROM summarydata ORDER BY summary_date DESC")
+                dates = [row["summary_date"] for row in cur.fetchall()]
+                cur.close()
+            return dates
+        return cached_query("summarydata", ("dates",), load)
+
+    def get_summary_from_db(date): #데이터베이스에서 요약 가져오기 추가했습니다
+        def load():
+            with get_db_connection() as conn:
+                cur = conn.cursor(pymysql.cursors.DictCursor)
+                cur.execute(
+                    "SELECT summary_date, summary FROM summarydata WHERE summary_date = %s",
+                    (str(date),),
+                )
+                summary = cur.fetchone()
+                cur.close()
+            return summary or {}
+        return cached_query("summarydata", ("summary", str(date)), load) or None
 
 
     @app.route("/")
+    @cached_page("newsdata")
     def index():
         category = request.args.get("category", SUBCATEGORIES[0])
         page = int(request.args.get("page", 1))
         query = request.args.get("query")
         field = request.args.get("field")
+        after = parse_cursor(request.args.get("after"))
+        before = parse_cursor(request.args.get("before"))
+        skip = max(int(request.args.get("skip", 0)), 0)
+        last = request.args.get("last") == "1"
+
+        semantic = bool(query) and field == "semantic"
+        if semantic:
+            articles, total_articles = get_semantic_articles(category, page, ARTICLES_PER_PAGE, query)
+        else:
+            articles, total_articles = get_articles_from_db(
+                category, page, ARTICLES_PER_PAGE, query, field,
+                after=after, before=before, skip=skip, last=last,
+            )
+        total_pages = total_pages_of(total_articles, ARTICLES_PER_PAGE)
 
-        articles, total_articles = get_articles_from_db(category, page, ARTICLES_PER_PAGE, query, field)
-        total_pages = (total_articles + ARTICLES_PER_PAGE - 1) // ARTICLES_PER_PAGE
+        base_args = {"category": category}
+        if query:
+            base_args.update(query=query, field=field)
+        page_links = build_page_links(page, total_pages, articles, base_args, keyset=not semantic)
 
         return render_template("index.html",
                                subcategories=SUBCATEGORIES,
@@ -132,77 +447,89 @@ def create_app():
                                selected_articles=enumerate(articles),
                                current_page=page,
                                total_pages=total_pages,
+                               page_links=page_links,
                                query=query,#query랑 field를 만들어 놓고 반환을 안했기 때문에 index.html에ㅐ서 주소필드에 적용하지 못함함
                                field=field,
                                press_logos=press_logos)
 
     @app.route("/article/<int:article_id>")
+    @cached_page("newsdata")
     def show_article(article_id):
         article = get_article_by_id(article_id)
         if article:
             return render_template("article.html",
                                    article=article,
+                                   same_story=get_same_story_articles(article),
+                                   related_articles=get_related_articles(article_id),
                                    subcategories=SUBCATEGORIES,
                                    selected_category="기사 보기")
         return "기사를 찾을 수 없습니다.", 404
     
     @app.route("/summary")
+    @cached_page("summarydata")
     def summary():
         date = request.args.get("date")
-        summary_data = get_summary_from_db()
+        summary_dates = get_summary_dates()
         selected_summary = None
         if date:
-            for item in summary_data:
-                if str(item["summary_date"]) == date:#flask 이슈;;
-                    selected_summary = item
-                    break
+            if date in {str(d) for d in summary_dates}:#flask 이슈;;
+                selected_summary = get_summary_from_db(date)
         else:
             # 기본적으로 가장 최신일자를 띄우도록 해놨음니다
-            if summary_data:
-                selected_summary = summary_data[0]
-                date = selected_summary["summary_date"]
+            if summary_dates:
+                date = summary_dates[0]
+                selected_summary = get_summary_from_db(date)
 
         return render_template("summary.html",
-                            summary_data=summary_data,
+                            summary_dates=summary_dates,
                             selected_summary=selected_summary,
                             selected_date=date,                      
+                            # summary.py --incremental이 갱신하는 오늘 중간 리포트
+                            today_so_far=str(date) == str(datetime.date.today()),
                             subcategories=SUBCATEGORIES,
                             selected_category="어제 요약"
                             )
 
+    home_cache = TTLCache(HOME_CACHE_TTL)
+
+    def query_home_articles(cur, day):
+        categories = SUBCATEGORIES[1:9]
+        cur.execute(
+            HOME_QUERY.format(placeholders=", ".join(["%s"] * len(categories))),
+            [str(day), str(day + datetime.timedelta(days=1))] + categories,
+        )
+        rows = cur.fetchall()
+
+        home_articles = {cat: [] for cat in categories}
+        # 연관성 1위 먼저, 자극성 1위가 다른 기사면 그 뒤에
+        for rank_key in ("rel_rank", "stim_rank"):
+            for row in rows:
+                if row[rank_key] == 1 and row not in home_articles[row["subcategory"]]:
+                    home_articles[row["subcategory"]].append(row)
+        return home_articles
+
+    # TTL 안이고 newsdata 버전이 그대로면 쿼리 없이 재사용
+    # (새 기사 저장/upsert는 data_version을 올리므로 버전이 바뀌면 TTL과 상관없이 다시 조회)
+    def get_home_articles(day):
+        if newsdata_changed("home"):
+            home_cache.clear()
+        cached = home_cache.get(day)
+        if cached is not None:
+            return cached
+
+        with get_db_connection() as conn:
+            cur = conn.cursor(pymysql.cursors.DictCursor)
+            home_articles = query_home_articles(cur, day)
+            cur.close()
+
+        home_cache.set(day, home_articles)
+        return home_articles
+
     @app.route("/home")
+    @cached_page("newsdata")
     def home():
-        conn = get_db_connection()
-        cur = conn.cursor(pymysql.cursors.DictCursor)
-
-        home_articles = {}
         today = datetime.datetime.now().date()
-
-        for cat in SUBCATEGORIES[1:9]:
-            cur.execute("""
-                SELECT * FROM newsdata 
-                WHERE subcategory = %s AND DATE(publish_time) = %s
-                ORDER BY relevance_score DESC LIMIT 1
-            """, (cat, today))
-            relevance_top = cur.fetchone()
-
-            cur.execute("""
-                SELECT * FROM newsdata 
-                WHERE subcategory = %s AND DATE(publish_time) = %s
-                ORDER BY headline_score DESC LIMIT 1
-            """, (cat, today))
-            stimulus_top = cur.fetchone()
-
-            articles = []
-            if relevance_top:
-                articles.append(relevance_top)
-            if stimulus_top and (not relevance_top or stimulus_top["id"] != relevance_top["id"]):
-                articles.append(stimulus_top)
-
-            home_articles[cat] = articles
-
-        cur.close()
-        conn.close()
+        home_articles = get_home_articles(today)
 
         return render_template("home.html",
                             subcategories=SUBCATEGORIES,
@@ -210,4 +537,32 @@ def create_app():
                             home_articles=home_articles)
 
 
+    @app.route("/health/db-pool")
+    def db_pool_stats():
+        return jsonify(pool.stats())
+
+    @app.route("/health/cache")
+    def cache_stats():
+        return jsonify({"pages": page_cache.stats(), "results": result_cache.stats()})
+
+    if METRICS_ENABLED:
+        # 엔드포인트별 응답 시간 / 상태 코드별 응답 수 (임베딩·OpenAI 호출 지표도 같은 레지스트리에 쌓임)
+        @app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            started = g.pop("request_started", None)
+            if started is not None and request.endpoint != "prometheus_metrics":
+                endpoint = request.endpoint or "unknown"
+                metrics.registry.observe("http_request", time.perf_counter() - started, endpoint=endpoint)
+                metrics.count("http_responses", endpoint=endpoint, status=response.status_code)
+            return response
+
+        @app.route("/metrics")
+        def prometheus_metrics():
+            return Response(metrics.registry.prometheus(), mimetype="text/plain; version=0.0.4")
+
+
     return app
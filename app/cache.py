@@ -0,0 +1,76 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    # 프로세스 내부 TTL 캐시 (키별로 값과 저장 시각 보관)
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    # 만료 여부와 상관없이 (값, 만료 여부) 반환, 없으면 (None, True)
+    def peek(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None, True
+        value, stored_at = entry
+        return value, time.monotonic() - stored_at > self.ttl
+
+    def get(self, key):
+        value, expired = self.peek(key)
+        return None if expired else value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LRUCache:
+    # 크기 제한 LRU 캐시 (항목 수 max_entries, 값 크기 합 max_bytes 중 하나라도 넘으면 오래 안 쓴 것부터 버림)
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # 키 → (값, 크기)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.metrics["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.metrics["hits"] += 1
+            return entry[0]
+
+    def set(self, key, value, size=0):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.metrics["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes, **self.metrics}
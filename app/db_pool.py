@@ -0,0 +1,152 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    # 스레드 안전 DB 커넥션 풀
+    # - connect(): 새 커넥션을 만드는 함수
+    # - min_size개는 첫 대여 때 미리 만들고, 최대 max_size개까지 늘림
+    # - 빌려줄 때 ping으로 상태 확인, max_lifetime(초)이 지난 커넥션은 새로 만듦
+    # - 모두 사용 중이면 wait_timeout(초)까지 기다린 뒤 PoolTimeout
+    # - gunicorn 등에서 fork된 경우 부모의 커넥션(소켓)은 버리고 자식에서 새로 만듦
+    def __init__(self, connect, min_size=1, max_size=10, max_lifetime=1800, wait_timeout=5):
+        if min_size > max_size:
+            raise ValueError("min_size는 max_size보다 클 수 없습니다")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._reset()
+
+    # 지표와 상태 초기화 (생성 시 / fork 후 자식 프로세스에서)
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = []  # (커넥션, 생성 시각)
+        self._in_use = 0
+        self._initialized = False
+        self.metrics = {
+            "creates": 0,
+            "closes": 0,
+            "borrows": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+        }
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            # 부모와 공유하는 소켓이므로 close()(QUIT 전송) 없이 참조만 버림
+            self._cond = threading.Condition()
+            self._reset()
+
+    def _create(self):
+        conn = self._connect()
+        self.metrics["creates"] += 1
+        return conn, time.monotonic()
+
+    def _discard(self, conn):
+        self.metrics["closes"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn, created_at):
+        if time.monotonic() - created_at > self.max_lifetime:
+            return False
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            self.metrics["health_check_failures"] += 1
+            return False
+
+    def _acquire(self):
+        self._check_fork()
+        with self._cond:
+            if not self._initialized:
+                self._initialized = True
+                for _ in range(self.min_size - len(self._idle) - self._in_use):
+                    self._idle.append(self._create())
+
+            deadline = None
+            while not self._idle and self._in_use >= self.max_size:
+                if deadline is None:
+                    self.metrics["waits"] += 1
+                    deadline = time.monotonic() + self.wait_timeout
+                    started = time.monotonic()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.metrics["timeouts"] += 1
+                    raise PoolTimeout(f"{self.wait_timeout}초 동안 빈 DB 커넥션이 없습니다")
+                self._cond.wait(remaining)
+            if deadline is not None:
+                self.metrics["wait_seconds"] += time.monotonic() - started
+
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self.metrics["borrows"] += 1
+
+        # 네트워크 작업(ping, 연결)은 잠금 밖에서
+        try:
+            if entry is not None:
+                conn, created_at = entry
+                if self._healthy(conn, created_at):
+                    return entry
+                self._discard(conn)
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, entry):
+        conn, created_at = entry
+        broken = False
+        try:
+            # 읽기 스냅샷을 끝내 다음 대여 때 최신 데이터를 보도록
+            conn.rollback()
+        except Exception:
+            broken = True
+        if broken or self._pid != os.getpid():
+            self._discard(conn)
+            entry = None
+        with self._cond:
+            self._in_use -= 1
+            if entry is not None:
+                self._idle.append(entry)
+            self._cond.notify()
+
+    # 예외가 나도 반납 시 rollback이 성공하면 재사용, 실패하면 버림
+    @contextmanager
+    def connection(self):
+        entry = self._acquire()
+        try:
+            yield entry[0]
+        finally:
+            self._release(entry)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                **self.metrics,
+            }
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
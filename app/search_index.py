@@ -0,0 +1,134 @@
+import time
+import threading
+from datetime import timedelta
+import numpy as np
+import pymysql
+
+SEARCH_FIELDS = ("title", "journalist", "summary", "press")
+# 한 번에 읽어 오는 행 수
+LOAD_BATCH = 5000
+# 변경분을 읽을 때 마지막 updated_at보다 이만큼(초) 앞에서부터 다시 읽음
+# (늦게 커밋된 행의 updated_at이 이미 읽은 시각보다 앞설 수 있음, 다시 읽어도 결과는 같음)
+REFRESH_OVERLAP = 300
+
+
+def _bigrams(text):
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    # newsdata 제목/요약/기자/언론사를 글자 2-gram 역색인으로 들고 있는 검색기
+    # - 한국어처럼 띄어쓰기와 무관한 부분 일치 검색(기존 LIKE '%q%'와 같은 결과)
+    # - 2-gram 후보를 교집합으로 줄인 뒤 원문에 실제로 포함되는지 확인
+    # - 처음에는 전체를 id 순으로 읽고, 이후 refresh()는 updated_at이 바뀐 행만 다시 읽음
+    #   (ON DUPLICATE KEY UPDATE로 요약/카테고리가 바뀐 기사도 반영)
+    # - 바뀐 행은 새로 생긴 2-gram만 추가, 사라진 2-gram의 id는 남지만 원문 확인에서 걸러짐
+    def __init__(self, get_db_connection, refresh_interval=60):
+        self._get_db_connection = get_db_connection
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._updated_at = None
+        self._checked_at = None
+        self._keys = {}  # id → (publish_time, id) 정렬 키
+        self._subcategories = {}  # id → subcategory
+        self._texts = {f: {} for f in SEARCH_FIELDS}  # 필드 → id → 소문자 원문
+        self._postings = {f: {} for f in SEARCH_FIELDS}  # 필드 → 2-gram → 정렬된 id 배열
+        self._pending = {f: {} for f in SEARCH_FIELDS}  # 아직 배열로 합치지 않은 id
+
+    def _add(self, row):
+        doc_id = row["id"]
+        self._keys[doc_id] = (str(row["publish_time"]), doc_id)
+        self._subcategories[doc_id] = row["subcategory"]
+        if self._updated_at is None or row["updated_at"] > self._updated_at:
+            self._updated_at = row["updated_at"]
+        for field in SEARCH_FIELDS:
+            text = (row[field] or "").lower()
+            old = self._texts[field].get(doc_id)
+            if old == text:
+                continue
+            self._texts[field][doc_id] = text
+            pending = self._pending[field]
+            # 게시 목록에 같은 id가 두 번 들어가지 않도록 예전 원문에 없던 2-gram만 추가
+            for gram in _bigrams(text) - (_bigrams(old) if old else set()):
+                pending.setdefault(gram, []).append(doc_id)
+
+    def _merge_pending(self):
+        for field in SEARCH_FIELDS:
+            postings = self._postings[field]
+            for gram, ids in self._pending[field].items():
+                new = np.asarray(ids, dtype=np.int64)
+                old = postings.get(gram)
+                postings[gram] = new if old is None else np.concatenate([old, new])
+            self._pending[field] = {}
+
+    # refresh_interval이 지났으면 새로 들어오거나 바뀐 행을 색인에 반영
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and self._checked_at is not None
+                and now - self._checked_at < self.refresh_interval
+            ):
+                return
+            columns = f"id, publish_time, subcategory, updated_at, {', '.join(SEARCH_FIELDS)}"
+            with self._get_db_connection() as conn:
+                cur = conn.cursor(pymysql.cursors.DictCursor)
+                if self._updated_at is None:
+                    last_id = 0
+                    while True:
+                        cur.execute(
+                            f"SELECT {columns} FROM newsdata WHERE id > %s ORDER BY id LIMIT %s",
+                            (last_id, LOAD_BATCH),
+                        )
+                        rows = cur.fetchall()
+                        for row in rows:
+                            self._add(row)
+                        if rows:
+                            last_id = rows[-1]["id"]
+                        if len(rows) < LOAD_BATCH:
+                            break
+                else:
+                    cur.execute(
+                        f"SELECT {columns} FROM newsdata WHERE updated_at >= %s",
+                        (self._updated_at - timedelta(seconds=REFRESH_OVERLAP),),
+                    )
+                    for row in cur.fetchall():
+                        self._add(row)
+                cur.close()
+            self._merge_pending()
+            self._checked_at = now
+
+    # 검색 → (publish_time, id) 내림차순 정렬 키 목록
+    def search(self, field, query, category=None):
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"검색할 수 없는 필드: {field}")
+        self.refresh()
+        query = query.lower()
+
+        with self._lock:
+            texts = self._texts[field]
+            grams = _bigrams(query)
+            if grams:
+                lists = [self._postings[field].get(g) for g in grams]
+                if any(ids is None for ids in lists):
+                    return []
+                lists.sort(key=len)
+                candidates = lists[0]
+                for ids in lists[1:]:
+                    candidates = np.intersect1d(candidates, ids, assume_unique=True)
+                    if not len(candidates):
+                        return []
+                candidates = candidates.tolist()
+            else:
+                # 한 글자 검색은 후보를 줄일 수 없으므로 전체 확인
+                candidates = texts.keys()
+
+            keys = [
+                self._keys[doc_id]
+                for doc_id in candidates
+                if query in texts[doc_id]
+                and (category is None or self._subcategories[doc_id] == category)
+            ]
+        keys.sort(reverse=True)
+        return keys
@@ -0,0 +1,387 @@
+import os
+import json
+import time
+import shutil
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pymysql
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 워커 간 잠금 없이 동작
+    fcntl = None
+
+# 색인에 쓰는 앞쪽 차원 수 (text-embedding-3 계열은 앞부분만 잘라 다시 정규화해도 검색 품질 유지)
+DEFAULT_DIMS = 256
+# 검색 한 번은 벡터를 읽는 메모리 대역폭 한계라 시간이 (읽는 행 수 × 차원 수)에 비례
+# (100k건 256차원을 모두 읽으면 1코어에서 약 12ms) → 행이 IVF_MIN_ROWS 이상이면 IVF로 일부 목록만 읽음
+# - 벡터를 IVF_LISTS개 중심(구면 k-means)으로 나누고, 질의와 가까운 중심 IVF_PROBES개의 목록만 곱함
+# - 그보다 작은 범위(작은 색인, 카테고리 하나)는 모두 곱하는 정확한 검색
+# (시간/재현율 → python -m benchmarks.run --only vector)
+IVF_MIN_ROWS = 20000
+IVF_LISTS = 256
+IVF_PROBES = 48
+# k-means 학습에 쓰는 목록당 표본 수와 반복 횟수
+IVF_TRAIN_PER_LIST = 40
+IVF_TRAIN_ITERATIONS = 10
+# 학습 때보다 행이 이 배수 이상 늘면 중심을 다시 학습
+IVF_RETRAIN_GROWTH = 2
+# 한 번에 곱하는 행 수
+SEARCH_BLOCK = 32768
+LOAD_BATCH = 2000
+# 변경분을 읽을 때 마지막 updated_at보다 이만큼(초) 앞에서부터 다시 읽음 (늦게 커밋된 행 대비)
+REFRESH_OVERLAP = 300
+# meta.json 형식 (바뀌면 색인을 처음부터 다시 만듦)
+META_FORMAT = 3
+# 지금 쓰는 버전 폴더 이름을 담은 파일 (이 파일 하나를 원자적으로 바꿔 새 색인을 공개)
+CURRENT = "CURRENT"
+
+
+def reduce_vectors(vectors, dims):
+    vectors = np.asarray(vectors, dtype=np.float32)[..., :dims]
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+# 가장 가까운 중심 번호 (블록 단위로 곱해 메모리 제한)
+def assign_lists(vectors, centroids):
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), SEARCH_BLOCK):
+        labels[start : start + SEARCH_BLOCK] = np.argmax(vectors[start : start + SEARCH_BLOCK] @ centroids.T, axis=1)
+    return labels
+
+
+# 구면 k-means (정규화된 벡터 표본으로 중심 lists개 학습, 빈 목록은 이전 중심 유지)
+def train_centroids(vectors, lists, seed=0):
+    rng = np.random.default_rng(seed)
+    n = min(len(vectors), lists * IVF_TRAIN_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), n, replace=False))])
+    centroids = sample[rng.choice(n, lists, replace=False)].copy()
+    for _ in range(IVF_TRAIN_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        filled = np.bincount(labels, minlength=lists) > 0
+        centroids[filled] = reduce_vectors(sums[filled], centroids.shape[1])
+    return centroids
+
+
+class VectorIndex:
+    # newsdata.embedding을 파일(vectors.npy/ids.npy)로 내려 mmap으로 여는 벡터 색인
+    # - 여러 gunicorn 워커가 같은 파일을 mmap하므로 페이지 캐시 한 벌을 공유
+    # - 행은 (세부 카테고리, IVF 목록, id) 순으로 저장하고 offsets.npy에 [카테고리, 목록]별 시작 위치를 둠
+    #   → 카테고리를 고른 검색은 그 카테고리 범위만 곱하고, 결과도 그 카테고리에서 k개를 채움
+    # - refresh()는 updated_at이 바뀐 행(새 기사, 임베딩/카테고리가 바뀐 기사)만 DB에서 읽어 합친 뒤
+    #   새 버전 폴더에 모두 쓰고 CURRENT 파일을 바꿔 공개 (읽는 쪽은 항상 한 버전의 파일만 봄)
+    # - 다른 워커가 색인을 바꾸면 CURRENT를 보고 다시 염
+    def __init__(self, directory, get_db_connection, dims=DEFAULT_DIMS, refresh_interval=300):
+        self.directory = directory
+        self.dims = dims
+        self.refresh_interval = refresh_interval
+        self._get_db_connection = get_db_connection
+        self._lock = threading.Lock()
+        self._vectors = np.empty((0, dims), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros((0, 2), dtype=np.int64)
+        self._centroids = np.empty((0, dims), dtype=np.float32)
+        self._categories = {}
+        self._positions = {}
+        self._meta = {"format": META_FORMAT, "updated_at": None, "count": 0, "dims": dims,
+                      "categories": [], "trained_count": 0}
+        self._version = None
+        self._loaded_stat = None
+        self._checked_at = None
+        self._refreshing = None  # (pid, 스레드)
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, *names):
+        return os.path.join(self.directory, *names)
+
+    def _load(self):
+        try:
+            st = os.stat(self._path(CURRENT))
+        except OSError:
+            return
+        if (st.st_ino, st.st_mtime_ns) == self._loaded_stat:
+            return
+        try:
+            with open(self._path(CURRENT), encoding="utf-8") as f:
+                version = f.read().strip()
+            if version == self._version:
+                self._loaded_stat = (st.st_ino, st.st_mtime_ns)
+                return
+            with open(self._path(version, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            # 차원 수나 파일 형식이 다르면 무시 → 다음 refresh에서 처음부터 다시 만듦
+            if meta.get("dims") != self.dims or meta.get("format") != META_FORMAT:
+                return
+            # memmap 하위 클래스 대신 일반 배열 뷰 (조각을 많이 자를 때 더 가벼움)
+            vectors = np.asarray(np.load(self._path(version, "vectors.npy"), mmap_mode="r"))
+            ids = np.asarray(np.load(self._path(version, "ids.npy"), mmap_mode="r"))
+            offsets = np.load(self._path(version, "offsets.npy"))
+            centroids = np.load(self._path(version, "centroids.npy"))
+        except (OSError, ValueError) as e:
+            # 지운 지 오래된 버전을 읽으려 했거나 파일이 깨짐 → 지금 색인을 계속 씀
+            print(f"Vector Index Load Error: {e}")
+            return
+        problem = self._check(meta, vectors, ids, offsets, centroids)
+        if problem:
+            print(f"Vector Index Load Error: {version} {problem}")
+            return
+        positions = {int(doc_id): i for i, doc_id in enumerate(ids)}
+        categories = {name: code for code, name in enumerate(meta["categories"])}
+        with self._lock:
+            self._vectors, self._ids, self._offsets, self._centroids = vectors, ids, offsets, centroids
+            self._categories, self._positions, self._meta = categories, positions, meta
+            self._version = version
+            self._loaded_stat = (st.st_ino, st.st_mtime_ns)
+
+    # 한 버전의 파일끼리 맞는지 (행 수, 차원, [카테고리, 목록] 범위)
+    def _check(self, meta, vectors, ids, offsets, centroids):
+        n = len(ids)
+        if vectors.ndim != 2 or vectors.shape != (n, self.dims) or meta.get("count") != n:
+            return f"행 수/차원이 맞지 않음 (vectors {vectors.shape}, ids {n}, meta {meta.get('count')})"
+        lists = max(len(centroids), 1)
+        if offsets.shape != (len(meta["categories"]), lists + 1):
+            return f"offsets 크기가 맞지 않음 {offsets.shape}"
+        if offsets.size and (offsets[0, 0] != 0 or offsets[-1, -1] != n or np.any(np.diff(offsets.ravel()) < 0)):
+            return "offsets 범위가 맞지 않음"
+        if not offsets.size and n:
+            return "offsets 없음"
+        return None
+
+    # 행별 (카테고리 이름, IVF 목록 번호) (offsets에서 복원)
+    def _row_labels(self):
+        names = np.empty(len(self._ids), dtype=object)
+        lists = np.zeros(len(self._ids), dtype=np.int64)
+        for name, code in self._categories.items():
+            bounds = self._offsets[code]
+            names[bounds[0] : bounds[-1]] = name
+            for label in range(len(bounds) - 1):
+                lists[bounds[label] : bounds[label + 1]] = label
+        return names, lists
+
+    # since가 없으면 전체(id 순), 있으면 updated_at이 since - REFRESH_OVERLAP 이후인 행
+    # → (ids, 카테고리, 벡터, 가장 늦은 updated_at)
+    def _fetch_rows(self, since):
+        ids, categories, vectors, newest = [], [], [], since
+        with self._get_db_connection() as conn:
+            cur = conn.cursor(pymysql.cursors.DictCursor)
+            last_id = 0
+            while True:
+                if since is None:
+                    cur.execute(
+                        """
+                        SELECT id, subcategory, embedding, updated_at FROM newsdata
+                        WHERE id > %s AND embedding IS NOT NULL
+                        ORDER BY id LIMIT %s
+                        """,
+                        (last_id, LOAD_BATCH),
+                    )
+                else:
+                    cur.execute(
+                        """
+                        SELECT id, subcategory, embedding, updated_at FROM newsdata
+                        WHERE updated_at >= %s AND id > %s AND embedding IS NOT NULL
+                        ORDER BY id LIMIT %s
+                        """,
+                        (since - timedelta(seconds=REFRESH_OVERLAP), last_id, LOAD_BATCH),
+                    )
+                rows = cur.fetchall()
+                for row in rows:
+                    ids.append(row["id"])
+                    categories.append(row["subcategory"] or "")
+                    vectors.append(np.frombuffer(row["embedding"], dtype="<f4"))
+                    if newest is None or row["updated_at"] > newest:
+                        newest = row["updated_at"]
+                if rows:
+                    last_id = rows[-1]["id"]
+                if len(rows) < LOAD_BATCH:
+                    break
+            cur.close()
+        return ids, categories, vectors, newest
+
+    # 행 전체로 새 버전을 만들어 공개 (lists: 행별 IVF 목록, 중심을 새로 학습하면 다시 배정)
+    def _build(self, ids, categories, vectors, lists, updated_at):
+        centroids, trained = self._centroids, self._meta["trained_count"]
+        if len(ids) < IVF_MIN_ROWS:
+            centroids, trained = np.empty((0, self.dims), dtype=np.float32), 0
+        elif not trained or len(ids) >= trained * IVF_RETRAIN_GROWTH:
+            centroids, trained = train_centroids(vectors, IVF_LISTS), len(ids)
+            lists = assign_lists(vectors, centroids)
+        if not len(centroids):
+            lists = np.zeros(len(ids), dtype=np.int64)
+
+        names, codes = np.unique(categories, return_inverse=True)
+        order = np.lexsort((ids, lists, codes))
+        ids, vectors = ids[order], vectors[order]
+        n_lists = max(len(centroids), 1)
+        keys = codes[order] * n_lists + lists[order]
+        offsets = np.searchsorted(keys, np.arange(len(names) * n_lists + 1)).astype(np.int64)
+        # [카테고리, 목록] 시작 위치 (카테고리 c의 끝 = 카테고리 c+1의 시작)
+        offsets = np.concatenate([offsets[:-1].reshape(len(names), n_lists), offsets[n_lists::n_lists, None]], axis=1)
+        meta = {
+            "format": META_FORMAT,
+            "updated_at": updated_at,
+            "count": len(ids),
+            "dims": self.dims,
+            "categories": [str(name) for name in names],
+            "trained_count": trained,
+        }
+        self._publish(np.ascontiguousarray(vectors), ids, offsets, centroids, meta)
+
+    def _publish(self, vectors, ids, offsets, centroids, meta):
+        # 새 버전 폴더에 모두 쓴 뒤 CURRENT만 os.replace로 교체
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        os.makedirs(self._path(version))
+        for name, arr in (("vectors.npy", vectors), ("ids.npy", ids), ("offsets.npy", offsets),
+                          ("centroids.npy", centroids)):
+            with open(self._path(version, name), "wb") as f:
+                np.save(f, arr)
+        with open(self._path(version, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        tmp = self._path(f".{CURRENT}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, self._path(CURRENT))
+        # 바로 전 버전은 남김 (CURRENT를 막 읽은 워커가 아직 열고 있을 수 있음, 이미 연 mmap은 지워도 유지)
+        for name in os.listdir(self.directory):
+            if name.startswith("v") and name not in (version, self._version) and os.path.isdir(self._path(name)):
+                shutil.rmtree(self._path(name), ignore_errors=True)
+        # 예전 형식(폴더 바로 아래 파일) 정리
+        for name in ("vectors.npy", "ids.npy", "meta.json"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+    # 바뀐 행을 반영 (파일 잠금으로 워커 사이에서 한 번만 작업)
+    def refresh(self):
+        with open(self._path(".lock"), "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._load()
+                since = self._meta["updated_at"]
+                new_ids, new_categories, new_vectors, newest = self._fetch_rows(
+                    datetime.fromisoformat(since) if since else None
+                )
+                if not new_ids:
+                    return
+                reduced = reduce_vectors(np.vstack(new_vectors), self.dims)
+                old_ids, old_vectors = np.asarray(self._ids), np.asarray(self._vectors)
+                old_categories, old_lists = self._row_labels()
+
+                # 겹쳐 읽은 구간에서 그대로인 행은 건너뜀
+                changed = [
+                    j
+                    for j, doc_id in enumerate(new_ids)
+                    if (pos := self._positions.get(doc_id)) is None
+                    or old_categories[pos] != new_categories[j]
+                    or not np.array_equal(old_vectors[pos], reduced[j])
+                ]
+                if not changed:
+                    return
+                changed_ids = np.asarray([new_ids[j] for j in changed], dtype=np.int64)
+                keep = ~np.isin(old_ids, changed_ids)
+                new_lists = (
+                    assign_lists(reduced[changed], self._centroids)
+                    if len(self._centroids)
+                    else np.zeros(len(changed), dtype=np.int64)
+                )
+                self._build(
+                    np.concatenate([old_ids[keep], changed_ids]),
+                    np.concatenate(
+                        [old_categories[keep].astype(str), np.asarray([new_categories[j] for j in changed], dtype=str)]
+                    ),
+                    np.concatenate([old_vectors[keep], reduced[changed]]),
+                    np.concatenate([old_lists[keep], new_lists]),
+                    str(newest),
+                )
+                self._load()
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # refresh_interval마다 백그라운드 스레드에서 refresh (요청은 기다리지 않고 현재 색인 사용)
+    def maybe_refresh(self):
+        self._load()
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return
+            running = self._refreshing
+            if running and running[0] == os.getpid() and running[1].is_alive():
+                return
+            self._checked_at = now
+            thread = threading.Thread(target=self._refresh_quietly, daemon=True)
+            self._refreshing = (os.getpid(), thread)
+        thread.start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Vector Index Refresh Error: {e}")
+
+    def __len__(self):
+        return len(self._ids)
+
+    # 정규화된 질의 벡터와 내적이 큰 순서로 (id, 점수) k개, category를 주면 그 카테고리 안에서만
+    def search(self, query_vector, k=10, exclude=(), category=None):
+        self.maybe_refresh()
+        with self._lock:
+            vectors, ids, offsets, centroids = self._vectors, self._ids, self._offsets, self._centroids
+            if category is None:
+                codes = np.arange(len(offsets))
+            elif category in self._categories:
+                codes = np.asarray([self._categories[category]])
+            else:
+                return []
+        if not len(ids) or not len(codes):
+            return []
+        query = reduce_vectors(query_vector, self.dims)
+        want = k + len(exclude)
+
+        # 읽을 행 범위: 범위가 작으면 카테고리 전체, 크면 질의와 가까운 IVF 목록만
+        bounds = offsets[codes]
+        if len(centroids) and int((bounds[:, -1] - bounds[:, 0]).sum()) >= IVF_MIN_ROWS:
+            probes = np.argpartition(centroids @ query, -IVF_PROBES)[-IVF_PROBES:]
+            starts, ends = bounds[:, probes].ravel(), bounds[:, probes + 1].ravel()
+        else:
+            starts, ends = bounds[:, 0], bounds[:, -1]
+
+        parts, part_starts = [], []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            for block in range(start, end, SEARCH_BLOCK):
+                parts.append(vectors[block : min(block + SEARCH_BLOCK, end)] @ query)
+                part_starts.append(block)
+        if not parts:
+            return []
+        scores = np.concatenate(parts)
+        top = np.argpartition(scores, -want)[-want:] if len(scores) > want else np.arange(len(scores))
+        # 이어 붙인 점수 위치 → 원래 행 번호
+        cuts = np.cumsum([0] + [len(part) for part in parts])
+        part = np.searchsorted(cuts, top, side="right") - 1
+        scores, rows = scores[top], np.asarray(part_starts)[part] + top - cuts[part]
+
+        results = []
+        for i in np.argsort(-scores):
+            doc_id = int(ids[rows[i]])
+            if doc_id in exclude:
+                continue
+            results.append((doc_id, float(scores[i])))
+            if len(results) >= k:
+                break
+        return results
+
+    # 색인에 있는 기사와 비슷한 기사
+    def related(self, article_id, k=5):
+        self.maybe_refresh()
+        with self._lock:
+            pos = self._positions.get(article_id)
+            vectors = self._vectors
+        if pos is None:
+            return []
+        return self.search(np.asarray(vectors[pos]), k=k, exclude={article_id})
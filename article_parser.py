@@ -0,0 +1,244 @@
+import os
+import time
+import argparse
+from html.parser import HTMLParser
+
+# 기사 페이지에서 읽는 부분 (태그, class 또는 id)
+PUBLISH_TIME = ("span", "media_end_head_info_datestamp_time")
+JOURNALIST = ("em", "media_end_head_journalist_name")
+PRESS = ("span", "media_end_head_top_logo_text")
+CONTENT_ID = "newsct_article"
+
+# get_text()에 들어가지 않는 태그 (BeautifulSoup도 이 안의 문자열은 건너뜀)
+SKIP_TAGS = {"script", "style", "template", "rt", "rp"}
+# 내용이 없는 태그 (BeautifulSoup처럼 열자마자 닫힌 것으로 봄)
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+}
+FEED_CHUNK = 16 * 1024
+
+
+class _Capture:
+    # 헤더 요소 하나의 텍스트 수집 (요소가 열린 태그 스택에서 빠지면 닫힘)
+    def __init__(self, attrs):
+        self.attrs = attrs
+        self.parts = []
+        self.closed = False
+
+
+class ArticleParser(HTMLParser):
+    # 네이버 기사 HTML에서 발행시각/기자/언론사/본문만 뽑는 스트리밍 파서
+    # - 트리를 만들지 않고 열린 태그 스택과 필요한 요소의 텍스트만 유지
+    # - 본문(div#newsct_article)이 닫히고 헤더 세 요소를 다 찾으면 done=True, 나머지는 파싱하지 않음
+    # - 결과는 BeautifulSoup(html.parser) + select_one/get_text(strip=True)와 같게 맞춤
+    #   (닫는 태그는 가장 가까운 같은 이름의 열린 태그까지 그 사이 태그를 모두 닫고, 짝이 없으면 무시)
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.captures = {}  # PUBLISH_TIME/JOURNALIST/PRESS → _Capture
+        self.paragraphs = []  # 본문 <p>별 텍스트 조각
+        self.content_parts = []  # 본문 전체 텍스트 조각
+        self.content_found = False
+        self.content_closed = False
+        self.done = False
+        self._stack = []  # 열린 태그 (이름, 역할, _Capture 또는 paragraphs 인덱스)
+        self._in_content = False
+        self._open_paragraphs = []  # 열린 본문 <p>의 paragraphs 인덱스
+        self._skip_depth = 0
+        self._pending = []  # 다음 태그 전까지의 문자열 (청크 경계에서 나뉜 텍스트를 하나로 합침)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in VOID_TAGS:
+            return
+        attrs = {name: "" if value is None else value for name, value in attrs}
+        classes = (attrs.get("class") or "").split()
+
+        role, ref = None, None
+        for target in (PUBLISH_TIME, JOURNALIST, PRESS):
+            if target not in self.captures and tag == target[0] and target[1] in classes:
+                role, ref = "capture", _Capture(attrs)
+                self.captures[target] = ref
+                break
+        else:
+            if tag in SKIP_TAGS:
+                role = "skip"
+                self._skip_depth += 1
+            elif tag == "div" and not self.content_found and attrs.get("id") == CONTENT_ID:
+                role = "content"
+                self.content_found = True
+                self._in_content = True
+            elif tag == "p" and self._in_content:
+                role, ref = "p", len(self.paragraphs)
+                self.paragraphs.append([])
+                self._open_paragraphs.append(ref)
+        self._stack.append((tag, role, ref))
+
+    def handle_endtag(self, tag):
+        self._flush()
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > i:
+            self._close(*self._stack.pop())
+        self._update_done()
+
+    def _close(self, tag, role, ref):
+        if role == "capture":
+            ref.closed = True
+        elif role == "skip":
+            self._skip_depth -= 1
+        elif role == "content":
+            self._in_content = False
+            self.content_closed = True
+        elif role == "p":
+            self._open_paragraphs.remove(ref)
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    # <![CDATA[...]]>: BeautifulSoup은 따로 떨어진 문자열(CData)로 보고 get_text()에 넣음
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._pending.append(data[len("CDATA[") :])
+            self._flush(cdata=True)
+
+    # 주석/선언/처리 지시 앞뒤 문자열은 따로 떨어진 문자열
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self, cdata=False):
+        data = "".join(self._pending)
+        self._pending = []
+        if self._skip_depth and not cdata:
+            return
+        text = data.strip()
+        if not text:
+            return
+        for capture in self.captures.values():
+            if not capture.closed:
+                capture.parts.append(text)
+        if self._in_content:
+            self.content_parts.append(text)
+            for index in self._open_paragraphs:
+                self.paragraphs[index].append(text)
+
+    def _update_done(self):
+        self.done = self.content_closed and all(
+            target in self.captures and self.captures[target].closed
+            for target in (PUBLISH_TIME, JOURNALIST, PRESS)
+        )
+
+    def result(self):
+        publish_time = self.captures.get(PUBLISH_TIME)
+        journalist = self.captures.get(JOURNALIST)
+        press = self.captures.get(PRESS)
+        content = " ".join(text for text in ("".join(p) for p in self.paragraphs) if text)
+        return {
+            "publish_time": (
+                publish_time.attrs["data-date-time"]
+                if publish_time and "data-date-time" in publish_time.attrs
+                else "Unknown"
+            ),
+            "journalist": "".join(journalist.parts) if journalist else "Unknown",
+            "press": "".join(press.parts) if press else "Unknown",
+            "content": content or "".join(self.content_parts),
+        }
+
+
+# 기사 HTML → {"publish_time", "journalist", "press", "content"}
+def parse_article(html):
+    parser = ArticleParser()
+    for start in range(0, len(html), FEED_CHUNK):
+        parser.feed(html[start : start + FEED_CHUNK])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.result()
+
+
+# 이전 방식 (전체 BeautifulSoup 트리), 결과 비교/벤치마크용
+# bs4는 이 비교용 함수만 쓰므로 여기서 불러옴 (수집 경로의 import 비용을 줄임)
+def parse_article_soup(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    publish_time = soup.select_one("span.media_end_head_info_datestamp_time")
+    journalist = soup.select_one("em.media_end_head_journalist_name")
+    press = soup.select_one("span.media_end_head_top_logo_text")
+    content_area = soup.select_one("div#newsct_article")
+
+    content = (
+        " ".join(
+            p.get_text(strip=True)
+            for p in content_area.find_all("p")
+            if p.get_text(strip=True)
+        )
+        if content_area
+        else ""
+    )
+
+    return {
+        "publish_time": (
+            publish_time["data-date-time"]
+            if publish_time and publish_time.has_attr("data-date-time")
+            else "Unknown"
+        ),
+        "journalist": journalist.get_text(strip=True) if journalist else "Unknown",
+        "press": press.get_text(strip=True) if press else "Unknown",
+        "content": content
+        or (content_area.get_text(strip=True) if content_area else ""),
+    }
+
+
+# 저장해 둔 기사 HTML 폴더로 두 방식의 결과 일치 여부와 속도 비교
+def benchmark(directory, repeat=3):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                pages.append((name, f.read()))
+    if not pages:
+        print(f"{directory}에 HTML 파일이 없습니다")
+        return
+
+    mismatches = [name for name, html in pages if parse_article(html) != parse_article_soup(html)]
+    for name in mismatches:
+        print(f"결과 불일치: {name}")
+
+    timings = {}
+    for label, parse in (("BeautifulSoup", parse_article_soup), ("ArticleParser", parse_article)):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for _, html in pages:
+                parse(html)
+        timings[label] = (time.perf_counter() - started) / (repeat * len(pages))
+        print(f"{label}: 기사당 {timings[label] * 1000:.2f}ms")
+    print(
+        f"{len(pages)}개 기사, 불일치 {len(mismatches)}개, "
+        f"{timings['BeautifulSoup'] / timings['ArticleParser']:.1f}배 빠름"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기사 HTML 파서 비교")
+    parser.add_argument("directory", help="저장해 둔 네이버 기사 HTML 폴더")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.directory, args.repeat)
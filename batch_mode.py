@@ -0,0 +1,177 @@
+import os
+import json
+import time
+from llm_cache import get_cache, cache_key
+from embedding import PROMPT_VERSION as EMBEDDING_PROMPT_VERSION, prepare_text
+
+# Batch API 작업 파일 위치 / 한 실행에서 결과를 기다리는 총 시간(초) / 상태 확인 주기(초)
+# 총 대기 시간은 GitHub Actions 작업 한도(6시간) 안에 수집, 저장, 요약까지 끝나도록 넉넉히 짧게
+# (이전 실행 배치는 기다리지 않고 상태만 확인, 시간 안에 안 끝난 배치는 다음 실행에서 이어서 처리)
+BATCH_DIR = os.path.join(".cache", "batch")
+BATCH_MAX_WAIT = int(os.getenv("BATCH_MAX_WAIT", 2 * 3600))
+BATCH_POLL_INTERVAL = int(os.getenv("BATCH_POLL_INTERVAL", 60))
+COMPLETION_WINDOW = "24h"
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+EMBEDDING_ENDPOINT = "/v1/embeddings"
+# 더 기다려도 결과가 바뀌지 않는 상태
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchRequests:
+    # 한 번의 실행에서 보낼 요청 모음 (엔드포인트별 JSONL 줄 + custom_id → LLM 캐시 키)
+    # 이미 캐시에 있는 요청은 넣지 않음
+    def __init__(self, cache):
+        self.cache = cache
+        self.lines = {CHAT_ENDPOINT: [], EMBEDDING_ENDPOINT: []}
+        self.keys = {}  # custom_id → [종류, 캐시 키]
+
+    def _add(self, endpoint, custom_id, kind, key, body):
+        if custom_id in self.keys or self.cache.get(key) is not None:
+            return
+        self.keys[custom_id] = [kind, key]
+        self.lines[endpoint].append(
+            {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body}
+        )
+
+    # cached_chat_completion(client, prompt_version, **kwargs)와 같은 캐시 키로 저장됨
+    def add_chat(self, custom_id, prompt_version, kwargs):
+        key = cache_key(kwargs.get("model"), prompt_version, kwargs)
+        self._add(CHAT_ENDPOINT, custom_id, "chat", key, kwargs)
+
+    # embedding.get_embeddings와 같은 전처리/캐시 키
+    def add_embedding(self, custom_id, text, model):
+        text = prepare_text(text)
+        key = cache_key(model, EMBEDDING_PROMPT_VERSION, text)
+        self._add(EMBEDDING_ENDPOINT, custom_id, "embedding", key, {"model": model, "input": text})
+
+    def __len__(self):
+        return len(self.keys)
+
+
+# 엔드포인트별 JSONL을 올리고 배치 작업 생성 → {엔드포인트: batch id}
+def submit(client, requests, run_name):
+    directory = os.path.join(BATCH_DIR, run_name)
+    os.makedirs(directory, exist_ok=True)
+    batch_ids = {}
+    for endpoint, lines in requests.lines.items():
+        if not lines:
+            continue
+        path = os.path.join(directory, endpoint.strip("/").replace("/", "_") + ".jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        with open(path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=endpoint,
+            completion_window=COMPLETION_WINDOW,
+        )
+        batch_ids[endpoint] = batch.id
+        print(f"배치 제출: {endpoint} {len(lines)}건 ({batch.id})")
+    return batch_ids
+
+
+# 모든 배치가 끝날 때까지(최대 max_wait초) 기다림 → {batch id: 배치}, 시간 안에 안 끝나면 None
+# max_wait=0이면 상태만 한 번 확인
+def wait(client, batch_ids, max_wait=BATCH_MAX_WAIT, poll_interval=BATCH_POLL_INTERVAL):
+    deadline = time.monotonic() + max_wait
+    while True:
+        batches = {batch_id: client.batches.retrieve(batch_id) for batch_id in batch_ids}
+        if all(b.status in TERMINAL_STATUSES for b in batches.values()):
+            return batches
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            statuses = ", ".join(f"{b.id}={b.status}" for b in batches.values())
+            print(f"배치가 아직 끝나지 않음 ({statuses})")
+            return None
+        time.sleep(min(poll_interval, remaining))
+
+
+# 배치 결과를 LLM 캐시에 저장 → 저장한 건수 (실패한 요청은 이후 실시간 호출로 처리됨)
+def ingest(client, batch, keys, cache):
+    import numpy as np
+
+    if batch.status != "completed":
+        print(f"배치 {batch.id} 상태: {batch.status}")
+    if not batch.output_file_id:
+        return 0
+
+    stored = failed = 0
+    for raw in client.files.content(batch.output_file_id).text.splitlines():
+        if not raw.strip():
+            continue
+        line = json.loads(raw)
+        entry = keys.get(line.get("custom_id"))
+        response = line.get("response") or {}
+        if entry is None or line.get("error") or response.get("status_code") != 200:
+            failed += 1
+            continue
+        kind, key = entry
+        body = response["body"]
+        if kind == "chat":
+            content = body["choices"][0]["message"]["content"]
+            if content is None:
+                failed += 1
+                continue
+            cache.set(key, content)
+        else:
+            cache.set(key, np.asarray(body["data"][0]["embedding"], dtype=np.float32).tobytes())
+        stored += 1
+    if failed:
+        print(f"배치 {batch.id}: 실패 {failed}건은 실시간 호출로 처리")
+    return stored
+
+
+class BatchCheckpoints:
+    # 제출한 배치와 처리할 기사 목록을 DB(batch_runs)에 남겨 러너가 바뀌어도 이어서 처리
+    def __init__(self, conn):
+        self.conn = conn
+
+    def pending(self):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT id, batch_ids, manifest FROM batch_runs WHERE status = 'submitted' ORDER BY id"
+            )
+            return [
+                {"id": run_id, "batch_ids": json.loads(batch_ids), "manifest": json.loads(manifest)}
+                for run_id, batch_ids, manifest in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+    def create(self, batch_ids, manifest):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO batch_runs (status, batch_ids, manifest) VALUES ('submitted', %s, %s)",
+                (json.dumps(batch_ids), json.dumps(manifest, ensure_ascii=False)),
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+        finally:
+            cursor.close()
+
+    def finish(self, run_id):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE batch_runs SET status = 'done', finished_at = CURRENT_TIMESTAMP WHERE id = %s",
+                (run_id,),
+            )
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+
+# 실행 하나의 배치를 기다려 캐시에 반영 → 모두 끝났으면 True
+def collect(client, batch_ids, keys, max_wait=BATCH_MAX_WAIT):
+    cache = get_cache()
+    batches = wait(client, list(batch_ids.values()), max_wait)
+    if batches is None:
+        return False
+    stored = sum(ingest(client, batch, keys, cache) for batch in batches.values())
+    print(f"배치 결과 {stored}건 캐시에 반영")
+    return True
@@ -0,0 +1,216 @@
+import re
+import sqlite3
+import datetime
+
+import numpy as np
+import pymysql
+
+# 벤치마크용 SQLite 대역 (pymysql.connect 자리에 꽂아 씀)
+# - 앱/스크립트가 쓰는 MySQL 문법만 SQLite로 바꿔 실행: %s, INSERT IGNORE, ON DUPLICATE KEY UPDATE, UTC_TIMESTAMP()
+# - publish_time/summary_date는 DATETIME/DATE 컬럼으로 선언해 pymysql처럼 datetime/date로 돌려줌
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS newsdata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    press TEXT, subcategory TEXT, title TEXT, link TEXT,
+    publish_time DATETIME, journalist TEXT, summary TEXT,
+    headline_score INTEGER, relevance_score INTEGER, embedding BLOB,
+    link_hash TEXT UNIQUE,
+    relevance_percent INTEGER, relevance_hue REAL, stimulus_hue REAL,
+    content_minhash BLOB, canonical_hash TEXT, outlet_count INTEGER NOT NULL DEFAULT 1,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+-- MySQL의 ON UPDATE CURRENT_TIMESTAMP 대신
+CREATE TRIGGER IF NOT EXISTS trg_newsdata_updated_at AFTER UPDATE ON newsdata
+WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE newsdata SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+CREATE INDEX IF NOT EXISTS idx_newsdata_publish_time ON newsdata (publish_time);
+CREATE INDEX IF NOT EXISTS idx_newsdata_canonical_hash ON newsdata (canonical_hash);
+CREATE INDEX IF NOT EXISTS idx_newsdata_updated_at ON newsdata (updated_at);
+CREATE INDEX IF NOT EXISTS idx_newsdata_subcategory_publish_time ON newsdata (subcategory, publish_time);
+CREATE TABLE IF NOT EXISTS summarydata (
+    summary_date DATE PRIMARY KEY,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS data_version (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batch_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    batch_ids TEXT NOT NULL,
+    manifest TEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME NULL
+);
+CREATE TABLE IF NOT EXISTS summary_clusters (
+    summary_date DATE NOT NULL,
+    cluster_id INTEGER NOT NULL,
+    centroid BLOB NOT NULL,
+    vector_sum BLOB NOT NULL,
+    article_count INTEGER NOT NULL,
+    exemplars TEXT NOT NULL,
+    section TEXT,
+    section_key TEXT,
+    PRIMARY KEY (summary_date, cluster_id)
+);
+CREATE TABLE IF NOT EXISTS summary_progress (
+    summary_date DATE PRIMARY KEY,
+    last_article_id INTEGER NOT NULL DEFAULT 0,
+    last_updated_at DATETIME,
+    article_ids TEXT,
+    overview TEXT,
+    overview_key TEXT,
+    updated_at DATETIME NOT NULL
+);
+"""
+
+_VALUES_FUNC = re.compile(r"VALUES\((\w+)\)")
+
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_converter("DATETIME", lambda b: datetime.datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+
+
+def translate(query):
+    query = query.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE")
+    if "ON DUPLICATE KEY UPDATE" in query:
+        query = query.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT DO UPDATE SET")
+        query = _VALUES_FUNC.sub(r"excluded.\1", query)
+    return query
+
+
+def _utc_timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Cursor:
+    def __init__(self, conn, as_dict=False):
+        self._cursor = conn.cursor()
+        self._as_dict = as_dict
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, params=()):
+        self._cursor.execute(translate(query), list(params or ()))
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq):
+        self._cursor.executemany(translate(query), [list(p) for p in seq])
+        return self._cursor.rowcount
+
+    def _row(self, row):
+        if row is None or not self._as_dict:
+            return row
+        return {d[0]: v for d, v in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.create_function("UTC_TIMESTAMP", 0, _utc_timestamp)
+
+    def cursor(self, cursor=None):
+        return Cursor(self._conn, as_dict=cursor is pymysql.cursors.DictCursor)
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1")
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def create(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT OR IGNORE INTO data_version VALUES (?, 1, ?)",
+        [("newsdata", _utc_timestamp()), ("summarydata", _utc_timestamp())],
+    )
+    conn.commit()
+    conn.close()
+
+
+# pymysql.connect를 path의 SQLite 대역으로 바꿈 (db.py와 app 모두 호출 시점에 pymysql.connect를 찾음)
+def install(path):
+    create(path)
+    pymysql.connect = lambda **kwargs: Connection(path)
+
+
+# 합성 기사 n건 (오늘부터 days일 동안 고르게 분포, 임베딩 dim차원)
+def seed_articles(path, n, subcategories, days=30, dim=1536, seed=0):
+    rng = np.random.default_rng(seed)
+    now = datetime.datetime.now().replace(microsecond=0)
+    conn = sqlite3.connect(path)
+    rows = []
+    for i in range(n):
+        relevance = int(rng.integers(0, 100))
+        headline = int(rng.integers(0, 11))
+        percent = min(max(relevance / 75 * 100, 0), 100)
+        vec = rng.standard_normal(dim).astype(np.float32)
+        rows.append(
+            (
+                "연합뉴스",
+                subcategories[i % len(subcategories)],
+                f"합성 기사 {i} 인공지능 반도체" if i % 3 == 0 else f"합성 기사 {i}",
+                f"https://n.news.naver.com/mnews/article/001/{i:010d}",
+                (now - datetime.timedelta(seconds=int(i * days * 86400 / max(n, 1)))).isoformat(" "),
+                "홍길동 기자",
+                f"합성 기사 {i}의 요약이다. 두 번째 문장이다.",
+                headline,
+                relevance,
+                (vec / np.linalg.norm(vec)).astype("<f4").tobytes(),
+                f"{i:040x}",
+                int(percent),
+                120 * percent / 100,
+                120 - (headline / 10) * 120,
+            )
+        )
+    conn.executemany(
+        """
+        INSERT INTO newsdata (
+            press, subcategory, title, link, publish_time, journalist, summary,
+            headline_score, relevance_score, embedding, link_hash,
+            relevance_percent, relevance_hue, stimulus_hue
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    today = datetime.date.today()
+    conn.executemany(
+        "INSERT OR REPLACE INTO summarydata VALUES (?, ?)",
+        [
+            ((today - datetime.timedelta(days=d)).isoformat(), f"{d}일 전 요약\n\n- 합성 요약 문단")
+            for d in range(1, days + 1)
+        ],
+    )
+    conn.commit()
+    conn.close()
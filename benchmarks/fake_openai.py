@@ -0,0 +1,188 @@
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+# 벤치마크용 OpenAI 호환 서버 (chat.completions / embeddings)
+# - 응답마다 latency초(± jitter 비율) 지연
+# - 응답 내용은 main.py 파서가 받아들이는 형식으로 입력에 따라 결정적으로 만듦
+# - inject()로 다음 요청들에 장애를 넣을 수 있음 (429 + Retry-After, 5xx, 응답 지연으로 시간 초과)
+EMBEDDING_DIM = 1536
+# 상태 코드별 OpenAI 오류 본문 (type, code)
+ERROR_TYPES = {
+    429: ("rate_limit_exceeded", "rate_limit_exceeded"),
+    500: ("server_error", None),
+    502: ("server_error", None),
+    503: ("server_error", None),
+}
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+
+
+def _choices(prompt, start, end):
+    lines = prompt.split(start, 1)[-1].split(end, 1)[0]
+    return [l.strip() for l in lines.splitlines() if l.strip()]
+
+
+# JSON 스키마 속성별 값 (enum은 그중 하나, 정수는 0~10)
+def _schema_value(name, prop, seed):
+    if "enum" in prop:
+        return prop["enum"][seed % len(prop["enum"])]
+    if prop.get("type") == "integer":
+        return seed % 11
+    if prop.get("type") == "array":
+        return [f"합성 {name} {seed % 1000}-{i}. 핵심 사실 문장이다." for i in range(2)]
+    return f"합성 {name} {seed % 1000}. 핵심 사실 문장이다."
+
+
+# 프롬프트 종류별 응답 본문
+def chat_reply(body):
+    prompt = body["messages"][-1]["content"]
+    seed = _seed(prompt)
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(
+            {name: _schema_value(name, prop, seed) for name, prop in schema["properties"].items()},
+            ensure_ascii=False,
+        )
+    if "자극성: (숫자)" in prompt:
+        return f"자극성: {seed % 11}"
+    if "카테고리 목록:" in prompt:
+        options = _choices(prompt, "카테고리 목록:", "뉴스 요약:")
+        return f"카테고리: {options[seed % len(options)]}"
+    return f"합성 요약 {seed % 1000}. 핵심 사실 문장이다. 세 번째 문장이다."
+
+
+def embedding_vector(text, dim=EMBEDDING_DIM):
+    vec = np.random.default_rng(_seed(text)).standard_normal(dim)
+    return (vec / np.linalg.norm(vec)).round(6).tolist()
+
+
+class FakeOpenAI:
+    def __init__(self, latency=0.0, jitter=0.2, dim=EMBEDDING_DIM):
+        self.latency = latency
+        self.jitter = jitter
+        self.dim = dim
+        self.requests = 0
+        self.request_times = []  # 요청을 받은 시각 (time.monotonic)
+        self._faults = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    # 다음 times개 요청에 장애 넣기 (먼저 넣은 장애부터 차례로)
+    # - status: 그 상태 코드로 OpenAI 형식 오류 응답, retry_after(초)가 있으면 Retry-After 헤더도
+    # - status="timeout": hang초 동안 응답하지 않음 (클라이언트 timeout보다 길게)
+    def inject(self, status, times=1, retry_after=None, hang=5.0):
+        with self._lock:
+            self._faults.extend([{"status": status, "retry_after": retry_after, "hang": hang}] * times)
+
+    def _next_fault(self):
+        with self._lock:
+            self.requests += 1
+            self.request_times.append(time.monotonic())
+            return self._faults.pop(0) if self._faults else None
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, data):
+                raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def _send_error(self, fault):
+                error_type, code = ERROR_TYPES.get(fault["status"], ("server_error", None))
+                raw = json.dumps(
+                    {"error": {"message": f"injected {fault['status']}", "type": error_type, "code": code}}
+                ).encode("utf-8")
+                self.send_response(fault["status"])
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                if fault["retry_after"] is not None:
+                    self.send_header("Retry-After", str(fault["retry_after"]))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fault = fake._next_fault()
+                if fault is not None and fault["status"] == "timeout":
+                    time.sleep(fault["hang"])
+                    self.close_connection = True
+                    return
+                fake._delay()
+                if fault is not None:
+                    self._send_error(fault)
+                    return
+                if self.path.endswith("/embeddings"):
+                    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                    tokens = sum(len(t) for t in inputs) // 2 + 1
+                    self._send(
+                        {
+                            "object": "list",
+                            "model": body["model"],
+                            "data": [
+                                {"object": "embedding", "index": i, "embedding": embedding_vector(t, fake.dim)}
+                                for i, t in enumerate(inputs)
+                            ],
+                            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                        }
+                    )
+                elif self.path.endswith("/chat/completions"):
+                    content = chat_reply(body)
+                    prompt_tokens = sum(len(m.get("content") or "") for m in body["messages"]) // 2 + 1
+                    completion_tokens = len(content) // 2 + 1
+                    self._send(
+                        {
+                            "id": "chatcmpl-bench",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": body["model"],
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "finish_reason": "stop",
+                                    "message": {"role": "assistant", "content": content},
+                                }
+                            ],
+                            "usage": {
+                                "prompt_tokens": prompt_tokens,
+                                "completion_tokens": completion_tokens,
+                                "total_tokens": prompt_tokens + completion_tokens,
+                            },
+                        }
+                    )
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    # 서버 시작 → OpenAI(base_url=...)에 넣을 주소
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
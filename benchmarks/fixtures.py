@@ -0,0 +1,246 @@
+import os
+import json
+import random
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, urljoin
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from crawler import BASE_URL, MORE_PATH, Crawler, HostRateLimiter, load_sections
+
+# 네이버 섹션/기사 HTML 픽스처
+# 폴더 구성:
+#   manifest.json                       {"source": "synthetic" | "recorded", "version": 합성 픽스처 구성 버전, "sections": {sid: 페이지 수}}
+#   section/<sid>/<page>.html           1페이지는 섹션 페이지 전체, 2페이지부터는 "더보기" 응답 HTML
+#   article/<oid>_<aid>.html            기사 페이지
+# 링크는 네이버 주소 그대로 저장하고, FixtureServer가 내보낼 때 자기 주소로 바꿈
+# 저장소에 함께 두는 작은 녹화 픽스처 (python -m benchmarks.fixtures record로 만들고 커밋)
+RECORDED_FIXTURES = os.path.join("benchmarks", "naver_fixtures")
+NAVER_ARTICLE_HOST = "https://n.news.naver.com"
+ARTICLE_URL = NAVER_ARTICLE_HOST + "/mnews/article/{oid}/{aid}"
+
+_WORDS = (
+    "인공지능 반도체 스마트폰 클라우드 데이터센터 보안 플랫폼 서비스 출시 발표 투자 "
+    "연구진 개발 기술 시장 점유율 기업 정부 규제 협력 글로벌 성능 모델 사용자 전망"
+).split()
+
+
+def _sentence(rng):
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 16))) + "."
+
+
+def _paragraphs(rng, n):
+    return [" ".join(_sentence(rng) for _ in range(rng.randint(2, 5))) for _ in range(n)]
+
+
+def _article_html(rng, title, aid, paragraphs, press="합성일보"):
+    body = "".join(f"<p>{p}</p>\n" for p in paragraphs)
+    # 본문 뒤 댓글/추천 영역과 스크립트 (실제 페이지처럼 본문 뒤가 더 김)
+    tail = "".join(
+        f"<div class='cmt'><span>댓글 {i}</span><a href='/c/{i}'>{_sentence(rng)}</a></div>"
+        f"<script>var t{i}='<div>'+{i};</script>\n"
+        for i in range(rng.randint(150, 300))
+    )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{title}</title><script>window.__d={{}};</script></head><body>"
+        "<div class='media_end_head'>"
+        f"<a class='media_end_head_top_logo'><span class='media_end_head_top_logo_text'>{press}</span></a>"
+        f"<h2 id='title_area'><span>{title}</span></h2>"
+        "<span class='media_end_head_info_datestamp_time _ARTICLE_DATE_TIME' "
+        f"data-date-time='2025-01-{1 + aid % 28:02d} {aid % 24:02d}:{aid % 60:02d}:00'>날짜</span>"
+        f"<em class='media_end_head_journalist_name'>기자{aid % 50} 기자</em>"
+        "</div>"
+        f"<article id='dic_area'><div id='newsct_article'>\n{body}</div></article>"
+        f"{tail}</body></html>"
+    )
+
+
+def _list_html(items, cursor):
+    rows = "".join(
+        "<li class='sa_item'><div class='sa_text'>"
+        f"<a class='sa_text_title' href='{link}'><strong>{title}</strong></a>"
+        "</div></li>"
+        for title, link in items
+    )
+    more = f"<div data-cursor='{cursor}'></div>" if cursor else ""
+    return f"<ul class='sa_list'>{rows}</ul>{more}"
+
+
+# 합성 픽스처 만들기 (섹션마다 pages페이지 × per_page건, 일부 기사는 토큰 상한을 넘는 긴 기사)
+# COPY_EVERY번째 기사마다 앞서 나온 기사 본문을 다른 언론사가 옮겨 실은 근사 중복 (앞뒤에 한 줄씩 덧붙임)
+# 픽스처 구성이 바뀌면 FIXTURE_VERSION을 올림 (벤치마크가 예전 합성 픽스처를 다시 만듦)
+FIXTURE_VERSION = 2
+COPY_EVERY = 3
+COPY_PRESSES = ("합성통신", "합성경제", "합성타임즈")
+
+
+def generate(directory, sids=("105",), pages=3, per_page=10, seed=0):
+    rng = random.Random(seed)
+    manifest = {"source": "synthetic", "version": FIXTURE_VERSION, "sections": {}}
+    aid = 0
+    originals = []
+    copies = 0
+    for sid in sids:
+        os.makedirs(os.path.join(directory, "section", sid), exist_ok=True)
+        for page in range(1, pages + 1):
+            items = []
+            for _ in range(per_page):
+                aid += 1
+                title = f"[합성] {' '.join(rng.choice(_WORDS) for _ in range(5))} {aid}"
+                if originals and aid % COPY_EVERY == 0:
+                    press = rng.choice(COPY_PRESSES)
+                    paragraphs = [
+                        f"({press}) 기자{aid % 50} 기자 = 보도 내용을 정리했다.",
+                        *rng.choice(originals),
+                        "무단 전재 및 재배포 금지",
+                    ]
+                    copies += 1
+                else:
+                    press = "합성일보"
+                    paragraphs = _paragraphs(rng, rng.choice((4, 8, 12, 60)) if aid % 7 else 150)
+                    originals.append(paragraphs)
+                html = _article_html(rng, title, aid, paragraphs, press)
+                _write(directory, f"article/001_{aid:010d}.html", html)
+                items.append((title, ARTICLE_URL.format(oid="001", aid=f"{aid:010d}")))
+            cursor = f"cursor-{sid}-{page + 1}" if page < pages else None
+            html = _list_html(items, cursor)
+            if page == 1:
+                html = f"<!DOCTYPE html><html><head><meta charset='utf-8'></head><body>{html}</body></html>"
+            _write(directory, f"section/{sid}/{page}.html", html)
+        manifest["sections"][sid] = pages
+    _write(directory, "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    print(f"합성 픽스처 생성: {directory} (기사 {aid}건, 근사 중복 {copies}건)")
+
+
+# 실제 네이버 페이지 녹화 (섹션마다 pages페이지, 기사는 섹션당 최대 limit건)
+def record(directory=RECORDED_FIXTURES, sids=("105",), pages=2, limit=20):
+    crawler = Crawler(load_sections(list(sids)), rate_limiter=HostRateLimiter(rate=2.0, burst=2))
+    manifest = {"source": "recorded", "sections": {}}
+    for sid in sids:
+        links = []
+        cursor = None
+        recorded = 0
+        for page in range(1, pages + 1):
+            if page == 1:
+                html = crawler.get(urljoin(BASE_URL, sid)).text
+            else:
+                html = crawler._more_page(sid, page, cursor)
+            _write(directory, f"section/{sid}/{page}.html", html)
+            recorded = page
+            items, cursor = Crawler.parse_list(html)
+            links += [it["link"] for it in items]
+            if not cursor:
+                break
+        for link in links[:limit]:
+            parts = [p for p in urlsplit(link).path.split("/") if p]
+            if len(parts) < 2:
+                continue
+            _write(directory, f"article/{parts[-2]}_{parts[-1]}.html", crawler.get(link).text)
+        manifest["sections"][sid] = recorded
+        print(f"섹션 {sid}: {recorded}페이지, 기사 {min(len(links), limit)}건 녹화")
+    _write(directory, "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+def _write(directory, name, text):
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def load_manifest(directory):
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FixtureServer:
+    # 픽스처 폴더를 네이버 섹션 목록/더보기/기사 주소 형태로 내보내는 로컬 HTTP 서버
+    # Crawler(base_url=server.section_url)로 쓰면 실제 수집과 같은 경로를 탐
+    def __init__(self, directory):
+        self.directory = directory
+        self.root = None
+        self._server = None
+
+    @property
+    def section_url(self):
+        return f"{self.root}/section/"
+
+    def _read(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read().replace(NAVER_ARTICLE_HOST, self.root)
+
+    def _handler(self):
+        fixtures = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, text, content_type="text/html; charset=utf-8"):
+                if text is None:
+                    self.send_error(404)
+                    return
+                raw = text.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                if url.path == "/section/" + MORE_PATH:
+                    query = parse_qs(url.query)
+                    sid, page = query["sid"][0], query["pageNo"][0]
+                    html = fixtures._read(f"section/{sid}/{page}.html")
+                    component = {"SECTION_ARTICLE_LIST_FOR_LATEST": html} if html else {}
+                    self._send(json.dumps({"renderedComponent": component}), "application/json")
+                elif len(parts) == 2 and parts[0] == "section":
+                    self._send(fixtures._read(f"section/{parts[1]}/1.html"))
+                elif len(parts) >= 4 and parts[-3] == "article":
+                    self._send(fixtures._read(f"article/{parts[-2]}_{parts[-1]}.html"))
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.root = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.section_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 네이버 HTML 픽스처")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="합성 픽스처 만들기")
+    gen.add_argument("directory")
+    gen.add_argument("--sections", default="105")
+    gen.add_argument("--pages", type=int, default=3)
+    gen.add_argument("--per-page", type=int, default=10)
+    rec = sub.add_parser("record", help="실제 네이버 페이지 녹화")
+    rec.add_argument("directory", nargs="?", default=RECORDED_FIXTURES)
+    rec.add_argument("--sections", default="105")
+    rec.add_argument("--pages", type=int, default=2)
+    rec.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    sids = [s.strip() for s in args.sections.split(",")]
+    if args.command == "generate":
+        generate(args.directory, sids, args.pages, args.per_page)
+    else:
+        record(args.directory, sids, args.pages, args.limit)
@@ -0,0 +1,396 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+from benchmarks import fake_db
+from benchmarks.fake_openai import FakeOpenAI
+from benchmarks.fixtures import FIXTURE_VERSION, RECORDED_FIXTURES, FixtureServer, generate, load_manifest
+
+# 네트워크/실제 DB 없이 돌리는 성능 벤치마크
+# - main: 합성 네이버 HTML + 지연을 넣은 가짜 OpenAI 서버 + SQLite 대역으로 main.main() 전체 실행
+#   저장소의 녹화 픽스처(benchmarks/naver_fixtures)가 있으면 같은 실행을 main.recorded.*로 한 번 더
+# - clustering: summary.py 군집화(leader_cluster + build_clusters)를 합성 임베딩 1k/10k/100k건으로
+# - web: Flask 테스트 클라이언트로 /, /home, /summary, /article/<id> 응답 시간 (첫 요청 / 페이지 캐시 적중)
+# - vector: app/vector_index.py 의미 검색 한 번(전체 / 카테고리 하나)을 합성 벡터 1k/10k/100k건으로
+# - imports: main/summary/app을 새 프로세스에서 import하는 데 걸리는 시간
+# 결과는 JSON으로 저장하고, 기준 결과(baseline)보다 tolerance 넘게 느려진 항목을 회귀로 표시
+# 실행 (저장소 루트에서): python -m benchmarks.run [--only web] [--update-baseline]
+# 녹화 픽스처 갱신: python -m benchmarks.fixtures record (기본 benchmarks/naver_fixtures, 섹션당 기사 20건)
+DEFAULT_FIXTURES = os.path.join(".cache", "bench", "fixtures")
+DEFAULT_OUTPUT = os.path.join(".cache", "bench", "latest.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# 이보다 작은 차이(초)는 측정 오차로 보고 회귀로 치지 않음
+MIN_REGRESSION = 0.0005
+
+MAIN_SCENARIOS = {
+    "serial": [],
+    "pipeline": ["--pipeline"],
+    "pipeline_combined": ["--pipeline", "--combined"],
+}
+CLUSTER_SIZES = (1000, 10000, 100000)
+CLUSTER_DIM = 1536
+VECTOR_SIZES = (1000, 10000, 100000)
+VECTOR_CATEGORIES = 6
+VECTOR_QUERIES = 50
+VECTOR_TOPICS = 2000
+VECTOR_NOISE = 1.0
+WEB_ARTICLES = 5000
+WEB_PAGES_PER_CATEGORY = 5
+WEB_SAMPLE_ARTICLES = 50
+IMPORT_MODULES = ("main", "summary", "app")
+
+
+def _bench_env(tmp, db_path):
+    return {
+        "OPENAI_API_KEY": "bench",
+        "DB_HOST": "bench",
+        "DB_PORT": "0",
+        "LLM_CACHE_PATH": os.path.join(tmp, "llm_cache.sqlite3"),
+        "RUN_JOURNAL_PATH": os.path.join(tmp, "run_journal.sqlite3"),
+        "METRICS_REPORT": os.path.join(tmp, "report.json"),
+        "VECTOR_INDEX_DIR": os.path.join(tmp, "vector_index"),
+        "BENCH_DB": db_path,
+    }
+
+
+# --- main.main() 전체 실행 (실행마다 새 DB/캐시, 모듈 상태가 남지 않게 하위 프로세스에서) ---
+def _main_child(section_url, use_pipeline, combined):
+    fake_db.install(os.environ["BENCH_DB"])
+    # cron 실행처럼 import부터 잼 (지연 import한 모듈 비용도 실행 시간에 들어가게)
+    started = time.perf_counter()
+    with redirect_stdout(sys.stderr):
+        import main
+        from crawler import Crawler, HostRateLimiter, load_sections
+        from dedup import normalize_url
+
+        main._crawler = Crawler(
+            load_sections(),
+            base_url=section_url,
+            max_pages=main.MAX_PAGES,
+            normalize=normalize_url,
+            rate_limiter=HostRateLimiter(rate=1e9, burst=1e9),
+        )
+        main.main(use_pipeline=use_pipeline, combined=combined)
+    elapsed = time.perf_counter() - started
+    with open(os.environ["METRICS_REPORT"], encoding="utf-8") as f:
+        report = json.load(f)
+    copies, canonical = _saved_duplicates(os.environ["BENCH_DB"])
+    print(json.dumps({"seconds": elapsed, "saved": report["saved"], "failed": report["failed"],
+                      "near_duplicates": copies, "canonical": canonical, "timers": report["timers"]}))
+
+
+# 저장된 근사 중복 수와, 어떤 기사가 어느 대표 기사에 묶였는지 요약 (실행 방식끼리 같은지 비교)
+# (near_duplicates 카운터는 한도 밖에서 미리 판별한 기사도 세므로 DB에 저장된 결과로 셈)
+def _saved_duplicates(db_path):
+    conn = fake_db.Connection(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT link_hash, canonical_hash FROM newsdata ORDER BY link_hash")
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+    copies = sum(1 for key, canonical in rows if canonical and canonical != key)
+    return copies, hashlib.sha1(json.dumps(rows).encode("utf-8")).hexdigest()[:16]
+
+
+def bench_main(fixtures, latency, repeat, scenarios=MAIN_SCENARIOS, prefix="main"):
+    manifest = load_manifest(fixtures)
+    server = FixtureServer(fixtures)
+    openai_server = FakeOpenAI(latency=latency)
+    section_url = server.start()
+    openai_url = openai_server.start()
+    results = {}
+    canonical = None
+    try:
+        for name, flags in scenarios.items():
+            runs = []
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory() as tmp:
+                    env = {
+                        **os.environ,
+                        **_bench_env(tmp, os.path.join(tmp, "news.sqlite3")),
+                        "OPENAI_BASE_URL": openai_url,
+                        "NEWS_SECTIONS": ",".join(manifest["sections"]),
+                    }
+                    out = subprocess.run(
+                        [sys.executable, "-m", "benchmarks.run", "--main-child", section_url, *flags],
+                        env=env, capture_output=True, text=True, check=False,
+                    )
+                    if out.returncode != 0:
+                        raise RuntimeError(f"main 벤치마크 실패 ({name}):\n{out.stderr[-2000:]}")
+                    runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            # 파이프라인/통합 실행도 직렬 실행과 같은 기사를 대표로 골라야 함
+            canonical = canonical or runs[0]["canonical"]
+            if any(r["canonical"] != canonical for r in runs):
+                raise RuntimeError(f"main 벤치마크 결과가 다름 ({name}): 근사 중복 대표 기사가 직렬 실행과 다름")
+            seconds = statistics.median(r["seconds"] for r in runs)
+            results[f"{prefix}.{name}"] = {
+                "seconds": round(seconds, 4),
+                "saved": runs[-1]["saved"],
+                "failed": runs[-1]["failed"],
+                "near_duplicates": runs[-1]["near_duplicates"],
+                "timers": runs[-1]["timers"],
+            }
+            print(f"{prefix} {name}: {seconds:.2f}초 (저장 {runs[-1]['saved']}건, 근사 중복 {runs[-1]['near_duplicates']}건)")
+    finally:
+        server.stop()
+        openai_server.stop()
+    return results
+
+
+# --- 모듈 import 시간 (새 프로세스마다 측정, 가장 짧은 값) ---
+def bench_imports(repeat, modules=IMPORT_MODULES):
+    results = {}
+    for module in modules:
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        timings = []
+        for _ in range(max(repeat, 3)):
+            with tempfile.TemporaryDirectory() as tmp:
+                env = {**os.environ, **_bench_env(tmp, os.path.join(tmp, "news.sqlite3"))}
+                out = subprocess.run(
+                    [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+                )
+            timings.append(float(out.stdout.strip().splitlines()[-1]))
+        seconds = min(timings)
+        results[f"import.{module}"] = {"seconds": round(seconds, 4)}
+        print(f"import {module}: {seconds * 1000:.0f}ms")
+    return results
+
+
+# --- summary.py 군집화 ---
+def bench_clustering(sizes, repeat, dim=CLUSTER_DIM):
+    from clustering import leader_cluster, build_clusters, synthetic_embeddings
+
+    results = {}
+    for n in sizes:
+        A = synthetic_embeddings(n, dim, topics=max(n // 25, 1), noise=0.5, seed=0)
+        summaries = [f"요약 {i}" for i in range(n)]
+        timings = []
+        for _ in range(repeat if n < 100000 else 1):
+            started = time.perf_counter()
+            labels, leaders, counts = leader_cluster(A)
+            build_clusters(summaries, labels, leaders, counts)
+            timings.append(time.perf_counter() - started)
+        seconds = min(timings)
+        results[f"clustering.{n}"] = {"seconds": round(seconds, 4), "clusters": len(leaders)}
+        print(f"군집화 {n}건: {seconds:.3f}초 (클러스터 {len(leaders)}개)")
+        del A
+    return results
+
+
+# --- 의미 검색 (색인 파일을 직접 만들어 DB 없이) ---
+def bench_vector(sizes, repeat):
+    import numpy as np
+    from app.vector_index import VectorIndex, reduce_vectors
+
+    results = {}
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            index = VectorIndex(tmp, None, refresh_interval=float("inf"))
+            # 실제 기사 임베딩처럼 주제별로 모인 벡터 (주제 중심 + 잡음)
+            topics = rng.standard_normal((VECTOR_TOPICS, index.dims))
+            vectors = reduce_vectors(
+                topics[rng.integers(0, VECTOR_TOPICS, n)] + rng.standard_normal((n, index.dims)) * VECTOR_NOISE,
+                index.dims,
+            )
+            categories = np.asarray([f"c{c}" for c in rng.integers(0, VECTOR_CATEGORIES, n)])
+            index._build(np.arange(1, n + 1, dtype=np.int64), categories, vectors, np.zeros(n, dtype=np.int64), None)
+            index._load()
+            index._checked_at = time.monotonic()
+            # 질의는 색인에 있는 기사 벡터 (관련 기사 찾기와 같은 모양)
+            queries = vectors[rng.choice(n, VECTOR_QUERIES, replace=False)]
+            for label, category in (("all", None), ("category", "c0")):
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    for q in queries:
+                        index.search(q, k=50, category=category)
+                    timings.append((time.perf_counter() - started) / len(queries))
+                seconds = min(timings)
+                # 모두 곱한 정확한 결과와 비교한 recall@10
+                mask = np.ones(n, dtype=bool) if category is None else categories == category
+                hits = 0
+                for q in queries:
+                    scores = np.where(mask, vectors @ q, -np.inf)
+                    exact = set((np.argpartition(scores, -10)[-10:] + 1).tolist())
+                    hits += len(exact & {doc_id for doc_id, _ in index.search(q, k=10, category=category)})
+                recall = hits / (10 * len(queries))
+                results[f"vector.{n}.{label}"] = {"seconds": round(seconds, 6), "recall_at_10": round(recall, 4)}
+                print(f"의미 검색 {n}건 ({label}): {seconds * 1000:.2f}ms, recall@10 {recall:.3f}")
+            del index, vectors
+    return results
+
+
+# --- Flask 화면 ---
+def _web_urls(article_ids, summary_dates):
+    from app import SUBCATEGORIES
+
+    return {
+        "/": [f"/?category={c}&page={p}" for c in SUBCATEGORIES for p in range(1, WEB_PAGES_PER_CATEGORY + 1)],
+        "/home": ["/home"],
+        "/summary": ["/summary"] + [f"/summary?date={d}" for d in summary_dates],
+        "/article/<id>": [f"/article/{i}" for i in article_ids],
+    }
+
+
+def bench_web(articles, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "news.sqlite3")
+        # app 모듈이 import 때 읽는 설정(VECTOR_INDEX_DIR 등)도 임시 폴더를 보도록 먼저 설정
+        os.environ.update(_bench_env(tmp, db_path))
+        import app as app_module
+        from app import SUBCATEGORIES
+
+        fake_db.install(db_path)
+        fake_db.seed_articles(db_path, articles, SUBCATEGORIES[1:])
+        rng = random.Random(0)
+        article_ids = rng.sample(range(1, articles + 1), min(WEB_SAMPLE_ARTICLES, articles))
+        dates = [(datetime.now().date() - timedelta(days=d)).isoformat() for d in range(1, 31)]
+        urls = _web_urls(article_ids, dates)
+
+        cold = {route: [] for route in urls}
+        warm = {route: [] for route in urls}
+        for _ in range(repeat):
+            # 매번 새 앱 (페이지/결과 캐시가 빈 상태에서 시작)
+            client = app_module.create_app().test_client()
+            client.get("/health/cache")
+            for timings in (cold, warm):
+                for route, route_urls in urls.items():
+                    for url in route_urls:
+                        started = time.perf_counter()
+                        res = client.get(url)
+                        timings[route].append(time.perf_counter() - started)
+                        if res.status_code != 200:
+                            raise RuntimeError(f"{url}: HTTP {res.status_code}")
+
+    for label, timings in (("cold", cold), ("warm", warm)):
+        for route, samples in timings.items():
+            p50 = statistics.median(samples)
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+            results[f"web.{route}.{label}"] = {
+                "seconds": round(p50, 6),
+                "p95": round(p95, 6),
+                "mean": round(statistics.fmean(samples), 6),
+                "count": len(samples),
+            }
+            print(f"{route} ({label}): p50 {p50 * 1000:.2f}ms / p95 {p95 * 1000:.2f}ms")
+    return results
+
+
+# 기준 결과보다 tolerance 넘게 느려진 항목 → [(이름, 기준, 현재)]
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        before, after = base["seconds"], result["seconds"]
+        if after > before * (1 + tolerance) and after - before > MIN_REGRESSION:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def _write_json(path, data):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 성능 벤치마크")
+    parser.add_argument("--only", default="imports,main,clustering,vector,web", help="실행할 벤치마크 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="네이버 HTML 픽스처 폴더 (없으면 합성)")
+    parser.add_argument("--recorded", default=RECORDED_FIXTURES, help="녹화 픽스처 폴더 (있을 때만 실행)")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 OpenAI 응답 지연(초)")
+    parser.add_argument("--sizes", default=",".join(map(str, CLUSTER_SIZES)), help="군집화 기사 수")
+    parser.add_argument("--vector-sizes", default=",".join(map(str, VECTOR_SIZES)), help="의미 검색 벡터 수")
+    parser.add_argument("--articles", type=int, default=WEB_ARTICLES, help="화면 벤치마크 기사 수")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과를 기준 결과로 저장")
+    parser.add_argument("--main-child", metavar="SECTION_URL", help=argparse.SUPPRESS)
+    parser.add_argument("--pipeline", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--combined", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.main_child:
+        _main_child(args.main_child, args.pipeline, args.combined)
+        return
+
+    only = {name.strip() for name in args.only.split(",")}
+    results = {}
+    if "imports" in only:
+        results.update(bench_imports(args.repeat))
+    if "main" in only:
+        # 합성 픽스처는 구성이 바뀌었으면 다시 만듦
+        manifest = None
+        if os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+            manifest = load_manifest(args.fixtures)
+        if manifest is None or (manifest["source"] == "synthetic" and manifest.get("version") != FIXTURE_VERSION):
+            shutil.rmtree(os.path.join(args.fixtures, "article"), ignore_errors=True)
+            generate(args.fixtures)
+        results.update(bench_main(args.fixtures, args.latency, args.repeat))
+        if os.path.exists(os.path.join(args.recorded, "manifest.json")):
+            results.update(bench_main(args.recorded, args.latency, args.repeat, prefix="main.recorded"))
+        else:
+            print(f"녹화 픽스처 없음: {args.recorded} (python -m benchmarks.fixtures record)")
+    if "clustering" in only:
+        sizes = [int(n) for n in args.sizes.split(",")]
+        results.update(bench_clustering(sizes, args.repeat))
+    if "vector" in only:
+        results.update(bench_vector([int(n) for n in args.vector_sizes.split(",")], args.repeat))
+    if "web" in only:
+        results.update(bench_web(args.articles, args.repeat))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {"latency": args.latency, "repeat": args.repeat, "articles": args.articles},
+        "results": results,
+    }
+    _write_json(args.output, report)
+    print(f"결과 저장: {args.output}")
+
+    if args.update_baseline:
+        baseline = {"results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in report.items() if k != "results"})
+        baseline["results"] = {**baseline.get("results", {}), **results}
+        _write_json(args.baseline, baseline)
+        print(f"기준 결과 갱신: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"기준 결과 없음: {args.baseline} (--update-baseline으로 저장)")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for name, before, after in regressions:
+        print(f"[회귀] {name}: {before:.4f}초 → {after:.4f}초 ({after / before:.2f}배)")
+    if regressions:
+        sys.exit(1)
+    print("회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import time
+import argparse
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.75
+DEFAULT_BLOCK_SIZE = 1024
+# 중심 갱신 모드는 블록 안에서 바뀌는 중심이 많아 작은 블록이 더 빠름
+UPDATE_BLOCK_SIZE = 128
+
+
+class CentroidMatrix:
+    # 행을 미리 잡아 두고 두 배씩 늘리는 중심 벡터 행렬 (정규화된 행만 저장)
+    def __init__(self, dim, capacity=256, dtype=np.float32):
+        self._data = np.empty((capacity, dim), dtype=dtype)
+        self.size = 0
+
+    @property
+    def vectors(self):
+        return self._data[: self.size]
+
+    def append(self, vec):
+        if self.size == len(self._data):
+            grown = np.empty((len(self._data) * 2, self._data.shape[1]), dtype=self._data.dtype)
+            grown[: self.size] = self._data[: self.size]
+            self._data = grown
+        self._data[self.size] = vec
+        self.size += 1
+        return self.size - 1
+
+    def __setitem__(self, idx, vec):
+        self._data[idx] = vec
+
+
+# 리더(선착순) 군집화
+# - A: (N, d) 정규화된 임베딩, 입력 순서대로 가장 가까운 클러스터에 배정
+# - 최고 유사도가 threshold 미만이면 새 클러스터 생성
+# - update_centroids=False: 클러스터 대표는 첫 기사 벡터 (기존 summary.py 방식)
+#   update_centroids=True: 배정될 때마다 평균 벡터로 중심 갱신
+# - block_size개씩 묶어 기존 중심과의 유사도를 행렬곱 한 번으로 계산하고,
+#   블록 안에서 새로 생기거나 바뀐 중심만 행마다 다시 계산 (결과는 한 행씩 처리한 것과 같음)
+# - initial=(centroids, sums, counts): 이전 실행에서 이어 붙일 클러스터 (summary.py --incremental)
+#   기존 클러스터는 번호 0..k-1을 그대로 쓰고 leaders는 -1, 새 클러스터는 k번부터
+#   update_centroids=False면 sums는 None이어도 됨
+# 반환: (labels, leaders, counts) - 기사별 클러스터 번호, 클러스터별 첫 기사 인덱스, 기사 수
+def leader_cluster(
+    A,
+    threshold=DEFAULT_THRESHOLD,
+    update_centroids=False,
+    block_size=None,
+    initial=None,
+):
+    if block_size is None:
+        block_size = UPDATE_BLOCK_SIZE if update_centroids else DEFAULT_BLOCK_SIZE
+    A = np.asarray(A, dtype=np.float32)
+    n = len(A)
+    labels = np.empty(n, dtype=np.int64)
+    leaders = []
+    counts = []
+    if initial is not None:
+        leaders = [-1] * len(initial[2])
+        counts = list(initial[2])
+    if n == 0:
+        return labels, leaders, counts
+
+    centroids = CentroidMatrix(A.shape[1])
+    sums = CentroidMatrix(A.shape[1]) if update_centroids else None
+    if counts:
+        init_centroids, init_sums, _ = initial
+        for c, vec in enumerate(np.asarray(init_centroids, dtype=np.float32)):
+            centroids.append(vec)
+            if update_centroids:
+                sums.append(init_sums[c] if init_sums is not None else vec * counts[c])
+
+    for start in range(0, n, block_size):
+        block = A[start : start + block_size]
+        k0 = centroids.size
+        base_sims = block @ centroids.vectors.T if k0 else None
+        # 이 블록에서 새로 생기거나 중심이 바뀐 클러스터 (base_sims 값이 낡은 것들)
+        dirty = []
+        dirty_set = set()
+
+        for r, emb in enumerate(block):
+            i = start + r
+            best_idx, best_sim = -1, -np.inf
+            if k0:
+                sims = base_sims[r]
+                if dirty:
+                    # 낡은 값은 덮어써서 기존 방식과 같은 argmax(첫 최댓값)가 나오게 함
+                    sims = sims.copy()
+                    old = [c for c in dirty if c < k0]
+                    if old:
+                        sims[old] = centroids.vectors[old] @ emb
+                best_idx = int(np.argmax(sims))
+                best_sim = sims[best_idx]
+            new = [c for c in dirty if c >= k0]
+            if new:
+                new_sims = centroids.vectors[new] @ emb
+                j = int(np.argmax(new_sims))
+                if new_sims[j] > best_sim:
+                    best_idx, best_sim = new[j], new_sims[j]
+
+            if best_idx >= 0 and best_sim >= threshold:
+                labels[i] = best_idx
+                counts[best_idx] += 1
+                if update_centroids:
+                    sums[best_idx] = sums.vectors[best_idx] + emb
+                    mean = sums.vectors[best_idx]
+                    centroids[best_idx] = mean / np.linalg.norm(mean)
+                    if best_idx not in dirty_set:
+                        dirty_set.add(best_idx)
+                        dirty.append(best_idx)
+            else:
+                idx = centroids.append(emb)
+                if update_centroids:
+                    sums.append(emb)
+                labels[i] = idx
+                leaders.append(i)
+                counts.append(1)
+                dirty_set.add(idx)
+                dirty.append(idx)
+
+    return labels, leaders, counts
+
+
+# 군집화 결과 → summary.py 리포트용 클러스터 목록 (첫 기사 요약 + 나머지 요약)
+def build_clusters(summaries, labels, leaders, counts):
+    clusters = [
+        {"summary": summaries[leader], "count": count, "extras": []}
+        for leader, count in zip(leaders, counts)
+    ]
+    for i, label in enumerate(labels):
+        if i != leaders[label]:
+            clusters[label]["extras"].append(summaries[i])
+    return clusters
+
+
+# 합성 데이터 벤치마크: python clustering.py --n 50000
+def synthetic_embeddings(n, dim, topics, noise, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    A = centers[rng.integers(0, topics, n)]
+    A += noise * rng.standard_normal((n, dim), dtype=np.float32) / np.sqrt(dim)
+    A /= np.linalg.norm(A, axis=1, keepdims=True)
+    return A
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="군집화 벤치마크")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--block-size", type=int, default=None)
+    parser.add_argument("--update-centroids", action="store_true")
+    args = parser.parse_args()
+
+    A = synthetic_embeddings(args.n, args.dim, args.topics, args.noise, seed=0)
+    started = time.perf_counter()
+    labels, leaders, counts = leader_cluster(
+        A,
+        threshold=args.threshold,
+        update_centroids=args.update_centroids,
+        block_size=args.block_size,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"{args.n}개 / {args.dim}차원 → 클러스터 {len(leaders)}개, {elapsed:.2f}초")
@@ -0,0 +1,217 @@
+import os
+import re
+import json
+import time
+import threading
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import timed, count
+
+BASE_URL = "https://news.naver.com/section/"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+# "기사 더보기" 버튼이 부르는 목록 템플릿 (BASE_URL 기준 상대 경로)
+MORE_PATH = "template/SECTION_ARTICLE_LIST_FOR_LATEST"
+# 섹션 첫 페이지 위쪽 헤드라인 묶음 (최신순 목록이 아니라 대부분 이미 저장된 기사)
+HEADLINE_CLASS = re.compile("headline", re.I)
+
+# 네이버 섹션별 세부 카테고리
+SECTION_CATALOG = {
+    "100": {
+        "category": "정치",
+        "subcategories": ["대통령실", "국회/정당", "북한", "행정", "국방/외교", "정치일반"],
+    },
+    "101": {
+        "category": "경제",
+        "subcategories": [
+            "금융", "증권", "산업/재계", "중기/벤처", "부동산", "글로벌 경제", "생활경제", "경제 일반",
+        ],
+    },
+    "102": {
+        "category": "사회",
+        "subcategories": [
+            "사건사고", "교육", "노동", "언론", "환경", "인권/복지", "식품/의료", "지역", "인물", "사회 일반",
+        ],
+    },
+    "103": {
+        "category": "생활/문화",
+        "subcategories": [
+            "건강정보", "자동차/시승기", "도로/교통", "여행/레저", "음식/맛집", "패션/뷰티",
+            "공연/전시", "책", "종교", "날씨", "생활문화 일반",
+        ],
+    },
+    "104": {
+        "category": "세계",
+        "subcategories": ["아시아/호주", "미국/중남미", "유럽", "중동/아프리카", "세계 일반"],
+    },
+    "105": {
+        "category": "IT/과학",
+        "subcategories": [
+            "모바일", "인터넷/SNS", "통신/뉴미디어", "IT일반", "과학일반", "보안/해킹", "컴퓨터", "게임/리뷰",
+        ],
+    },
+}
+
+
+# 수집할 섹션 목록 (NEWS_SECTIONS="105,101" 형식, 기본은 IT/과학)
+def load_sections(sids=None):
+    sids = sids or os.getenv("NEWS_SECTIONS", "105").split(",")
+    sections = []
+    for sid in sids:
+        sid = sid.strip()
+        if sid not in SECTION_CATALOG:
+            raise ValueError(f"알 수 없는 섹션: {sid}")
+        sections.append({"sid": sid, **SECTION_CATALOG[sid]})
+    return sections
+
+
+class HostRateLimiter:
+    # 호스트별 토큰 버킷 (초당 rate개, 최대 burst개까지 몰아서 허용)
+    def __init__(self, rate=5.0, burst=5):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+
+class Crawler:
+    # 여러 섹션을 "더보기" 페이지까지 따라가며 새 기사 링크를 모으는 수집기
+    # - 모든 요청은 커넥션 풀/keep-alive를 쓰는 하나의 Session을 공유
+    # - base_url을 바꾸면 로컬 HTTP 서버 픽스처로도 돌릴 수 있음
+    # - normalize: 섹션 사이 중복을 거를 때 쓰는 URL 정규화 함수
+    def __init__(
+        self,
+        sections,
+        base_url=BASE_URL,
+        session=None,
+        rate_limiter=None,
+        max_pages=10,
+        timeout=10,
+        pool_size=16,
+        normalize=None,
+    ):
+        self.sections = sections
+        self.normalize = normalize or (lambda url: url)
+        self.base_url = base_url
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(HEADERS)
+        self.session = session
+
+    def get(self, url, **kwargs):
+        self.rate_limiter.wait(url)
+        kwargs.setdefault("timeout", self.timeout)
+        with timed("http_get"):
+            res = self.session.get(url, **kwargs)
+        count("http_bytes", len(res.content))
+        res.raise_for_status()
+        return res
+
+    def _first_page(self, sid):
+        return self.get(urljoin(self.base_url, sid)).text
+
+    def _more_page(self, sid, page_no, cursor):
+        params = {"sid": sid, "sid2": "", "cluid": "", "pageNo": page_no, "date": "", "next": cursor or ""}
+        res = self.get(urljoin(self.base_url, MORE_PATH), params=params)
+        try:
+            data = res.json()
+        except json.JSONDecodeError:
+            return res.text
+        return "".join((data.get("renderedComponent") or {}).values())
+
+    # 한 페이지 HTML → (기사 목록, 다음 페이지 커서)
+    # 헤드라인 묶음 안의 기사는 headline=True
+    @staticmethod
+    def parse_list(html):
+        from bs4 import BeautifulSoup  # 목록을 처음 읽을 때 불러옴 (import만 하는 쪽은 bs4 비용 없음)
+
+        soup = BeautifulSoup(html, "html.parser")
+        items = []
+        for tag in soup.select("div.sa_text"):
+            title_tag = tag.select_one("a.sa_text_title")
+            if not title_tag or not title_tag.get("href"):
+                continue
+            items.append(
+                {
+                    "title": title_tag.get_text(strip=True),
+                    "link": title_tag["href"],
+                    "headline": tag.find_parent(class_=HEADLINE_CLASS) is not None,
+                }
+            )
+        cursor_tag = soup.select_one("[data-cursor]")
+        cursor = cursor_tag["data-cursor"] if cursor_tag else None
+        return items, cursor
+
+    # 한 섹션을 최신순 목록이 저장된 기사에 닿을 때까지(또는 max_pages까지) 수집
+    # filter_known(links) → 그중 이미 저장된 링크 집합
+    # seen: 이번 실행에서 다른 섹션이 이미 모은 링크 (후보에서만 빼고, 멈추는 기준에는 넣지 않음)
+    def crawl_section(self, section, filter_known, seen=None):
+        seen = set() if seen is None else seen
+        candidates = []
+        cursor = None
+        for page_no in range(1, self.max_pages + 1):
+            try:
+                if page_no == 1:
+                    html = self._first_page(section["sid"])
+                else:
+                    html = self._more_page(section["sid"], page_no, cursor)
+            except requests.RequestException as e:
+                print(f"목록 수집 실패 ({section['sid']} {page_no}페이지): {e}")
+                break
+
+            items, cursor = self.parse_list(html)
+            if not items:
+                break
+
+            known = filter_known([it["link"] for it in items])
+            for it in items:
+                key = self.normalize(it["link"])
+                if it["link"] in known or key in seen:
+                    continue
+                seen.add(key)
+                candidates.append(
+                    {
+                        "title": it["title"],
+                        "link": it["link"],
+                        "sid": section["sid"],
+                        "section": section["category"],
+                        "subcategories": section["subcategories"],
+                    }
+                )
+
+            # 최신순 목록에서 저장된 기사가 보이면 그 뒤는 이미 수집한 범위
+            # (헤드라인 묶음의 저장된 기사는 기준에서 빼고, 페이지 전체가 저장된 기사면 멈춤)
+            latest = [it for it in items if not it["headline"]]
+            if any(it["link"] in known for it in latest) or all(it["link"] in known for it in items):
+                break
+            if not cursor:
+                break
+        return candidates
+
+    def crawl(self, filter_known):
+        seen = set()
+        candidates = []
+        for section in self.sections:
+            candidates += self.crawl_section(section, filter_known, seen)
+        return candidates
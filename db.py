@@ -0,0 +1,67 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 수집/요약 스크립트용 DB 연결
+def get_db_connection():
+    return pymysql.connect(
+        host=os.getenv("DB_HOST"),
+        port=int(os.getenv("DB_PORT")),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME"),
+    )
+
+
+_shared = None
+_shared_lock = threading.RLock()
+
+
+# 프로세스 안에서 계속 쓰는 DB 연결 (데몬 모드에서 주기마다 새로 연결하지 않음)
+# - with 블록 동안 잠금을 잡으므로 같은 스레드 안에서는 겹쳐 써도 됨
+# - 다른 스레드가 오래 기다리지 않도록 블록 안에는 DB 작업만 둘 것
+#   (크롤링, OpenAI 호출, 배치 대기는 블록 밖에서 하고 필요할 때 다시 with connection())
+# - 오래 쉬어 서버가 끊었으면 ping으로 다시 연결
+@contextmanager
+def connection():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = get_db_connection()
+        else:
+            _shared.ping(reconnect=True)
+        yield _shared
+
+
+def close_connection():
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            try:
+                _shared.close()
+            except Exception:
+                pass
+            _shared = None
+
+
+# 테이블을 고친 뒤 웹 캐시가 새 데이터를 보도록 data_version을 올림 (커밋까지 함)
+def bump_data_version(conn, name):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO data_version (name, version, updated_at)
+            VALUES (%s, 1, UTC_TIMESTAMP())
+            ON DUPLICATE KEY UPDATE version = version + 1, updated_at = UTC_TIMESTAMP()
+            """,
+            (name,),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
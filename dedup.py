@@ -0,0 +1,127 @@
+import hashlib
+import argparse
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from db import get_db_connection
+
+# 비교할 때 버리는 추적용 쿼리 파라미터
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid",
+    "ref", "ref_src", "referrer", "from", "spm", "cmpid", "ncid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# 네이버 기사 호스트(모바일/데스크톱/구 주소)는 모두 하나로 맞춤
+NAVER_NEWS_HOSTS = {"n.news.naver.com", "m.news.naver.com", "news.naver.com", "mnews.naver.com"}
+NAVER_CANONICAL = "https://n.news.naver.com/mnews/article/{oid}/{aid}"
+
+# 한 번에 IN (...)으로 묻는 링크 수
+LOOKUP_CHUNK = 500
+
+
+def _naver_article_id(path, query):
+    parts = [p for p in path.split("/") if p]
+    # /mnews/article/{oid}/{aid}, /article/{oid}/{aid}
+    if "article" in parts:
+        rest = parts[parts.index("article") + 1 :]
+        if len(rest) >= 2 and rest[0].isdigit() and rest[1].isdigit():
+            return rest[0], rest[1]
+    # /main/read.naver?oid=...&aid=...
+    params = dict(parse_qsl(query))
+    if params.get("oid") and params.get("aid"):
+        return params["oid"], params["aid"]
+    return None
+
+
+# 같은 기사를 가리키는 URL을 하나의 형태로 정규화
+def normalize_url(url):
+    url = url.strip()
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+
+    if host in NAVER_NEWS_HOSTS:
+        ids = _naver_article_id(parts.path, parts.query)
+        if ids:
+            return NAVER_CANONICAL.format(oid=ids[0], aid=ids[1])
+
+    if host.startswith("m.") or host.startswith("mobile."):
+        host = host.split(".", 1)[1]
+    if parts.port and not (
+        (parts.scheme == "http" and parts.port == 80)
+        or (parts.scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+        and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+# newsdata.link_hash 값 (정규화 URL의 SHA-1 hex)
+def link_hash(url):
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+# 이번에 수집한 링크 중 이미 저장된 것만 골라 반환 (link_hash 인덱스로 묶어서 조회)
+def find_known_links(conn, links):
+    by_hash = {}
+    for link in links:
+        by_hash.setdefault(link_hash(link), []).append(link)
+    hashes = list(by_hash)
+
+    known = set()
+    cursor = conn.cursor()
+    try:
+        for i in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[i : i + LOOKUP_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"SELECT link_hash FROM newsdata WHERE link_hash IN ({placeholders})",
+                chunk,
+            )
+            for (h,) in cursor.fetchall():
+                known.update(by_hash.get(h, []))
+    finally:
+        cursor.close()
+    return known
+
+
+# link_hash가 비어 있는 기존 행 채우기 (마이그레이션 002 이후 한 번 실행)
+def backfill_link_hashes(conn, batch=1000):
+    cursor = conn.cursor()
+    total = 0
+    try:
+        while True:
+            cursor.execute(
+                "SELECT id, link FROM newsdata WHERE link_hash IS NULL LIMIT %s", (batch,)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(
+                "UPDATE newsdata SET link_hash = %s WHERE id = %s",
+                [(link_hash(link), row_id) for row_id, link in rows],
+            )
+            conn.commit()
+            total += len(rows)
+    finally:
+        cursor.close()
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="newsdata 링크 중복 인덱스 관리")
+    parser.add_argument("--backfill", action="store_true", help="link_hash가 빈 행 채우기")
+    args = parser.parse_args()
+
+    if args.backfill:
+        conn = get_db_connection()
+        try:
+            print(f"link_hash {backfill_link_hashes(conn)}건 채움")
+        finally:
+            conn.close()
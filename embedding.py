@@ -0,0 +1,163 @@
+from llm_cache import get_cache, cache_key
+from openai_scheduler import estimate_tokens, get_scheduler
+from metrics import timed, count
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# 요청 한 번에 보내는 입력 개수 / 토큰 상한 (API 한도 300k 토큰보다 여유 있게)
+MAX_BATCH_SIZE = 100
+MAX_BATCH_TOKENS = 250_000
+# 입력 하나당 토큰 상한 (text-embedding-3 계열 8191)
+MAX_INPUT_TOKENS = 8000
+# 캐시 키에 들어가는 버전 (입력 전처리가 바뀌면 올림)
+PROMPT_VERSION = "embedding-v1"
+
+
+class EmbeddingError(Exception):
+    pass
+
+
+# 입력 하나가 토큰 상한을 넘지 않도록 자르기
+def truncate_text(text, max_tokens=MAX_INPUT_TOKENS):
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+# API에 보내는 형태로 정리 (빈 문자열은 API가 거부하므로 공백 한 칸으로 대체)
+def prepare_text(text):
+    return truncate_text(text) or " "
+
+
+# 개수/토큰 한도를 지키는 배치로 인덱스 나누기
+def make_batches(texts, batch_size=MAX_BATCH_SIZE, max_tokens=MAX_BATCH_TOKENS):
+    batches = []
+    current, current_tokens = [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (
+            len(current) >= batch_size or current_tokens + tokens > max_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _request(client, model, texts):
+    # numpy는 import가 느려서(0.1초 넘게) 실제로 쓸 때 불러옴 (main.py를 import만 하는 경로가 가벼워지도록)
+    # 이 파일의 다른 함수도 같은 이유로 함수 안에서 import
+    import numpy as np
+
+    res = get_scheduler().call(
+        lambda: client.embeddings.create(model=model, input=texts),
+        tokens=sum(estimate_tokens(t) for t in texts),
+        usage_tokens=lambda r: r.usage.total_tokens if getattr(r, "usage", None) else None,
+        kind="embedding",
+    )
+    if getattr(res, "usage", None):
+        count("openai_embedding_tokens", res.usage.total_tokens or 0)
+    data = sorted(res.data, key=lambda r: r.index)
+    return [np.asarray(r.embedding, dtype=np.float32) for r in data]
+
+
+# 실패한 배치는 반으로 나눠 다시 요청하고, 한 건만 남아도 실패하면 None으로 표시
+def _embed_batch(client, model, texts, indices, out):
+    try:
+        vectors = _request(client, model, [texts[i] for i in indices])
+    except Exception as e:
+        if len(indices) == 1:
+            print(f"[임베딩 오류] {e}")
+            return
+        mid = len(indices) // 2
+        _embed_batch(client, model, texts, indices[:mid], out)
+        _embed_batch(client, model, texts, indices[mid:], out)
+        return
+    for i, vec in zip(indices, vectors):
+        out[i] = vec
+
+
+# 텍스트 목록 임베딩 → (N, d) float32 ndarray
+# 끝내 실패한 입력의 행은 NaN으로 채움 (failed_rows로 걸러낼 수 있음)
+@timed("get_embeddings")
+def get_embeddings(
+    client,
+    texts,
+    model=EMBEDDING_MODEL,
+    batch_size=MAX_BATCH_SIZE,
+    max_tokens=MAX_BATCH_TOKENS,
+):
+    import numpy as np
+
+    texts = [prepare_text(t) for t in texts]
+    out = [None] * len(texts)
+
+    # 캐시에 있는 입력은 건너뛰고 나머지만 요청
+    cache = get_cache()
+    keys = []
+    if cache is not None:
+        keys = [cache_key(model, PROMPT_VERSION, t) for t in texts]
+        for i, key in enumerate(keys):
+            value = cache.get(key)
+            if value is not None:
+                out[i] = np.frombuffer(value, dtype=np.float32)
+    missing = [i for i, v in enumerate(out) if v is None]
+
+    pending = [texts[i] for i in missing]
+    for batch in make_batches(pending, batch_size, max_tokens):
+        _embed_batch(client, model, texts, [missing[j] for j in batch], out)
+
+    if cache is not None:
+        for i in missing:
+            if out[i] is not None:
+                cache.set(keys[i], out[i].tobytes())
+
+    done = [v for v in out if v is not None]
+    if texts and not done:
+        raise EmbeddingError(f"임베딩 {len(texts)}건 모두 실패")
+
+    dim = len(done[0]) if done else 0
+    result = np.full((len(texts), dim), np.nan, dtype=np.float32)
+    for i, vec in enumerate(out):
+        if vec is not None:
+            result[i] = vec
+    return result
+
+
+# DB BLOB 저장용 float32 패킹 / 복원 (복원은 복사 없이 버퍼를 그대로 봄)
+def pack_embedding(vec):
+    import numpy as np
+
+    if vec is None:
+        return None
+    return np.asarray(vec, dtype="<f4").tobytes()
+
+
+def unpack_embedding(blob):
+    import numpy as np
+
+    return np.frombuffer(blob, dtype="<f4")
+
+
+def failed_rows(embeddings):
+    import numpy as np
+
+    return np.isnan(embeddings).any(axis=1)
+
+
+# 행 단위 코사인 유사도 (같은 모양의 두 (N, d) 배열)
+def cosine_sim_rows(a, b):
+    import numpy as np
+
+    num = np.einsum("ij,ij->i", a, b)
+    return num / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from openai_scheduler import estimate_chat_tokens, get_scheduler
+from metrics import count
+
+# 캐시 파일 위치 / 비활성화 (LLM_CACHE=0)
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_cache.sqlite3")
+# 오래된 항목, 전체 크기 기준 정리
+DEFAULT_MAX_AGE_DAYS = 14
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# set 몇 번마다 정리할지
+EVICT_EVERY = 500
+
+
+# (모델, 프롬프트 템플릿 버전, 입력) 해시
+def cache_key(model, prompt_version, payload):
+    raw = json.dumps(
+        {"model": model, "version": prompt_version, "input": payload},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        max_age_days=DEFAULT_MAX_AGE_DAYS,
+        max_bytes=DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sets = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._conn.commit()
+            self._sets += 1
+            due = self._sets % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    # 기간이 지난 항목 삭제 후, 전체 크기가 한도를 넘으면 오래 안 쓴 것부터 삭제
+    def evict(self):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (time.time() - self.max_age,)
+            )
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                removed = 0
+                victims = []
+                for key, size in self._conn.execute(
+                    "SELECT key, size FROM cache ORDER BY accessed_at"
+                ):
+                    if removed >= excess:
+                        break
+                    victims.append((key,))
+                    removed += size
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+# 프롬프트 버전별 실제 API 사용량 (캐시 적중은 포함하지 않음)
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+# 프로세스 공용 캐시 (LLM_CACHE=0이면 None)
+def get_cache():
+    global _cache
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH))
+        return _cache
+
+
+# chat.completions.create 캐시 래퍼 → 응답 본문 문자열
+def cached_chat_completion(client, prompt_version, **kwargs):
+    cache = get_cache()
+    key = None
+    if cache is not None:
+        key = cache_key(kwargs.get("model"), prompt_version, kwargs)
+        value = cache.get(key)
+        if value is not None:
+            return value.decode("utf-8")
+
+    # 재시도/RPM·TPM 한도는 공용 스케줄러가 처리
+    res = get_scheduler().call(
+        lambda: client.chat.completions.create(**kwargs),
+        tokens=estimate_chat_tokens(kwargs),
+        usage_tokens=lambda r: r.usage.total_tokens if getattr(r, "usage", None) else None,
+        kind="chat",
+    )
+    record_usage(prompt_version, getattr(res, "usage", None))
+    content = res.choices[0].message.content
+    if cache is not None and content is not None:
+        cache.set(key, content)
+    return content
+
+
+def record_usage(prompt_version, usage):
+    with _usage_lock:
+        entry = _usage.setdefault(prompt_version, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        entry["calls"] += 1
+        if usage is not None:
+            entry["prompt_tokens"] += usage.prompt_tokens or 0
+            entry["completion_tokens"] += usage.completion_tokens or 0
+    if usage is not None:
+        count("openai_prompt_tokens", usage.prompt_tokens or 0, prompt_version=prompt_version)
+        count("openai_completion_tokens", usage.completion_tokens or 0, prompt_version=prompt_version)
+
+
+def usage_stats():
+    with _usage_lock:
+        return {version: dict(entry) for version, entry in _usage.items()}
+
+
+def print_usage_stats():
+    usage = usage_stats()
+    for version, u in sorted(usage.items()):
+        print(f"토큰 사용 ({version}): {u['calls']}회, 입력 {u['prompt_tokens']} / 출력 {u['completion_tokens']}")
+    if usage:
+        total_in = sum(u["prompt_tokens"] for u in usage.values())
+        total_out = sum(u["completion_tokens"] for u in usage.values())
+        print(f"토큰 사용 합계: 입력 {total_in} / 출력 {total_out}")
+
+
+def print_cache_stats():
+    cache = get_cache()
+    if cache is None:
+        return
+    s = cache.stats()
+    print(f"LLM 캐시: 적중 {s['hits']} / 미적중 {s['misses']} (항목 {s['entries']}개)")
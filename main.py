@@ -1,109 +1,156 @@
 import os
-import requests
-import pymysql
-import numpy as np
-from bs4 import BeautifulSoup
-from openai import OpenAI
+import re
+import json
+import time
+import textwrap
+import argparse
+import threading
+from datetime import datetime, timedelta
+from contextlib import closing
 from dotenv import load_dotenv
-from numpy import dot
-from numpy.linalg import norm
+from pipeline import Stage, run_pipeline
+from crawler import Crawler, SECTION_CATALOG, load_sections
+from article_parser import parse_article
+from dedup import find_known_links, link_hash, normalize_url
+from db import connection, close_connection, bump_data_version
+from llm_cache import cached_chat_completion, get_cache, print_cache_stats, print_usage_stats, usage_stats
+from openai_scheduler import get_client, get_scheduler, print_scheduler_stats
+from run_journal import RunJournal, DEFAULT_JOURNAL_PATH
+from batch_mode import BatchRequests, BatchCheckpoints, BATCH_MAX_WAIT, submit as submit_batch, collect as batch_collect
+from token_budget import BUDGETS, CHUNK_WORKERS, count_tokens, fit_lead, plan_chunks, print_budget_stats
+from token_budget import stats as budget_stats
+from metrics import timed, write_report
+from embedding import (
+    EmbeddingError,
+    get_embeddings,
+    failed_rows,
+    cosine_sim_rows,
+    pack_embedding,
+)
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-model_version = "gpt-4.1-mini"
+model_version = "gpt-4o-mini"
 embedding_model = "text-embedding-3-small"
 
-subcategories = [
-    "모바일",
-    "인터넷/SNS",
-    "통신/뉴미디어",
-    "IT일반",
-    "과학일반",
-    "보안/해킹",
-    "컴퓨터",
-    "게임/리뷰",
-]
-subcategories_str = "\n".join(subcategories)
-
-BASE_URL = "https://news.naver.com/section/"
-HEADERS = {"User-Agent": "Mozilla/5.0"}
-SID = "105"  # IT/과학
-CATEGORY = "IT/과학"
+# 기본 세부 카테고리 (IT/과학), 섹션별 목록은 crawler.SECTION_CATALOG
+subcategories = SECTION_CATALOG["105"]["subcategories"]
+
 ARTICLE_LIMIT = 20
+# 실행 도중 DB에 저장하는 단위: 연관성 임베딩 요청 한 번에 텍스트가 FLUSH_TEXTS개쯤 모이도록
+# (기사 한 건에 제목/본문/요약 3개, 중복 기사는 0개), 그 전이라도 버퍼 첫 기사가 FLUSH_SECONDS초 기다렸으면 저장
+FLUSH_TEXTS = 50
+FLUSH_SECONDS = int(os.getenv("FLUSH_SECONDS", 60))
+EMBEDDING_TEXTS_PER_ARTICLE = 3
+# 섹션별 "더보기" 최대 페이지 수
+MAX_PAGES = 10
+
+# 본문 근사 중복 판별 (0이면 끔): 중복 기사는 LLM 단계를 건너뛰고 대표 기사 결과를 씀
+# near_dup은 numpy를 불러오므로 쓰는 함수 안에서 import (main import 시간을 줄임)
+NEAR_DUP = os.getenv("NEAR_DUP", "1") == "1"
+
+# 데몬 모드 실행 간격(초) / 전날 요약을 만드는 시각(시)
+DAEMON_INTERVAL = int(os.getenv("DAEMON_INTERVAL", 3600))
+SUMMARY_HOUR = int(os.getenv("SUMMARY_HOUR", 2))
+
+_crawler = None
+_crawler_lock = threading.Lock()
+
+
+# 목록/기사 요청이 함께 쓰는 수집기 (커넥션 풀 + 호스트별 요청 속도 제한), 처음 쓸 때 만듦
+def get_crawler():
+    global _crawler
+    with _crawler_lock:
+        if _crawler is None:
+            _crawler = Crawler(load_sections(), max_pages=MAX_PAGES, normalize=normalize_url)
+        return _crawler
+
+# LLM 캐시 키에 들어가는 프롬프트 템플릿 버전 (프롬프트를 고치면 올릴 것)
+SUMMARIZE_PROMPT_VERSION = "summarize-v2"
+SUMMARIZE_CHUNK_PROMPT_VERSION = "summarize-chunk-v2"
+CLASSIFY_PROMPT_VERSION = "classify-v1"
+EVALUATE_PROMPT_VERSION = "evaluate-v2"
+ANALYZE_PROMPT_VERSION = "analyze-v2"
+
+# 프롬프트 템플릿 (들여쓰기를 먼저 걷어낸 뒤 값을 넣음 → 여러 줄 값이 들어가도 줄 앞 공백이 남지 않음)
+SUMMARIZE_PROMPT = textwrap.dedent(
+    """
+    다음은 뉴스 기사 전문이다. 이 내용을 한국어로 **핵심만 요약**하라.
 
+    - 홍보성 문장, 배경 설명은 생략하고 **핵심 사실**만 남긴다.  
+    - **최대 5문장**으로 요약하라.
+    - 기사 스타일을 따라하지 말고 **객관적 요약문**으로 작성하라.
+    기사 전문:
+    {text}
+    """
+).strip()
 
-# DB 중복 링크 불러오기
-def load_existing_links_from_db():
-    conn = pymysql.connect(
-        host=os.getenv("DB_HOST"),
-        port=int(os.getenv("DB_PORT")),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME"),
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT link FROM newsdata")
-    links = {row[0] for row in cursor.fetchall()}
-    cursor.close()
-    conn.close()
-    return links
+SUMMARIZE_CHUNK_PROMPT = textwrap.dedent(
+    """
+    다음은 긴 뉴스 기사를 나눈 {total}개 부분 중 {index}번째이다.
+    이 부분의 **핵심 사실**만 한국어로 **최대 3문장**으로 요약하라.
+    - 홍보성 문장, 배경 설명은 생략한다.
+    기사 일부:
+    {chunk}
+    """
+).strip()
 
+ANALYZE_PROMPT = textwrap.dedent(
+    """
+    다음 뉴스 기사를 분석하여 JSON으로 답하라.
+
+    summary: 기사 핵심만 한국어로 요약한다.
+    - 홍보성 문장, 배경 설명은 생략하고 **핵심 사실**만 남긴다.
+    - **최대 5문장**으로 요약하라.
+    - 기사 스타일을 따라하지 말고 **객관적 요약문**으로 작성하라.
+    subcategory: 아래 목록 중 정확히 하나를 고른다.
+    {subcategories}
+    headline_score: 제목의 자극성을 0~10 정수로 평가한다.
+
+    뉴스 제목: {title}
+    기사 전문:
+    {content}
+    """
+).strip()
 
-# 기사 상세 내용 크롤링
-def fetch_article_details(url):
-    res = requests.get(url, headers=HEADERS)
-    soup = BeautifulSoup(res.text, "html.parser")
-
-    publish_time = soup.select_one("span.media_end_head_info_datestamp_time")
-    journalist = soup.select_one("em.media_end_head_journalist_name")
-    press = soup.select_one("span.media_end_head_top_logo_text")
-    content_area = soup.select_one("div#newsct_article")
-
-    content = (
-        " ".join(
-            p.get_text(strip=True)
-            for p in content_area.find_all("p")
-            if p.get_text(strip=True)
-        )
-        if content_area
-        else ""
-    )
 
-    return {
-        "publish_time": (
-            publish_time["data-date-time"]
-            if publish_time and publish_time.has_attr("data-date-time")
-            else "Unknown"
-        ),
-        "journalist": journalist.get_text(strip=True) if journalist else "Unknown",
-        "press": press.get_text(strip=True) if press else "Unknown",
-        "content": content
-        or (content_area.get_text(strip=True) if content_area else ""),
-    }
+# 기사 상세 내용 크롤링 (본문이 끝나면 나머지 HTML은 파싱하지 않음)
+@timed("fetch_article")
+def fetch_article_details(url):
+    return parse_article(get_crawler().get(url).text)
 
 
 # GPT 요약
-import textwrap
-from openai import OpenAI
+@timed("gpt_summarize")
+def gpt_summarize(text: str) -> str:
+    chunks = plan_chunks("summarize", text)
+    if chunks:
+        # 긴 기사: 조각별 요약을 모아 다시 요약
+        text = condense_chunks(chunks)
 
-client = OpenAI()  # 이미 생성해둔 객체면 필요 없음
-model_version = "gpt-4o-mini"  # 사용 중인 모델
+    prompt = SUMMARIZE_PROMPT.format(text=text)
 
+    content = cached_chat_completion(
+        get_client(),
+        SUMMARIZE_PROMPT_VERSION,
+        model=model_version,
+        messages=[
+            {"role": "system", "content": "너는 핵심 정보만 요약하는 뉴스 요약기다."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+    )
 
-def gpt_summarize(text: str) -> str:
-    prompt = textwrap.dedent(
-        f"""
-        다음은 뉴스 기사 전문이다. 이 내용을 한국어로 **핵심만 요약**하라.
-
-        - 홍보성 문장, 배경 설명은 생략하고 **핵심 사실**만 남긴다.  
-        - **최대 5문장**으로 요약하라.
-        - 기사 스타일을 따라하지 말고 **객관적 요약문**으로 작성하라.
-        기사 전문:
-        {text}
-    """
-    ).strip()
+    # 결과에는 이미 LF가 들어 있으므로 그대로 반환
+    return content.strip()
 
-    res = client.chat.completions.create(
+
+# 긴 기사 조각 하나 요약
+def gpt_summarize_chunk(chunk, index, total):
+    prompt = SUMMARIZE_CHUNK_PROMPT.format(total=total, index=index, chunk=chunk)
+
+    content = cached_chat_completion(
+        get_client(),
+        SUMMARIZE_CHUNK_PROMPT_VERSION,
         model=model_version,
         messages=[
             {"role": "system", "content": "너는 핵심 정보만 요약하는 뉴스 요약기다."},
@@ -111,13 +158,23 @@ def gpt_summarize(text: str) -> str:
         ],
         temperature=0.3,
     )
+    return content.strip()
 
-    # 결과에는 이미 LF가 들어 있으므로 그대로 반환
-    return res.choices[0].message.content.strip()
+
+# 조각 요약을 동시에 요청해서 원래 순서대로 이어 붙임
+def condense_chunks(chunks):
+    partials = get_scheduler().map(
+        lambda args: gpt_summarize_chunk(*args),
+        [(chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)],
+        workers=CHUNK_WORKERS,
+    )
+    return "\n".join(partials)
 
 
 # GPT 카테고리 분류
-def gpt_classify(summary):
+@timed("gpt_classify")
+def gpt_classify(summary, subcategories=subcategories):
+    subcategories_str = "\n".join(subcategories)
     prompt = f"""다음 뉴스 요약을 보고 정확히 아래 목록 중 하나의 세부 카테고리를 선택하라.
 출력 형식: 카테고리: (이름만)
 
@@ -127,7 +184,9 @@ def gpt_classify(summary):
 뉴스 요약:
 {summary}
 """
-    res = client.chat.completions.create(
+    content = cached_chat_completion(
+        get_client(),
+        CLASSIFY_PROMPT_VERSION,
         model=model_version,
         messages=[
             {"role": "system", "content": "카테고리를 분류하는 시스템이다."},
@@ -135,26 +194,13 @@ def gpt_classify(summary):
         ],
         temperature=0,
     )
-    return res.choices[0].message.content.strip().split(":")[-1].strip()
-
-
-# 임베딩
-def get_embedding(text):
-    try:
-        res = client.embeddings.create(model=embedding_model, input=text)
-        return np.array(res.data[0].embedding)
-    except Exception as e:
-        print(f"[임베딩 오류] {e}")
-        return None
-
+    return content.strip().split(":")[-1].strip()
 
-# 코사인 유사도 계산
-def cosine_sim(v1, v2):
-    return dot(v1, v2) / (norm(v1) * norm(v2))
 
-
-# GPT 자극성/연관성 평가
-def gpt_evaluate(title, content):
+# GPT 자극성 평가 (본문은 앞부분만)
+@timed("gpt_headline_score")
+def gpt_headline_score(title, content):
+    content = fit_lead("evaluate", content)
     prompt = f"""뉴스 제목: {title}
 뉴스 본문: {content}
 
@@ -163,7 +209,9 @@ def gpt_evaluate(title, content):
 형식:
 자극성: (숫자)
 """
-    res = client.chat.completions.create(
+    content = cached_chat_completion(
+        get_client(),
+        EVALUATE_PROMPT_VERSION,
         model=model_version,
         messages=[
             {"role": "system", "content": "뉴스 평가 시스템이다."},
@@ -171,120 +219,700 @@ def gpt_evaluate(title, content):
         ],
         temperature=0.3,
     )
-    lines = res.choices[0].message.content.strip().split("\n")
-    headline_score = int([l for l in lines if "자극성" in l][0].split(":")[1])
-    relevance_score = (
-        cosine_sim(get_embedding(title), get_embedding(content)) * 100
-    )  # 0~1 범위를 0~10으로 변환
-    return headline_score, int(relevance_score)
+    lines = content.strip().split("\n")
+    return int([l for l in lines if "자극성" in l][0].split(":")[1])
+
+
+# 요약/분류/자극성 통합 응답 스키마
+def analyze_schema(subcategories):
+    return {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "subcategory": {"type": "string", "enum": subcategories},
+            "headline_score": {"type": "integer"},
+        },
+        "required": ["summary", "subcategory", "headline_score"],
+        "additionalProperties": False,
+    }
+
+
+# 통합 분석 요청 인자 (실시간 호출과 Batch API 요청이 같은 캐시 키를 쓰도록 한 곳에서 만듦)
+def analyze_request(title, content, subcategories=subcategories):
+    prompt = ANALYZE_PROMPT.format(subcategories="\n".join(subcategories), title=title, content=content)
+
+    return {
+        "model": model_version,
+        "messages": [
+            {"role": "system", "content": "뉴스를 요약, 분류, 평가하는 시스템이다."},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.3,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "article_analysis",
+                "strict": True,
+                "schema": analyze_schema(subcategories),
+            },
+        },
+    }
+
+
+# GPT 요약/분류/자극성 평가를 한 번에 (JSON 스키마 구조화 출력)
+# 긴 기사는 조각 요약을 이어 붙인 글을 기사 전문 대신 넘김
+@timed("gpt_analyze")
+def gpt_analyze(title, content, subcategories=subcategories):
+    chunks = plan_chunks("analyze", content)
+    if chunks:
+        content = condense_chunks(chunks)
+    raw = cached_chat_completion(
+        get_client(), ANALYZE_PROMPT_VERSION, **analyze_request(title, content, subcategories)
+    )
+
+    data = json.loads(raw)
+    summary = data["summary"].strip()
+    category = data["subcategory"]
+    headline_score = data["headline_score"]
+    if not summary:
+        raise ValueError("빈 요약")
+    if category not in subcategories:
+        raise ValueError(f"알 수 없는 카테고리: {category}")
+    # JSON true/false도 파이썬에서는 int라서 bool은 따로 거름
+    if not isinstance(headline_score, int) or isinstance(headline_score, bool) or not 0 <= headline_score <= 10:
+        raise ValueError(f"자극성 범위 오류: {headline_score}")
+    return summary, category, headline_score
+
+
+# 통합 호출이 실패하거나 검증을 통과하지 못하면 기존 3회 호출로 대체
+@timed("analyze_combined")
+def analyze_combined(title, content, subcategories=subcategories):
+    try:
+        return gpt_analyze(title, content, subcategories)
+    except Exception as e:
+        print(f"[통합 분석 실패, 개별 호출로 대체] {e}")
+    summary = gpt_summarize(content)
+    return (
+        summary,
+        gpt_classify(summary, subcategories),
+        gpt_headline_score(title, content),
+    )
+
+
+# 제목-본문 임베딩 연관성 + 저장할 요약문 임베딩 (실행 전체 기사의 제목/본문/요약을 한 번에 배치 임베딩)
+# newsdata.embedding에는 summary.py가 군집화하고 채워 넣는 것과 같은 요약문(저장 형식) 벡터를 넣음
+# 임베딩에 실패한 기사는 결과에서 제외
+@timed("gpt_relevance_scores")
+def gpt_relevance_scores(items):
+    if not items:
+        return []
+    n = len(items)
+    texts = (
+        [it["title"] for it in items]
+        + [it["detail"]["content"] for it in items]
+        + [format_summary(it["summary"]) for it in items]
+    )
+    try:
+        embs = get_embeddings(get_client(), texts, model=embedding_model)
+    except EmbeddingError as e:
+        print(f"에러 발생: {e}")
+        return []
+    title_embs, content_embs, summary_embs = embs[:n], embs[n : 2 * n], embs[2 * n :]
+
+    failed = failed_rows(title_embs) | failed_rows(content_embs) | failed_rows(summary_embs)
+    scores = cosine_sim_rows(title_embs, content_embs) * 100  # 0~1 범위를 0~100으로 변환
+
+    scored = []
+    for i, (item, score, bad) in enumerate(zip(items, scores, failed)):
+        if bad:
+            print(f"에러 발생: 임베딩 실패로 제외 - {item['title']}")
+            continue
+        scored.append({**item, "relevance_score": int(score), "embedding": summary_embs[i]})
+    return scored
+
+
+# 요약문 문단 나누기 (기존 REGEXP_REPLACE(summary, '\\.[[:space:]]*', '.\n\n')와 같은 결과)
+_SENTENCE_END = re.compile(r"\.[ \t\n\r\f\v]*")
+
+
+def format_summary(summary):
+    return _SENTENCE_END.sub(".\n\n", summary)
+
+
+# 한 번에 보내는 행 수 (executemany가 여러 행 INSERT 한 문장으로 묶음)
+INSERT_CHUNK = 500
+
+INSERT_SQL = """
+INSERT INTO newsdata (
+    press, subcategory, title, link, publish_time,
+    journalist, summary, headline_score, relevance_score, embedding,
+    link_hash, relevance_percent, relevance_hue, stimulus_hue,
+    content_minhash, canonical_hash
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    subcategory = VALUES(subcategory),
+    summary = VALUES(summary),
+    headline_score = VALUES(headline_score),
+    relevance_score = VALUES(relevance_score),
+    embedding = VALUES(embedding),
+    relevance_percent = VALUES(relevance_percent),
+    relevance_hue = VALUES(relevance_hue),
+    stimulus_hue = VALUES(stimulus_hue),
+    content_minhash = VALUES(content_minhash),
+    canonical_hash = VALUES(canonical_hash)
+"""
+
+
+# 화면 표시용 값 (연관성 0~100 환산, 점 색상 hue), 저장할 때 한 번만 계산
+# migrations/005의 기존 행 채우기와 같은 식
+def display_scores(relevance_score, headline_score):
+    relevance = min(max(relevance_score / 75 * 100, 0), 100)
+    return int(relevance), 120 * (relevance / 100), 120 - (headline_score / 10) * 120
+
+
+def article_row(a):
+    return (
+        a["언론사"],
+        a["세부카테고리"],
+        a["제목"],
+        a["URL"],
+        a["발행시간"],
+        a["기자"],
+        format_summary(a["요약"]),
+        int(a["자극성"]),
+        int(a["연관성"]),
+        pack_embedding(a["임베딩"]),
+        link_hash(a["URL"]),
+        *display_scores(int(a["연관성"]), int(a["자극성"])),
+        bytes.fromhex(a["본문서명"]) if a.get("본문서명") else None,
+        a.get("대표기사") or link_hash(a["URL"]),
+    )
 
 
 # DB 저장
+# 청크 단위로 한 번에 넣고 청크마다 커밋, 청크가 실패하면 되돌린 뒤 행 단위로 다시 넣어 실패 행을 찾음
+# 반환: (저장된 기사 수, [(기사, 오류)])
+@timed("insert_to_db")
 def insert_to_db(articles):
-    conn = pymysql.connect(
-        host=os.getenv("DB_HOST"),
-        port=int(os.getenv("DB_PORT")),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME"),
-    )
+    with connection() as conn:
+        return _insert_rows(conn, articles)
+
+
+def _insert_rows(conn, articles):
     cursor = conn.cursor()
+    saved = 0
+    failures = []
+    groups = []
 
-    insert_sql = """
-    INSERT INTO newsdata (
-        press, subcategory, title, link, publish_time,
-        journalist, summary, headline_score, relevance_score
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
+    try:
+        for start in range(0, len(articles), INSERT_CHUNK):
+            chunk = articles[start : start + INSERT_CHUNK]
+            rows = []
+            for a in chunk:
+                try:
+                    rows.append((a, article_row(a)))
+                except Exception as e:
+                    failures.append((a, e))
+
+            try:
+                cursor.executemany(INSERT_SQL, [row for _, row in rows])
+                conn.commit()
+                saved += len(rows)
+                groups += [row[-1] for _, row in rows]
+                continue
+            except Exception as e:
+                conn.rollback()
+                print(f"DB 일괄 저장 실패, 행 단위로 재시도: {e}")
+
+            for a, row in rows:
+                try:
+                    cursor.execute(INSERT_SQL, row)
+                    conn.commit()
+                    saved += 1
+                    groups.append(row[-1])
+                except Exception as e:
+                    conn.rollback()
+                    failures.append((a, e))
+        if saved:
+            try:
+                from near_dup import update_outlet_counts
+
+                update_outlet_counts(conn, groups)
+            except Exception as e:
+                print(f"언론사 수 갱신 실패: {e}")
+            try:
+                bump_data_version(conn, "newsdata")
+            except Exception as e:
+                print(f"데이터 버전 갱신 실패: {e}")
+    finally:
+        cursor.close()
+
+    for a, e in failures:
+        print(f"DB 저장 실패: {a['제목']} - {e}")
+    return saved, failures
+
+
+# 이미 저장된 링크 (목록 페이지마다 잠깐만 공용 DB 연결을 씀)
+def known_links(links):
+    with connection() as conn:
+        return find_known_links(conn, links)
+
+
+# 섹션별 목록 페이지를 따라가며 새 기사 후보 수집
+# 중복 확인은 이번에 찾은 링크만 DB에 묶어서 물어봄 (테이블 크기와 무관)
+def collect_candidates():
+    return get_crawler().crawl(known_links)
+
+
+def build_article(item):
+    detail = item["detail"]
+    return {
+        "언론사": detail["press"],
+        "세부카테고리": item["category"],
+        "제목": item["title"],
+        "URL": item["link"],
+        "발행시간": detail["publish_time"],
+        "기자": detail["journalist"],
+        "요약": item["summary"],
+        "자극성": item["headline_score"],
+        "연관성": item["relevance_score"],
+        "임베딩": item["embedding"],
+        "본문서명": item.get("minhash"),
+        "대표기사": item.get("duplicate_of"),
+    }
 
-    update_sql = """
-    UPDATE newsdata
-    SET summary = REGEXP_REPLACE(summary, '\\\\.[[:space:]]*', '.\\n\\n')
-    WHERE id = LAST_INSERT_ID()
-    """
 
-    for a in articles:
-        try:
-            cursor.execute(
-                insert_sql,
-                (
-                    a["언론사"],
-                    a["세부카테고리"],
-                    a["제목"],
-                    a["URL"],
-                    a["발행시간"],
-                    a["기자"],
-                    a["요약"],
-                    int(a["자극성"]),
-                    int(a["연관성"]),
-                ),
-            )
-            cursor.execute(update_sql)
-            print(f"DB 저장 완료: {a['제목']}")
-        except Exception as e:
-            print(f"DB 저장 실패: {e}")
-            continue
+class EmptyContentError(Exception):
+    pass
 
-    conn.commit()
-    cursor.close()
-    conn.close()
 
+# 파이프라인 단계별 처리 함수 (직렬 경로와 같은 순서로 호출)
+# 임베딩은 실행 전체를 모아 배치로 처리하므로 단계에 포함하지 않음
+def stage_fetch(item):
+    detail = fetch_article_details(item["link"])
+    if not detail["content"]:
+        raise EmptyContentError(item["link"])
+    return {**item, "detail": detail}
 
-# 실행 메인
-def main():
-    existing_links = load_existing_links_from_db()
-    soup = BeautifulSoup(
-        requests.get(BASE_URL + SID, headers=HEADERS).text, "html.parser"
+
+def stage_summarize(item):
+    return {**item, "summary": gpt_summarize(item["detail"]["content"])}
+
+
+def stage_classify_evaluate(item):
+    category = gpt_classify(item["summary"], item["subcategories"])
+    headline_score = gpt_headline_score(item["title"], item["detail"]["content"])
+    return {**item, "category": category, "headline_score": headline_score}
+
+
+def stage_analyze(item):
+    summary, category, headline_score = analyze_combined(
+        item["title"], item["detail"]["content"], item["subcategories"]
     )
-    articles = soup.select("div.sa_text")
+    return {
+        **item,
+        "summary": summary,
+        "category": category,
+        "headline_score": headline_score,
+    }
+
+
+# 근사 중복 기사는 LLM 단계를 건너뜀 (저장할 때 대표 기사 결과를 복사)
+def skip_duplicates(func):
+    def run(item):
+        return item if item.get("duplicate_of") else func(item)
 
-    new_articles = []
+    return run
+
+
+# 근사 중복 판별기 (최근 DB 기사 서명을 불러옴), NEAR_DUP=0이면 None
+def new_duplicate_finder():
+    if not NEAR_DUP:
+        return None
+    from near_dup import DuplicateFinder
 
-    for tag in articles:
-        if len(new_articles) >= ARTICLE_LIMIT:
+    with connection() as conn:
+        finder = DuplicateFinder(
+            conn, embed=lambda texts: get_embeddings(get_client(), texts, model=embedding_model)
+        )
+    print(f"근사 중복 비교 대상 {len(finder.index)}건")
+    return finder
+
+
+# 단계별 동시 작업자 수
+PIPELINE_WORKERS = {
+    "fetch": 8,
+    "summarize": 4,
+    "classify_evaluate": 4,
+    "analyze": 8,
+}
+
+
+def print_stage_error(stage_name, item, e):
+    # 본문 없는 기사는 직렬 경로처럼 조용히 건너뜀
+    if not isinstance(e, EmptyContentError):
+        print(f"에러 발생: [{stage_name}] {e}")
+
+
+# 처리 단계 목록 (journal이 있으면 단계마다 결과를 기록하고, 기록된 단계는 건너뜀)
+# duplicates(DuplicateFinder)가 있으면 본문을 받은 뒤 근사 중복을 판별
+# (본문을 받은 순서와 상관없이 입력 순서대로 판별 → 직렬 경로와 같은 기사가 대표)
+def build_stages(combined=False, workers=None, journal=None, duplicates=None):
+    workers = {**PIPELINE_WORKERS, **(workers or {})}
+    stages = [Stage("fetch", stage_fetch, workers["fetch"])]
+    if duplicates is not None:
+        stages.append(Stage("dedup", duplicates.check, 1, ordered=True))
+    if combined:
+        stages.append(Stage("analyze", skip_duplicates(stage_analyze), workers["analyze"]))
+    else:
+        stages += [
+            Stage("summarize", skip_duplicates(stage_summarize), workers["summarize"]),
+            Stage(
+                "classify_evaluate",
+                skip_duplicates(stage_classify_evaluate),
+                workers["classify_evaluate"],
+            ),
+        ]
+    if journal is not None:
+        stages = [Stage(s.name, journal.stage(s.name, s.func), s.workers, ordered=s.ordered) for s in stages]
+    return stages
+
+
+# 처리가 끝난 기사를 하나씩 내보냄 (limit개까지)
+def iter_serial(candidates, combined=False, journal=None, limit=ARTICLE_LIMIT, duplicates=None):
+    stages = build_stages(combined, journal=journal, duplicates=duplicates)
+    count = 0
+    for item in candidates:
+        if count >= limit:
             break
 
-        title_tag = tag.select_one("a.sa_text_title")
-        if not title_tag:
+        try:
+            for stage in stages:
+                item = stage.func(item)
+        except EmptyContentError:
+            continue
+        except Exception as e:
+            print(f"에러 발생: {e}")
             continue
 
-        title = title_tag.get_text(strip=True)
-        link = title_tag["href"]
-        if link in existing_links:
+        count += 1
+        print(f"수집 완료: {item['title']}")
+        yield item
+
+
+def iter_pipeline(
+    candidates, workers=None, combined=False, journal=None, limit=ARTICLE_LIMIT, duplicates=None
+):
+    stages = build_stages(combined, workers, journal, duplicates)
+    if limit <= 0:
+        return
+    count = 0
+    # 결과는 입력 순서대로 나오므로 직렬 경로와 같은 limit개가 선택됨
+    # 동시 처리 개수를 limit로 묶어 한도 이후 기사에 드는 호출을 줄임
+    results = run_pipeline(candidates, stages, max_in_flight=limit, on_error=print_stage_error)
+    with closing(results):
+        for item in results:
+            count += 1
+            print(f"수집 완료: {item['title']}")
+            yield item
+            if count >= limit:
+                break
+
+
+# 본문까지 받은 기사 ARTICLE_LIMIT개 (처리 순서는 직렬 경로와 같음)
+def fetch_candidates(candidates):
+    fetched = []
+    results = run_pipeline(
+        candidates,
+        [Stage("fetch", stage_fetch, PIPELINE_WORKERS["fetch"])],
+        max_in_flight=ARTICLE_LIMIT,
+        on_error=print_stage_error,
+    )
+    with closing(results):
+        for item in results:
+            fetched.append(item)
+            if len(fetched) >= ARTICLE_LIMIT:
+                break
+    return fetched
+
+
+# 통합 분석 + 제목/본문 임베딩 요청을 배치로 모음 (조각 요약이 필요한 긴 기사는 실시간 처리)
+def batch_requests(items):
+    requests = BatchRequests(get_cache())
+    for i, item in enumerate(items):
+        if item.get("duplicate_of"):
             continue
+        content = item["detail"]["content"]
+        if count_tokens(content) <= BUDGETS["analyze"]:
+            requests.add_chat(
+                f"analyze-{i}",
+                ANALYZE_PROMPT_VERSION,
+                analyze_request(item["title"], content, item["subcategories"]),
+            )
+        requests.add_embedding(f"title-{i}", item["title"], embedding_model)
+        requests.add_embedding(f"content-{i}", content, embedding_model)
+    return requests
 
-        try:
-            detail = fetch_article_details(link)
-            if not detail["content"]:
-                continue
 
-            summary = gpt_summarize(detail["content"])
-            category = gpt_classify(summary)
-            headline_score, relevance_score = gpt_evaluate(title, detail["content"])
-
-            new_articles.append(
-                {
-                    "언론사": detail["press"],
-                    "세부카테고리": category,
-                    "제목": title,
-                    "URL": link,
-                    "발행시간": detail["publish_time"],
-                    "기자": detail["journalist"],
-                    "요약": summary,
-                    "자극성": headline_score,
-                    "연관성": relevance_score,
-                }
+# 분석 결과가 캐시에 들어온 기사들을 평소 경로로 처리해 저장 (캐시에 없는 요청만 실시간 호출)
+# 근사 중복 기사는 대표 기사 결과를 복사 (대표 기사가 실패하면 함께 빠짐)
+def save_batch_items(items):
+    analyzed = []
+    for item in items:
+        if item.get("duplicate_of"):
+            continue
+        try:
+            analyzed.append(stage_analyze(item))
+            print(f"수집 완료: {item['title']}")
+        except Exception as e:
+            print(f"에러 발생: {e}")
+    scored = gpt_relevance_scores(analyzed)
+    copies = resolve_copies([a for a in items if a.get("duplicate_of")], scored, final=True)
+    articles = [build_article(a) for a in scored + copies]
+    return insert_to_db(articles)
+
+
+# 공용 DB 연결로 체크포인트 작업 하나 (배치를 기다리거나 기사를 처리하는 동안은 연결을 잡지 않음)
+def with_checkpoints(action):
+    with connection() as conn:
+        return action(BatchCheckpoints(conn))
+
+
+# 배치가 끝난 실행만 저장하고 체크포인트를 닫음 (기다리지 않고 상태만 확인)
+# → (저장 수, 실패 수, 아직 안 끝난 실행)
+def finish_batch_runs(client, runs):
+    saved = failed = 0
+    left = []
+    for run in runs:
+        manifest = run["manifest"]
+        if batch_collect(client, run["batch_ids"], manifest["keys"], max_wait=0):
+            s, f = save_batch_items(manifest["items"])
+            saved, failed = saved + s, failed + len(f)
+            with_checkpoints(lambda c: c.finish(run["id"]))
+        else:
+            left.append(run)
+    return saved, failed, left
+
+
+# Batch API 모드: 이전 실행에서 제출한 배치 중 끝난 것을 먼저 저장한 뒤 이번 기사를 제출하고 기다림
+# - 기다리는 시간은 실행 전체에서 BATCH_MAX_WAIT초까지 (이전 배치 때문에 늘어나지 않음)
+# - 이번 배치를 기다린 뒤 이전 배치 상태를 한 번 더 확인
+# 제출 내역은 batch_runs에 남아 러너가 다시 시작돼도 이어서 처리 (저장은 링크 기준 upsert라 반복해도 안전)
+def run_batch():
+    if get_cache() is None:
+        raise SystemExit("배치 모드는 LLM 캐시가 필요합니다 (LLM_CACHE=0 해제)")
+
+    client = get_client()
+    deadline = time.monotonic() + BATCH_MAX_WAIT
+    saved, failed, pending = finish_batch_runs(client, with_checkpoints(lambda c: c.pending()))
+    pending_links = {item["link"] for run in pending for item in run["manifest"]["items"]}
+
+    candidates = [c for c in collect_candidates() if c["link"] not in pending_links]
+    items = fetch_candidates(candidates)
+    finder = new_duplicate_finder()
+    if finder is not None:
+        items = [finder.check(item) for item in items]
+    if items:
+        requests = batch_requests(items)
+        batch_ids = submit_batch(client, requests, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        manifest = {"items": items, "keys": requests.keys}
+        run_id = with_checkpoints(lambda c: c.create(batch_ids, manifest))
+        if batch_collect(client, batch_ids, requests.keys, max_wait=max(deadline - time.monotonic(), 0)):
+            s, f = save_batch_items(items)
+            saved, failed = saved + s, failed + len(f)
+            with_checkpoints(lambda c: c.finish(run_id))
+        else:
+            print("이번 배치는 다음 실행에서 이어서 처리")
+
+    if pending:
+        s, f, pending = finish_batch_runs(client, pending)
+        saved, failed = saved + s, failed + f
+    if pending:
+        print(f"끝나지 않은 이전 배치 {len(pending)}건은 다음 실행에서 이어서 처리")
+    return saved, failed
+
+
+# 중복 기사에 대표 기사 결과 복사 (이번 실행 결과 canonical 또는 DB에 저장된 대표 기사)
+# waiting에 남은 기사는 대표 기사가 아직 끝나지 않은 것, final이면 버림 (다음 실행에서 다시 수집)
+def resolve_copies(waiting, scored, canonical=None, final=False):
+    canonical = {} if canonical is None else canonical
+    canonical.update((link_hash(a["link"]), a) for a in scored)
+    if not waiting:
+        return []
+    from near_dup import resolve_duplicates
+
+    with connection() as conn:
+        copies, left = resolve_duplicates(conn, waiting, canonical)
+    for a in copies:
+        print(f"중복 기사: {a['title']} → 대표 기사 결과 사용")
+    if final:
+        for a in left:
+            print(f"중복 기사 제외 (대표 기사 실패): {a['title']}")
+        left = []
+    waiting[:] = left
+    return copies
+
+
+# 끝난 기사를 모아 연관성 계산 후 바로 저장 (실행 도중 실패해도 저장된 기사는 남음)
+# 임베딩 텍스트가 FLUSH_TEXTS개 모이거나 FLUSH_SECONDS초가 지나면 저장 (시간은 다음 기사가 끝날 때 확인)
+# 근사 중복 기사는 대표 기사 결과가 나올 때까지 기다렸다가 같이 저장
+def save_in_batches(items, journal):
+    saved, failures, buffer = 0, [], []
+    canonical, waiting = {}, []
+
+    def flush(final=False):
+        nonlocal saved
+        waiting.extend(a for a in buffer if a.get("duplicate_of"))
+        scored = gpt_relevance_scores([a for a in buffer if not a.get("duplicate_of")])
+        copies = resolve_copies(waiting, scored, canonical, final)
+        articles = [build_article(a) for a in scored + copies]
+        s, f = insert_to_db(articles)
+        saved += s
+        failures.extend(f)
+        failed_links = {a["URL"] for a, _ in f}
+        journal.mark_saved([a["URL"] for a in articles if a["URL"] not in failed_links])
+        buffer.clear()
+
+    started = None
+    for item in items:
+        if not buffer:
+            started = time.monotonic()
+        buffer.append(item)
+        texts = EMBEDDING_TEXTS_PER_ARTICLE * sum(1 for a in buffer if not a.get("duplicate_of"))
+        if texts >= FLUSH_TEXTS or time.monotonic() - started >= FLUSH_SECONDS:
+            flush()
+    if buffer or waiting:
+        flush(final=True)
+    return saved, failures
+
+
+# 실시간 수집: 후보와 단계별 결과를 실행 기록에 남기고, resume이면 끝나지 않은 실행을 이어서 처리
+def run_realtime(use_pipeline=False, combined=False, resume=False):
+    journal = RunJournal(os.getenv("RUN_JOURNAL_PATH", DEFAULT_JOURNAL_PATH))
+    try:
+        resumed = journal.start(resume=resume)
+        candidates = collect_candidates()
+        if resumed:
+            pending = journal.pending_candidates()
+            known = {c["link"] for c in pending}
+            candidates = pending + [c for c in candidates if c["link"] not in known]
+            print(f"이전 실행 이어서 처리 (저장 {journal.saved_count()}건, 남은 후보 {len(pending)}건)")
+        journal.add_candidates(candidates)
+
+        limit = ARTICLE_LIMIT - journal.saved_count()
+        finder = new_duplicate_finder()
+        if use_pipeline:
+            items = iter_pipeline(
+                candidates, combined=combined, journal=journal, limit=limit, duplicates=finder
             )
+        else:
+            items = iter_serial(
+                candidates, combined=combined, journal=journal, limit=limit, duplicates=finder
+            )
+        # 중간에 실패해도 파이프라인 작업자를 멈춘 뒤 기록을 닫음
+        with closing(items):
+            saved, failures = save_in_batches(items, journal)
+        if finder is not None:
+            print(f"근사 중복 {finder.duplicates}건 (LLM 호출 생략)")
+        journal.finish()
+    finally:
+        journal.close()
+    return saved, len(failures)
 
-            print(f"수집 완료: {title}")
 
+# 실행 메인
+def main(use_pipeline=False, combined=False, batch=False, resume=False):
+    if batch:
+        saved, failed = run_batch()
+    else:
+        saved, failed = run_realtime(use_pipeline, combined, resume)
+    print(f"\n총 {saved}개 기사 DB 저장 완료 (실패 {failed}개)")
+    print_cache_stats()
+    print_usage_stats()
+    print_budget_stats()
+    print_scheduler_stats()
+    cache = get_cache()
+    write_report(
+        "main",
+        {
+            "saved": saved,
+            "failed": failed,
+            "token_usage": usage_stats(),
+            "token_budget": budget_stats.snapshot(),
+            "scheduler": get_scheduler().stats(),
+            "llm_cache": cache.stats() if cache is not None else None,
+        },
+    )
+
+
+# 데몬 모드: interval초마다 수집을 반복하고, 하루 한 번 SUMMARY_HOUR시가 지난 첫 주기에 전날 요약
+# 수집기 세션, OpenAI 클라이언트, DB 연결, LLM 캐시는 주기 사이에 그대로 재사용 (누적 통계는 시작 시점부터)
+# 주기 도중 죽었으면 다음 주기가 실행 기록을 이어서 처리
+def run_daemon(interval=DAEMON_INTERVAL, use_pipeline=False, combined=False, batch=False, summarize=True):
+    from summary import run_summary, run_incremental
+
+    summarized = None
+    while True:
+        started = time.monotonic()
+        try:
+            main(use_pipeline=use_pipeline, combined=combined, batch=batch, resume=True)
         except Exception as e:
-            print(f"에러 발생: {e}")
-            continue
+            print(f"[수집 실패] {e}")
+
+        # 오늘 중간 리포트는 매 주기 새 기사만 반영
+        if summarize:
+            try:
+                run_incremental()
+            except Exception as e:
+                print(f"[중간 요약 실패] {e}")
 
-    insert_to_db(new_articles)
-    print(f"\n총 {len(new_articles)}개 기사 DB 저장 완료")
+        now = datetime.now()
+        if summarize and now.hour >= SUMMARY_HOUR and summarized != now.date():
+            try:
+                run_summary(now - timedelta(days=1))
+                summarized = now.date()
+            except Exception as e:
+                print(f"[요약 실패] {e}")
+
+        delay = max(interval - (time.monotonic() - started), 0)
+        print(f"다음 수집까지 {delay:.0f}초 대기")
+        time.sleep(delay)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="네이버 뉴스 수집/분석")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="수집/요약/분류·평가를 단계별 작업자 풀에서 동시에 실행",
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="요약/분류/자극성 평가를 구조화 출력 한 번의 호출로 처리 (실패 시 개별 호출)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="통합 분석/임베딩을 OpenAI Batch API로 보내고 결과를 받아 저장 (이전 실행의 미완료 배치부터 처리)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="끝나지 않은 마지막 실행을 이어서 처리 (저장된 기사와 끝난 단계는 건너뜀)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="종료하지 않고 --interval초마다 수집 (연결/캐시 재사용, 하루 한 번 전날 요약)",
+    )
+    parser.add_argument("--interval", type=int, default=DAEMON_INTERVAL, help="데몬 모드 수집 간격(초)")
+    parser.add_argument("--no-summary", action="store_true", help="데몬 모드에서 오늘 중간 요약과 전날 요약을 만들지 않음")
+    args = parser.parse_args()
+    try:
+        if args.daemon:
+            run_daemon(args.interval, args.pipeline, args.combined, args.batch, summarize=not args.no_summary)
+        else:
+            main(use_pipeline=args.pipeline, combined=args.combined, batch=args.batch, resume=args.resume)
+    finally:
+        close_connection()
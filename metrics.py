@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import ContextDecorator
+from datetime import datetime
+
+# 지연 시간 히스토그램 구간 상한(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Prometheus 지표 이름 앞에 붙는 접두사
+PREFIX = "news"
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _label_text(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in key) + "}"
+
+
+class Histogram:
+    # 고정 구간 히스토그램 (구간별 개수, 합계, 최댓값)
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    # 구간 안에서 선형 보간한 분위수 추정치
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class Registry:
+    # 프로세스 안의 타이머(히스토그램)와 카운터 모음, 이름 + 라벨별로 따로 집계
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timers = {}  # (이름, 라벨) → Histogram
+        self._counters = {}  # (이름, 라벨) → 값
+
+    def observe(self, name, seconds, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            if key not in self._timers:
+                self._timers[key] = Histogram()
+            self._timers[key].observe(seconds)
+
+    def count(self, name, value=1, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timers": {
+                    name + _label_text(labels): h.summary()
+                    for (name, labels), h in sorted(self._timers.items())
+                },
+                "counters": {
+                    name + _label_text(labels): value
+                    for (name, labels), value in sorted(self._counters.items())
+                },
+            }
+
+    # Prometheus 텍스트 형식
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            timers = sorted(self._timers.items())
+            counters = sorted(self._counters.items())
+        typed = set()
+        for (name, labels), h in timers:
+            metric = f"{PREFIX}_{name}_seconds"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for upper, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                cumulative += n
+                key = labels + (("le", upper),)
+                lines.append(f"{metric}_bucket{_label_text(key)} {cumulative}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {h.sum}")
+            lines.append(f"{metric}_count{_label_text(labels)} {h.count}")
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class timed(ContextDecorator):
+    # 걸린 시간을 name 히스토그램에 기록 (with 블록 또는 함수 데코레이터로 사용)
+    # 예외로 끝나면 errors 카운터도 올림
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.__dict__.setdefault("starts", []).append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._local.starts.pop()
+        registry.observe(self.name, elapsed, **self.labels)
+        if exc_type is not None:
+            registry.count(f"{self.name}_errors", **self.labels)
+        return False
+
+
+def count(name, value=1, **labels):
+    registry.count(name, value, **labels)
+
+
+# 실행 결과 JSON 보고서 저장 (path가 없으면 .cache/reports/<이름>-<시각>.json) → 저장 경로
+def write_report(name, extra=None, path=None):
+    path = path or os.getenv("METRICS_REPORT") or os.path.join(
+        ".cache", "reports", f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    report = {"name": name, "finished_at": datetime.now().isoformat(), **registry.snapshot(), **(extra or {})}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"실행 보고서 저장: {path}")
+    return path
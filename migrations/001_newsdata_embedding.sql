@@ -0,0 +1,4 @@
+-- 기사 요약문(summary 컬럼) 임베딩 (text-embedding-3-small, float32 1536개를 little-endian으로 패킹한 6144바이트)
+-- 본문 임베딩이 아님: main.py가 저장 시 요약문 벡터를 채우고, summary.py가 비어 있는 행만 요약문으로 계산해 채움
+-- (예전 본문 벡터가 든 행은 python summary.py --reembed로 다시 계산)
+ALTER TABLE newsdata ADD COLUMN embedding BLOB NULL;
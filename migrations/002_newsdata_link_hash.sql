@@ -0,0 +1,7 @@
+-- 정규화한 기사 URL의 SHA-1 (dedup.link_hash)
+-- 수집 시 이번에 찾은 링크만 WHERE link_hash IN (...)으로 확인하기 위한 인덱스 컬럼
+ALTER TABLE newsdata ADD COLUMN link_hash CHAR(40) NULL;
+
+-- 기존 행 채우기: python dedup.py --backfill
+-- 정규화 후 같은 기사가 두 번 저장된 행이 있으면 아래 인덱스 전에 정리할 것
+ALTER TABLE newsdata ADD UNIQUE INDEX uq_newsdata_link_hash (link_hash);
@@ -0,0 +1,3 @@
+-- /home 날짜 범위 조회 (publish_time >= 오늘 AND < 내일)와 최신순 목록용 인덱스
+CREATE INDEX idx_newsdata_publish_time ON newsdata (publish_time);
+CREATE INDEX idx_newsdata_subcategory_publish_time ON newsdata (subcategory, publish_time);
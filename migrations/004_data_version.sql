@@ -0,0 +1,10 @@
+-- 웹 캐시 무효화용 데이터 버전 (main.py/summary.py가 저장 후 version을 올림)
+CREATE TABLE IF NOT EXISTS data_version (
+    name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+
+INSERT IGNORE INTO data_version (name, version, updated_at) VALUES
+    ('newsdata', 1, UTC_TIMESTAMP()),
+    ('summarydata', 1, UTC_TIMESTAMP());
@@ -0,0 +1,11 @@
+-- 목록/기사 화면에 쓰는 표시용 값을 저장 시 계산해 둠 (main.display_scores와 같은 식)
+ALTER TABLE newsdata ADD COLUMN relevance_percent INT NULL;
+ALTER TABLE newsdata ADD COLUMN relevance_hue FLOAT NULL;
+ALTER TABLE newsdata ADD COLUMN stimulus_hue FLOAT NULL;
+
+-- 기존 행 채우기
+UPDATE newsdata
+SET relevance_percent = FLOOR(LEAST(GREATEST(relevance_score / 75 * 100, 0), 100)),
+    relevance_hue = 120 * LEAST(GREATEST(relevance_score / 75 * 100, 0), 100) / 100,
+    stimulus_hue = 120 - (headline_score / 10) * 120
+WHERE relevance_percent IS NULL;
@@ -0,0 +1,10 @@
+-- main.py --batch 체크포인트: 제출한 Batch API 작업과 처리할 기사 목록
+CREATE TABLE IF NOT EXISTS batch_runs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    status VARCHAR(16) NOT NULL,
+    batch_ids TEXT NOT NULL,
+    manifest LONGTEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME NULL,
+    KEY idx_batch_runs_status (status)
+);
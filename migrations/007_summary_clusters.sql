@@ -0,0 +1,21 @@
+-- summary.py --incremental 상태: 날짜별 클러스터(중심/합/기사 수/대표 요약/섹션)와 진행 상황
+-- 새 기사를 찾는 기준은 010에서 추가한 last_updated_at/article_ids (last_article_id는 쓰지 않음)
+CREATE TABLE IF NOT EXISTS summary_clusters (
+    summary_date DATE NOT NULL,
+    cluster_id INT NOT NULL,
+    centroid BLOB NOT NULL,
+    vector_sum BLOB NOT NULL,
+    article_count INT NOT NULL,
+    exemplars TEXT NOT NULL,
+    section TEXT NULL,
+    section_key CHAR(40) NULL,
+    PRIMARY KEY (summary_date, cluster_id)
+);
+
+CREATE TABLE IF NOT EXISTS summary_progress (
+    summary_date DATE PRIMARY KEY,
+    last_article_id BIGINT NOT NULL DEFAULT 0,
+    overview TEXT NULL,
+    overview_key CHAR(40) NULL,
+    updated_at DATETIME NOT NULL
+);
@@ -0,0 +1,10 @@
+-- 본문 근사 중복 묶음 (near_dup.py)
+-- content_minhash: 본문 MinHash 서명, canonical_hash: 묶음 대표 기사의 link_hash (대표 기사는 자기 link_hash)
+-- outlet_count: 같은 묶음을 실은 언론사 수 (저장할 때 묶음 전체를 다시 계산)
+ALTER TABLE newsdata ADD COLUMN content_minhash BLOB NULL;
+ALTER TABLE newsdata ADD COLUMN canonical_hash CHAR(40) NULL;
+ALTER TABLE newsdata ADD COLUMN outlet_count INT NOT NULL DEFAULT 1;
+CREATE INDEX idx_newsdata_canonical_hash ON newsdata (canonical_hash);
+
+-- 기존 행은 각자 자기 묶음의 대표
+UPDATE newsdata SET canonical_hash = link_hash WHERE canonical_hash IS NULL;
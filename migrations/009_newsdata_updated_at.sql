@@ -0,0 +1,3 @@
+-- 행이 마지막으로 바뀐 시각 (웹 검색 색인이 ON DUPLICATE KEY UPDATE로 바뀐 기사도 다시 읽도록)
+ALTER TABLE newsdata ADD COLUMN updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+CREATE INDEX idx_newsdata_updated_at ON newsdata (updated_at);
@@ -0,0 +1,4 @@
+-- summary.py --incremental: 마지막 기사 id 대신 newsdata.updated_at 기준으로 새 기사를 찾음
+-- (TiDB 자동 증가 id는 커지는 순서가 보장되지 않음), 겹쳐 읽은 기사는 처리한 id 목록으로 거름
+ALTER TABLE summary_progress ADD COLUMN last_updated_at DATETIME NULL;
+ALTER TABLE summary_progress ADD COLUMN article_ids MEDIUMTEXT NULL;
@@ -0,0 +1,252 @@
+import os
+import re
+import zlib
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+from dedup import link_hash
+from embedding import unpack_embedding
+from metrics import count
+
+# 여러 언론사가 같은 통신사 기사를 거의 그대로 싣는 경우를 LLM 호출 전에 찾아냄
+# - 본문을 공백/문장부호를 뺀 글자 SHINGLE_SIZE-gram 집합으로 보고 MinHash 서명(NUM_PERM개) 계산
+#   (언론사마다 띄어쓰기, 바이라인, 저작권 문구가 달라 단어보다 글자 단위가 안정적)
+# - 서명을 BANDS개 밴드로 나눠 밴드 하나라도 같은 기사만 후보로 비교 (LSH)
+# - 추정 Jaccard 유사도가 NEAR_DUP_THRESHOLD 이상이면 중복
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+# 밴드당 4행: 유사도 0.8 사본을 사실상 놓치지 않음 (16밴드×8행은 약 5%를 놓침)
+BANDS = 32
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", 0.8))
+# 이보다 짧은 본문은 판별하지 않음 (글자 수)
+MIN_CONTENT_CHARS = 200
+# DB에서 비교 대상으로 불러오는 최근 기사 범위(시간)
+NEAR_DUP_WINDOW_HOURS = int(os.getenv("NEAR_DUP_WINDOW_HOURS", 48))
+# NEAR_DUP_CONFIRM=1: 추정 유사도가 NEAR_DUP_CONFIRM_FLOOR 이상이면 본문 임베딩 코사인 유사도가
+# NEAR_DUP_EMBEDDING_THRESHOLD 이상일 때도 중복으로 봄 (본문 임베딩은 저장 때 어차피 계산해 캐시에 남음)
+# DB에는 요약문 벡터만 있으므로 본문끼리 비교할 수 있는 이번 실행 기사 사이에서만 확인
+NEAR_DUP_CONFIRM = os.getenv("NEAR_DUP_CONFIRM", "0") == "1"
+NEAR_DUP_CONFIRM_FLOOR = 0.5
+NEAR_DUP_EMBEDDING_THRESHOLD = 0.95
+# 중복 기사가 대표 기사에서 그대로 가져오는 분석 결과
+REUSED_FIELDS = ("summary", "category", "headline_score", "relevance_score", "embedding")
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def shingles(text):
+    text = _NON_WORD.sub("", text.lower())
+    if len(text) < MIN_CONTENT_CHARS:
+        return None
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+# 본문 MinHash 서명 (uint32 NUM_PERM개), 짧은 본문은 None
+def signature(text):
+    grams = shingles(text or "")
+    if not grams:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams)
+    )
+    # (a*x + b) mod p 순열을 한 번에 계산, 순열마다 최솟값
+    permuted = (np.outer(hashes, _A) + _B) % np.uint64(_PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def pack_signature(sig):
+    if sig is None:
+        return None
+    return np.asarray(sig, dtype="<u4").tobytes()
+
+
+def unpack_signature(blob):
+    return np.frombuffer(blob, dtype="<u4")
+
+
+# 추정 Jaccard 유사도 (같은 자리 값이 같은 비율)
+def similarity(a, b):
+    return float(np.mean(a == b))
+
+
+def _band_keys(sig):
+    rows = NUM_PERM // BANDS
+    return [(b, sig[b * rows : (b + 1) * rows].tobytes()) for b in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    # 밴드 해시 → 대표 기사 키 (LSH 버킷), 키는 대표 기사의 link_hash
+    # 파이프라인 작업자가 동시에 쓸 수 있도록 잠금 사용
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _add(self, key, sig):
+        self._signatures.setdefault(key, []).append(sig)
+        for band in _band_keys(sig):
+            bucket = self._buckets.setdefault(band, [])
+            if key not in bucket:
+                bucket.append(key)
+
+    def add(self, key, sig):
+        with self._lock:
+            self._add(key, sig)
+
+    # 기준 이상으로 비슷한 대표 기사 키를 돌려주고, 없으면 key를 새 대표로 등록 → None
+    # 같은 기사를 동시에 넣어도 하나만 대표가 되도록 찾기와 등록을 한 번에 처리
+    def match_or_add(self, key, sig, confirm=None):
+        with self._lock:
+            keys = dict.fromkeys(k for band in _band_keys(sig) for k in self._buckets.get(band, ()))
+            scored = [(max(similarity(sig, s) for s in self._signatures[k]), k) for k in keys]
+            scored.sort(key=lambda x: -x[0])
+            for sim, k in scored:
+                if sim >= self.threshold or (confirm is not None and confirm(k, sim)):
+                    self._signatures[k].append(sig)
+                    return k
+            self._add(key, sig)
+            return None
+
+
+class DuplicateFinder:
+    # 수집 실행 하나의 근사 중복 판별 (최근 DB 기사 + 이번 실행에서 먼저 본 기사)
+    # check(item): 본문 서명(minhash, hex)을 붙이고, 대표 기사가 있으면 duplicate_of(대표 기사 link_hash)도 붙임
+    # embed(texts) → 벡터 목록을 주고 confirm=True면 회색 구간을 임베딩으로 확인
+    def __init__(self, conn=None, embed=None, confirm=NEAR_DUP_CONFIRM):
+        self.index = NearDuplicateIndex()
+        self.embed = embed if confirm else None
+        self.duplicates = 0
+        self._contents = {}
+        if conn is not None:
+            load_recent(conn, self.index)
+
+    def check(self, item):
+        content = item["detail"]["content"]
+        sig = signature(content)
+        if sig is None:
+            return item
+        key = link_hash(item["link"])
+        confirm = None
+        if self.embed is not None:
+            confirm = lambda other, sim: self._confirm(content, other, sim)
+        canonical = self.index.match_or_add(key, sig, confirm)
+        item = {**item, "minhash": pack_signature(sig).hex()}
+        if canonical is None:
+            if self.embed is not None:
+                self._contents[key] = content
+            return item
+        self.duplicates += 1
+        count("near_duplicates")
+        return {**item, "duplicate_of": canonical}
+
+    def _confirm(self, content, key, sim):
+        if sim < NEAR_DUP_CONFIRM_FLOOR:
+            return False
+        other = self._contents.get(key)
+        if other is None:
+            return False
+        try:
+            a, b = self.embed([content, other])
+        except Exception as e:
+            print(f"[중복 확인 임베딩 실패] {e}")
+            return False
+        if a is None or b is None:
+            return False
+        a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+        return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b))) >= NEAR_DUP_EMBEDDING_THRESHOLD
+
+
+# 최근 NEAR_DUP_WINDOW_HOURS시간 동안 저장된 기사 서명으로 색인 채우기 (키는 각 묶음의 대표 기사)
+def load_recent(conn, index, hours=NEAR_DUP_WINDOW_HOURS):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT COALESCE(canonical_hash, link_hash), content_minhash FROM newsdata
+            WHERE publish_time >= %s AND content_minhash IS NOT NULL
+            """,
+            ((datetime.now() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S"),),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    for key, blob in rows:
+        index.add(key, unpack_signature(blob))
+    return len(rows)
+
+
+# 묶음별 언론사 수(outlet_count)를 다시 계산해 묶음의 모든 행에 저장
+def update_outlet_counts(conn, canonical_hashes):
+    hashes = list(set(canonical_hashes))
+    if not hashes:
+        return
+    cursor = conn.cursor()
+    try:
+        placeholders = ", ".join(["%s"] * len(hashes))
+        cursor.execute(
+            f"""
+            SELECT canonical_hash, COUNT(DISTINCT press) FROM newsdata
+            WHERE canonical_hash IN ({placeholders}) GROUP BY canonical_hash
+            """,
+            hashes,
+        )
+        cursor.executemany(
+            "UPDATE newsdata SET outlet_count = %s WHERE canonical_hash = %s",
+            [(count, h) for h, count in cursor.fetchall()],
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+# 대표 기사 link_hash → DB에 저장된 분석 결과 (REUSED_FIELDS 키)
+def load_canonical(conn, hashes):
+    hashes = list(set(hashes))
+    if not hashes:
+        return {}
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            SELECT link_hash, summary, subcategory, headline_score, relevance_score, embedding
+            FROM newsdata WHERE link_hash IN ({", ".join(["%s"] * len(hashes))})
+            """,
+            hashes,
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return {
+        h: {
+            "summary": summary,
+            "category": category,
+            "headline_score": headline_score,
+            "relevance_score": relevance_score,
+            "embedding": unpack_embedding(embedding) if embedding else None,
+        }
+        for h, summary, category, headline_score, relevance_score, embedding in rows
+    }
+
+
+# 중복 기사에 대표 기사 결과 복사 → (복사한 기사, 대표 기사 결과가 아직 없는 기사)
+# done: 이번 실행에서 연관성 계산까지 끝난 대표 기사 {link_hash: item}, 없는 대표 기사는 DB에서 찾음
+def resolve_duplicates(conn, items, done):
+    stored = load_canonical(conn, [a["duplicate_of"] for a in items if a["duplicate_of"] not in done])
+    resolved, waiting = [], []
+    for a in items:
+        source = done.get(a["duplicate_of"]) or stored.get(a["duplicate_of"])
+        if source is None or source["embedding"] is None:
+            waiting.append(a)
+        else:
+            resolved.append({**a, **{k: source[k] for k in REUSED_FIELDS}})
+    return resolved, waiting
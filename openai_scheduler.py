@@ -0,0 +1,292 @@
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import timed, count
+
+# 분당 요청 수 / 분당 토큰 수 한도 (계정 등급에 맞게 환경 변수로 조정)
+DEFAULT_RPM = int(os.getenv("OPENAI_RPM", 500))
+DEFAULT_TPM = int(os.getenv("OPENAI_TPM", 200_000))
+# 재시도 횟수, 지수 백오프 기본/최대 대기(초)
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 6))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# 연속 실패 몇 번이면 회로를 열고, 몇 초 뒤 한 건만 시험 삼아 보낼지
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+# 응답 길이 상한이 없는 요청에 미리 잡아 두는 출력 토큰
+COMPLETION_ALLOWANCE = 1000
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# 토큰 수 추정 (tiktoken 없이 보수적으로: 한글 등 비ASCII는 글자당 1토큰, ASCII는 4글자당 1토큰)
+def estimate_tokens(text):
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4 + 1
+
+
+# chat.completions 요청 토큰 추정 (메시지 + 응답 상한, 없으면 COMPLETION_ALLOWANCE)
+def estimate_chat_tokens(kwargs):
+    prompt = sum(estimate_tokens(m.get("content") or "") + 4 for m in kwargs.get("messages", []))
+    return prompt + (kwargs.get("max_tokens") or COMPLETION_ALLOWANCE)
+
+
+class RateBudget:
+    # 분당 요청 수/토큰 수 토큰 버킷 (둘 다 남아 있어야 보냄)
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        self._updated = now
+
+    # 보낼 수 있을 때까지 기다린 뒤 예산 차감 → 기다린 시간(초)
+    def acquire(self, tokens):
+        tokens = min(tokens, self.tpm)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._requests >= 1 and self._tokens >= tokens:
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        return waited
+                    delay = max(
+                        (1 - self._requests) * 60 / self.rpm,
+                        (tokens - self._tokens) * 60 / self.tpm,
+                    )
+            time.sleep(delay)
+            waited += delay
+
+    # 응답의 실제 사용량으로 추정치 보정 (남으면 돌려주고 모자라면 더 뺌)
+    def settle(self, estimated, actual):
+        with self._lock:
+            self._tokens = min(self.tpm, self._tokens + estimated - actual)
+
+    # 429를 받으면 모든 호출을 seconds 동안 멈춤
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    # 연속 threshold번 실패하면 열림(바로 CircuitOpenError), cooldown 뒤 한 건만 통과시켜 확인
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial:
+                raise CircuitOpenError("OpenAI 호출 회로가 열려 있습니다 (연속 실패)")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    # 회로가 새로 열렸으면 True
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            was_open = self._opened_at is not None
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
+                return not was_open
+            return False
+
+
+# Retry-After(초 또는 HTTP 날짜) / Retry-After-Ms 헤더 → 초
+def retry_after(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+# openai 패키지는 import가 느려서(1초 가까이) 실제로 쓸 때 불러옴
+def is_rate_limited(error):
+    import openai
+
+    return isinstance(error, openai.RateLimitError)
+
+
+# 다시 보내면 성공할 수 있는 오류인지 (429, 5xx, 연결/시간 초과), 한도 소진(insufficient_quota)은 제외
+def is_retryable(error):
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        return getattr(error, "code", None) != "insufficient_quota"
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500 or error.status_code in (408, 409)
+    return False
+
+
+class RequestScheduler:
+    # 모든 OpenAI 호출이 거치는 스케줄러
+    # - RateBudget으로 RPM/TPM 한도 안에서만 보냄 (여러 스레드가 동시에 호출해도 공유)
+    # - 429/5xx/연결 오류는 지수 백오프 + 지터로 재시도, Retry-After가 있으면 그만큼 전체 대기
+    # - 연속 실패가 이어지면 CircuitBreaker가 열려 바로 실패 (API 장애 때 요청을 쌓지 않음)
+    # 클라이언트 자체 재시도와 겹치지 않도록 OpenAI(max_retries=0)으로 만들어 쓸 것
+    def __init__(self, budget=None, breaker=None, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.budget = budget or RateBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self.metrics = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "circuit_opens": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.metrics[name] += value
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        hinted = retry_after(error)
+        if hinted is not None:
+            delay = max(delay, min(hinted, self.backoff_max))
+        return delay
+
+    # fn() 실행 → 결과, tokens: 요청 토큰 추정치, usage_tokens(결과): 실제 사용량 (있으면 예산 보정)
+    # kind: 지연 시간/재시도 지표를 나눠 모을 호출 종류 (chat, embedding)
+    def call(self, fn, tokens=1, usage_tokens=None, kind="request"):
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self._count("wait_seconds", self.budget.acquire(tokens))
+            self._count("requests")
+            try:
+                with timed("openai_request", kind=kind):
+                    result = fn()
+            except Exception as e:
+                # 실패한 요청은 토큰을 쓰지 않았으므로 미리 뺀 토큰을 돌려줌 (요청 수는 그대로)
+                self.budget.settle(tokens, 0)
+                # 429나 4xx는 API가 살아 있다는 뜻이므로 회로에는 성공으로 기록
+                rate_limited = is_rate_limited(e)
+                if not is_retryable(e) or rate_limited:
+                    self.breaker.record_success()
+                if not is_retryable(e):
+                    raise
+                if rate_limited:
+                    self._count("rate_limited")
+                    count("openai_rate_limited", kind=kind)
+                elif self.breaker.record_failure():
+                    self._count("circuit_opens")
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt, e)
+                if rate_limited:
+                    self.budget.pause(delay)
+                self._count("retries")
+                count("openai_retries", kind=kind)
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            if usage_tokens is not None:
+                actual = usage_tokens(result)
+                if actual is not None:
+                    self.budget.settle(tokens, actual)
+            return result
+
+    # 여러 요청을 동시에 (순서 유지), 한도는 call()이 지킴
+    def map(self, fn, items, workers=4):
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_client = None
+_client_lock = threading.Lock()
+
+
+# 프로세스 공용 스케줄러
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
+
+
+# 프로세스 공용 OpenAI 클라이언트 (처음 쓸 때 만들고, 이후 호출은 같은 HTTP 커넥션 풀을 씀)
+# 재시도는 스케줄러가 맡으므로 클라이언트 자체 재시도는 끔
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        return _client
+
+
+def print_scheduler_stats():
+    s = get_scheduler().stats()
+    print(
+        f"OpenAI 요청: {s['requests']}회 (재시도 {s['retries']}, 429 {s['rate_limited']},"
+        f" 최종 실패 {s['failures']}, 회로 열림 {s['circuit_opens']}, 한도 대기 {s['wait_seconds']:.1f}초)"
+    )
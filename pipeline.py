@@ -0,0 +1,150 @@
+import queue
+import threading
+
+# 큐에 흘려보내는 종료/누락 표시
+_DONE = object()
+_DROPPED = object()
+
+# put/get 대기 중 중단 여부를 확인하는 주기 (초)
+_POLL_INTERVAL = 0.1
+
+
+class Stage:
+    # 파이프라인의 한 단계: 이름, 처리 함수, 동시 작업자 수, 출력 큐 크기
+    # ordered=True면 앞 단계가 끝낸 순서와 상관없이 입력 순서대로 처리 (작업자 1개)
+    # (먼저 본 항목에 따라 결과가 달라지는 단계가 직렬 실행과 같은 결과를 내도록)
+    def __init__(self, name, func, workers=1, queue_size=None, ordered=False):
+        if workers < 1:
+            raise ValueError(f"{name}: workers는 1 이상이어야 합니다")
+        if ordered and workers != 1:
+            raise ValueError(f"{name}: 순서대로 처리하는 단계는 작업자가 1개여야 합니다")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size or workers * 2
+        self.ordered = ordered
+
+
+def _put(q, item, stop):
+    # 가득 찬 큐에서는 대기(백프레셔)하되, 중단 신호가 오면 포기
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _process(stage, idx, item, out_q, stop, on_error):
+    if item is not _DROPPED:
+        try:
+            item = stage.func(item)
+        except Exception as e:
+            if on_error:
+                on_error(stage.name, item, e)
+            item = _DROPPED
+    return _put(out_q, (idx, item), stop)
+
+
+def _run_worker(stage, in_q, out_q, stop, finished, on_error):
+    # ordered 단계: 앞 번호가 올 때까지 받아 둠 (누락된 항목도 번호를 차지하므로 번호는 빠짐없이 옴)
+    pending = {}
+    next_idx = 0
+    while True:
+        entry = _get(in_q, stop)
+        if entry is _DONE:
+            # 같은 단계의 다른 작업자도 끝낼 수 있도록 되돌려 놓음
+            _put(in_q, _DONE, stop)
+            break
+
+        idx, item = entry
+        if not stage.ordered:
+            if not _process(stage, idx, item, out_q, stop, on_error):
+                break
+            continue
+        pending[idx] = item
+        ok = True
+        while ok and next_idx in pending:
+            ok = _process(stage, next_idx, pending.pop(next_idx), out_q, stop, on_error)
+            next_idx += 1
+        if not ok:
+            break
+
+    # 단계의 마지막 작업자가 다음 단계로 종료 신호 전달
+    with finished["lock"]:
+        finished["count"] += 1
+        last = finished["count"] == stage.workers
+    if last:
+        _put(out_q, _DONE, stop)
+
+
+def run_pipeline(items, stages, max_in_flight=None, on_error=None):
+    # items를 stages 순서대로 처리해 입력 순서 그대로 결과를 내보내는 제너레이터
+    # - 각 단계는 자체 스레드 풀에서 동시에 실행되고, 단계 사이는 제한된 큐로 연결
+    # - 예외가 난 항목은 on_error(stage_name, item, exc) 호출 후 결과에서 빠짐
+    # - 소비자가 중간에 멈추면(break) 남은 작업을 취소
+    if not stages:
+        raise ValueError("stages가 비어 있습니다")
+
+    stop = threading.Event()
+    if max_in_flight is None:
+        max_in_flight = sum(s.workers + s.queue_size for s in stages)
+    window = threading.Semaphore(max_in_flight)
+
+    queues = [queue.Queue(maxsize=stages[0].workers * 2)]
+    for stage in stages:
+        queues.append(queue.Queue(maxsize=stage.queue_size))
+
+    def feed():
+        for idx, item in enumerate(items):
+            # 순서 재정렬 버퍼가 무한정 커지지 않도록 동시 처리 개수 제한
+            while not window.acquire(timeout=_POLL_INTERVAL):
+                if stop.is_set():
+                    return
+            if not _put(queues[0], (idx, item), stop):
+                return
+        _put(queues[0], _DONE, stop)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    for i, stage in enumerate(stages):
+        finished = {"count": 0, "lock": threading.Lock()}
+        for _ in range(stage.workers):
+            threads.append(
+                threading.Thread(
+                    target=_run_worker,
+                    args=(stage, queues[i], queues[i + 1], stop, finished, on_error),
+                    daemon=True,
+                )
+            )
+    for t in threads:
+        t.start()
+
+    pending = {}
+    next_idx = 0
+    try:
+        while True:
+            entry = _get(queues[-1], stop)
+            if entry is _DONE:
+                break
+            idx, item = entry
+            pending[idx] = item
+            while next_idx in pending:
+                result = pending.pop(next_idx)
+                next_idx += 1
+                window.release()
+                if result is not _DROPPED:
+                    yield result
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
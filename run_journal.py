@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 실행 기록 파일 위치 / 오래된 실행 기록 보관 기간
+DEFAULT_JOURNAL_PATH = os.path.join(".cache", "run_journal.sqlite3")
+DEFAULT_MAX_AGE_DAYS = 7
+
+# 기사별 기록 단계: 후보 등록 → 파이프라인 단계들(fetch, analyze ...) → DB 저장
+CANDIDATE = "candidate"
+SAVED = "saved"
+
+
+class RunJournal:
+    # 수집 실행 하나에서 기사별 단계 결과를 단계가 끝날 때마다 SQLite에 남김
+    # - resume=True면 끝나지 않은 마지막 실행을 이어서 씀 (끝난 단계는 다시 하지 않음)
+    # - 파이프라인 작업자들이 동시에 기록하므로 잠금 사용
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.run_id = None
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                run_id INTEGER NOT NULL,
+                link TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                output TEXT NOT NULL,
+                PRIMARY KEY (run_id, link, stage)
+            )
+            """
+        )
+        self._conn.commit()
+
+    # 새 실행 시작 (resume=True면 끝나지 않은 마지막 실행 이어가기) → 이어가면 True
+    def start(self, resume=False):
+        with self._lock:
+            self._cleanup()
+            row = None
+            if resume:
+                row = self._conn.execute(
+                    "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+            if row:
+                self.run_id = row[0]
+            else:
+                cursor = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+                self.run_id = cursor.lastrowid
+            self._conn.commit()
+            return row is not None
+
+    def _cleanup(self):
+        old = [
+            (run_id,)
+            for (run_id,) in self._conn.execute(
+                "SELECT id FROM runs WHERE started_at < ?", (time.time() - self.max_age,)
+            )
+        ]
+        self._conn.executemany("DELETE FROM entries WHERE run_id = ?", old)
+        self._conn.executemany("DELETE FROM runs WHERE id = ?", old)
+
+    def record(self, link, stage, output):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (self.run_id, link, stage, json.dumps(output, ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    # 기록된 단계 결과, 없으면 None
+    def get(self, link, stage):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM entries WHERE run_id = ? AND link = ? AND stage = ?",
+                (self.run_id, link, stage),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_candidates(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                [(self.run_id, it["link"], CANDIDATE, json.dumps(it, ensure_ascii=False)) for it in items],
+            )
+            self._conn.commit()
+
+    # 이 실행에서 등록했지만 아직 저장하지 못한 후보 (등록 순서)
+    def pending_candidates(self):
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT c.output FROM entries c
+                WHERE c.run_id = ? AND c.stage = ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM entries s
+                      WHERE s.run_id = c.run_id AND s.link = c.link AND s.stage = ?
+                  )
+                ORDER BY c.rowid
+                """,
+                (self.run_id, CANDIDATE, SAVED),
+            ).fetchall()
+        return [json.loads(output) for (output,) in rows]
+
+    def saved_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE run_id = ? AND stage = ?", (self.run_id, SAVED)
+            ).fetchone()[0]
+
+    def mark_saved(self, links):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                [(self.run_id, link, SAVED, "true") for link in links],
+            )
+            self._conn.commit()
+
+    def finish(self):
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # fn(item) → 새 item 인 단계 함수를 감싸 결과를 기록하고, 이미 기록이 있으면 그대로 재사용
+    def stage(self, name, fn):
+        def run(item):
+            done = self.get(item["link"], name)
+            if done is not None:
+                return {**item, **done}
+            result = fn(item)
+            self.record(
+                item["link"], name, {k: v for k, v in result.items() if k not in item or item[k] != v}
+            )
+            return result
+
+        return run
@@ -1,106 +1,113 @@
 import os
-import pymysql
+import json
+import html
+import hashlib
+import argparse
 import numpy as np
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-from openai import OpenAI
-from numpy import dot
-from numpy.linalg import norm
+from embedding import get_embeddings, failed_rows, pack_embedding, unpack_embedding
+from llm_cache import cached_chat_completion, get_cache, print_cache_stats, usage_stats
+from openai_scheduler import get_client, get_scheduler, print_scheduler_stats
+from metrics import timed, write_report
+from clustering import leader_cluster, build_clusters
+from db import connection, close_connection, bump_data_version
 
 # --- 환경 설정 ---
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 model_version = "gpt-4.1-mini"
 embedding_model = "text-embedding-3-small"
+REPORT_PROMPT_VERSION = "report-v1"
+# 같은 주제로 묶는 코사인 유사도 기준 / 클러스터 중심을 평균으로 갱신할지
+CLUSTER_THRESHOLD = float(os.getenv("CLUSTER_THRESHOLD", 0.75))
+CLUSTER_UPDATE_CENTROIDS = os.getenv("CLUSTER_UPDATE_CENTROIDS", "0") == "1"
+# --incremental: 화면에 보여줄 주제 수 / 주제마다 남기는 대표 요약 수 / 상태를 남겨 둘 날짜 수
+TODAY_TOPICS = int(os.getenv("TODAY_TOPICS", 7))
+TODAY_EXEMPLARS = 3
+TODAY_STATE_DAYS = 3
+# 새 기사를 찾을 때 마지막으로 본 updated_at보다 이만큼(초) 앞에서부터 다시 읽음
+# (늦게 커밋된 행 대비, 다시 읽은 기사는 처리한 id 목록으로 걸러냄)
+TODAY_OVERLAP = 300
+SECTION_PROMPT_VERSION = "today-section-v1"
+OVERVIEW_PROMPT_VERSION = "today-overview-v1"
 
-# --- 날짜 설정 ---
-today = datetime.now()
-yesterday = today - timedelta(days=1)
-yesterday_str = yesterday.strftime("%Y-%m-%d")
-print(f"분석 날짜: {yesterday_str}")
-
-# --- DB 연결 ---
-try:
-    conn = pymysql.connect(
-        host=os.getenv("DB_HOST"),
-        port=int(os.getenv("DB_PORT")),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
-    cursor = conn.cursor()
-    print("DB 연결 성공")
-except Exception as e:
-    print(f"DB 연결 실패: {e}")
-    exit()
-
-# --- 뉴스 요약 불러오기 ---
-cursor.execute("SELECT summary FROM newsdata WHERE publish_time LIKE %s", (f"{yesterday_str}%",))
-rows = cursor.fetchall()
-summaries = [row[0] for row in rows]
-print(f"총 {len(summaries)}개의 요약문 로딩 완료")
-
-if not summaries:
-    print("기사 없음")
-    exit()
-
-# --- 임베딩 함수 ---
-def get_embeddings(texts, batch=100):
-    #summaries 리스트를 batch 크기씩 나눠 한 번에 임베딩
-    embs = []
-    for i in range(0, len(texts), batch):
-        chunk = texts[i:i+batch]
-        res = client.embeddings.create(model=embedding_model,
-                                       input=chunk).data
-        embs.extend([np.array(r.embedding, dtype=np.float32) for r in res])
-    return np.vstack(embs)                    # (N, d) ndarray
 
+# --- 뉴스 요약 + 저장된 임베딩 불러오기 ---
+# publish_time 인덱스를 쓰도록 LIKE 대신 [그날 0시, 다음 날 0시) 범위로 조회
+def day_range(day_str):
+    start = datetime.strptime(day_str, "%Y-%m-%d")
+    return start.strftime("%Y-%m-%d %H:%M:%S"), (start + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
 
-# --- 군집화 ---
-# 1. 임베딩 추출 + 정규화
-A = get_embeddings(summaries)
-A /= np.linalg.norm(A, axis=1, keepdims=True)
 
-clusters = []
-emb_matrix = []
+def load_rows(cursor, day_str):
+    cursor.execute(
+        "SELECT id, summary, embedding FROM newsdata WHERE publish_time >= %s AND publish_time < %s",
+        day_range(day_str),
+    )
+    return cursor.fetchall()
 
-for i in range(len(summaries)):
-    emb = A[i]
-    summary = summaries[i]
 
-    if not clusters:
-        clusters.append({"summary": summary, "embedding": emb, "count": 1, "extras": []})
-        emb_matrix.append(emb)
-        continue
+# --- 임베딩 준비 ---
+# DB에 저장된 벡터는 그대로 쓰고, 없는 행만 API로 계산해 DB에 채워 넣음
+# (API를 부르는 동안은 공용 DB 연결을 잡지 않음)
+# 반환: 행별 벡터 (끝내 실패한 행은 None)
+def load_vectors(rows):
+    stored = [i for i, row in enumerate(rows) if row[2]]
+    missing = [i for i, row in enumerate(rows) if not row[2]]
+    print(f"저장된 임베딩 {len(stored)}개 / 새로 계산 {len(missing)}개")
 
-    emb_matrix_np = np.array(emb_matrix)
-    norms = np.linalg.norm(emb_matrix_np, axis=1)
-    sim = np.dot(emb_matrix_np, emb) / (norms * np.linalg.norm(emb))
+    vectors = [None] * len(rows)
+    for i in stored:
+        vectors[i] = unpack_embedding(rows[i][2])
 
-    best_idx = np.argmax(sim)
-    best_sim = sim[best_idx]
+    if missing:
+        new_embs = get_embeddings(get_client(), [rows[i][1] for i in missing], model=embedding_model)
+        ok_new = ~failed_rows(new_embs)
+        backfill = []
+        for j, i in enumerate(missing):
+            if ok_new[j]:
+                vectors[i] = new_embs[j]
+                backfill.append((pack_embedding(new_embs[j]), rows[i][0]))
+        try:
+            with connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.executemany("UPDATE newsdata SET embedding = %s WHERE id = %s", backfill)
+                    conn.commit()
+                finally:
+                    cursor.close()
+        except Exception as e:
+            print(f"[임베딩 저장 실패] {e}")
+    return vectors
 
-    if best_sim >= 0.75:
-        clusters[best_idx]["count"] += 1
-        clusters[best_idx]["extras"].append(summary)
-    else:
-        clusters.append({"summary": summary, "embedding": emb, "count": 1, "extras": []})
-        emb_matrix.append(emb)
 
+# --- 군집화 ---
+# 임베딩 실패한 요약문은 제외하고 정규화, 기사 수가 많은 클러스터부터
+@timed("clustering")
+def cluster_summaries(summaries, vectors):
+    keep = [i for i, v in enumerate(vectors) if v is not None]
+    summaries = [summaries[i] for i in keep]
+    A = np.vstack([vectors[i] for i in keep])
+    A /= np.linalg.norm(A, axis=1, keepdims=True)
+
+    labels, leaders, counts = leader_cluster(
+        A, threshold=CLUSTER_THRESHOLD, update_centroids=CLUSTER_UPDATE_CENTROIDS
+    )
+    clusters = build_clusters(summaries, labels, leaders, counts)
+    clusters.sort(key=lambda x: x["count"], reverse=True)
+    return clusters
 
-# --- 클러스터 정렬 ---
-clusters.sort(key=lambda x: x["count"], reverse=True)
-print(f"총 {len(clusters)}개 클러스터 생성 완료")
 
 # --- 대표 요약 2~3개만 사용한 입력 구성 ---
-cluster_texts = []
-for c in clusters:
-    all_summaries = [c["summary"]] + c["extras"]
-    top_examples = all_summaries[:3]
-    lines = '\n'.join(f"- {s}" for s in top_examples)
-    cluster_texts.append(f"({c['count']}건)\n{lines}")
-
-report_prompt = f"""
+def report_prompt(clusters):
+    cluster_texts = []
+    for c in clusters:
+        all_summaries = [c["summary"]] + c["extras"]
+        top_examples = all_summaries[:3]
+        lines = '\n'.join(f"- {s}" for s in top_examples)
+        cluster_texts.append(f"({c['count']}건)\n{lines}")
+
+    return f"""
 다음은 하루 동안 수집된 총 {sum(c['count'] for c in clusters)}건의 기술 뉴스 기사 요약이다.
 
 각 클러스터는 동일한 주제를 다루는 기사 묶음이다.
@@ -117,35 +124,442 @@ report_prompt = f"""
 {chr(10).join(cluster_texts)}
 """
 
+
 # --- GPT 요청 ---
-try:
-    res = client.chat.completions.create(
+def gpt_report(clusters):
+    return cached_chat_completion(
+        get_client(),
+        REPORT_PROMPT_VERSION,
         model=model_version,
         messages=[
             {"role": "system", "content": "넌 뉴스 리포트를 작성하는 시스템이다."},
-            {"role": "user", "content": report_prompt}
+            {"role": "user", "content": report_prompt(clusters)}
         ],
         temperature=0.4
-    )
-    final_summary = res.choices[0].message.content.strip()
-    print("최종 요약 생성 완료")
-except Exception as e:
-    print(f"[GPT 최종 요약 실패] {e}")
-    exit()
+    ).strip()
+
 
 # --- DB 저장 ---
-try:
-    sql = """
-    INSERT INTO summarydata (summary_date, summary)
-    VALUES (%s, %s)
-    ON DUPLICATE KEY UPDATE summary = VALUES(summary)
-    """
-    cursor.execute(sql, (yesterday_str, final_summary))
+def save_summary(conn, cursor, day_str, final_summary):
+    try:
+        sql = """
+        INSERT INTO summarydata (summary_date, summary)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE summary = VALUES(summary)
+        """
+        cursor.execute(sql, (day_str, final_summary))
+        conn.commit()
+        print("최종 요약 DB 저장 성공")
+    except Exception as e:
+        print(f"[DB 저장 실패] {e}")
+        return False
+    try:
+        bump_data_version(conn, "summarydata")
+    except Exception as e:
+        print(f"[데이터 버전 갱신 실패] {e}")
+    return True
+
+
+# day(기본: 어제) 기사 요약을 군집화해 하루 리포트를 만들고 저장 → 저장했으면 True
+def run_summary(day=None):
+    day = day or datetime.now() - timedelta(days=1)
+    day_str = day.strftime("%Y-%m-%d")
+    print(f"분석 날짜: {day_str}")
+
+    with connection() as conn:
+        print("DB 연결 성공")
+        cursor = conn.cursor()
+        try:
+            rows = load_rows(cursor, day_str)
+        finally:
+            cursor.close()
+    summaries = [row[1] for row in rows]
+    print(f"총 {len(summaries)}개의 요약문 로딩 완료")
+    if not summaries:
+        print("기사 없음")
+        return False
+
+    vectors = load_vectors(rows)
+    clusters = cluster_summaries(summaries, vectors)
+    print(f"총 {len(clusters)}개 클러스터 생성 완료")
+
+    try:
+        final_summary = gpt_report(clusters)
+        print("최종 요약 생성 완료")
+    except Exception as e:
+        print(f"[GPT 최종 요약 실패] {e}")
+        return False
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            saved = save_summary(conn, cursor, day_str, final_summary)
+        finally:
+            cursor.close()
+
+    print_cache_stats()
+    print_scheduler_stats()
+    cache = get_cache()
+    write_report(
+        "summary",
+        {
+            "date": day_str,
+            "articles": len(summaries),
+            "clusters": len(clusters),
+            "token_usage": usage_stats(),
+            "scheduler": get_scheduler().stats(),
+            "llm_cache": cache.stats() if cache is not None else None,
+        },
+    )
+    return saved
+
+
+# --- 오늘 중간 요약 (--incremental) ---
+# 하루치 클러스터 상태(중심/합/기사 수/대표 요약)를 DB에 남겨 두고, 실행마다
+# 마지막으로 본 updated_at 이후(겹침 구간 포함) 기사 중 아직 처리하지 않은 id만 기존 클러스터에 배정한 뒤
+# (TiDB 자동 증가 id는 커지는 순서가 보장되지 않아 id 기준으로는 늦게 들어온 기사를 놓침)
+# 대표 요약이 바뀐 주제만 GPT로 다시 정리해 summarydata의 오늘 행을 덮어씀
+SECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "points": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["title", "points"],
+    "additionalProperties": False,
+}
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def load_state(cursor, day_str):
+    cursor.execute(
+        """
+        SELECT last_updated_at, article_ids, overview, overview_key FROM summary_progress
+        WHERE summary_date = %s
+        """,
+        (day_str,),
+    )
+    progress = cursor.fetchone()
+    cursor.execute(
+        """
+        SELECT cluster_id, centroid, vector_sum, article_count, exemplars, section, section_key
+        FROM summary_clusters WHERE summary_date = %s ORDER BY cluster_id
+        """,
+        (day_str,),
+    )
+    clusters = [
+        {
+            "centroid": unpack_embedding(row[1]),
+            "sum": unpack_embedding(row[2]),
+            "count": row[3],
+            "exemplars": json.loads(row[4]),
+            "section": json.loads(row[5]) if row[5] else None,
+            "section_key": row[6],
+            "changed": False,
+        }
+        for row in cursor.fetchall()
+    ]
+    state = {
+        "updated_at": None, "article_ids": set(), "overview": None, "overview_key": None, "clusters": clusters,
+    }
+    if progress:
+        state.update(
+            updated_at=progress[0],
+            article_ids=set(json.loads(progress[1])) if progress[1] else set(),
+            overview=progress[2],
+            overview_key=progress[3],
+        )
+    return state
+
+
+# 그날 기사 중 updated_at이 since - TODAY_OVERLAP 이후인 행 (since가 없으면 전부)
+# → (id, 요약, 임베딩, updated_at) 목록, 이미 처리한 id는 호출하는 쪽에서 거름
+def load_new_rows(cursor, day_str, since):
+    start, end = day_range(day_str)
+    if since is None:
+        cursor.execute(
+            """
+            SELECT id, summary, embedding, updated_at FROM newsdata
+            WHERE publish_time >= %s AND publish_time < %s ORDER BY updated_at, id
+            """,
+            (start, end),
+        )
+    else:
+        cursor.execute(
+            """
+            SELECT id, summary, embedding, updated_at FROM newsdata
+            WHERE publish_time >= %s AND publish_time < %s AND updated_at >= %s ORDER BY updated_at, id
+            """,
+            (start, end, since - timedelta(seconds=TODAY_OVERLAP)),
+        )
+    return cursor.fetchall()
+
+
+# 새 기사를 기존 클러스터에 이어서 배정 (기존 클러스터 번호는 그대로)
+@timed("clustering", mode="incremental")
+def assign_new(state, summaries, vectors):
+    keep = [i for i, v in enumerate(vectors) if v is not None]
+    if not keep:
+        return 0
+    A = np.vstack([vectors[i] for i in keep]).astype(np.float32)
+    A /= np.linalg.norm(A, axis=1, keepdims=True)
+
+    clusters = state["clusters"]
+    initial = None
+    if clusters:
+        initial = (
+            np.vstack([c["centroid"] for c in clusters]),
+            np.vstack([c["sum"] for c in clusters]),
+            [c["count"] for c in clusters],
+        )
+    labels, _, _ = leader_cluster(
+        A, threshold=CLUSTER_THRESHOLD, update_centroids=CLUSTER_UPDATE_CENTROIDS, initial=initial
+    )
+    for row, label in enumerate(labels):
+        if label == len(clusters):
+            clusters.append({
+                "centroid": A[row].copy(), "sum": np.zeros_like(A[row]), "count": 0,
+                "exemplars": [], "section": None, "section_key": None, "changed": True,
+            })
+        c = clusters[label]
+        c["sum"] = c["sum"] + A[row]
+        c["count"] += 1
+        c["changed"] = True
+        if CLUSTER_UPDATE_CENTROIDS:
+            c["centroid"] = c["sum"] / np.linalg.norm(c["sum"])
+        if len(c["exemplars"]) < TODAY_EXEMPLARS:
+            c["exemplars"].append(summaries[keep[row]])
+    return len(keep)
+
+
+# 주제 하나 정리: {"title": 짧은 제목, "points": 핵심 2~3개}
+def gpt_section(exemplars):
+    lines = "\n".join(f"- {s}" for s in exemplars)
+    raw = cached_chat_completion(
+        get_client(),
+        SECTION_PROMPT_VERSION,
+        model=model_version,
+        messages=[
+            {"role": "system", "content": "넌 뉴스 리포트를 작성하는 시스템이다."},
+            {"role": "user", "content": f"""
+다음은 같은 주제를 다루는 기술 뉴스 기사 요약이다.
+
+요구사항:
+1. title: 주제를 나타내는 짧은 제목을 붙여라.
+2. points: 대표 내용 2~3개를 한 문장씩 정리하라.
+
+입력:
+{lines}
+"""},
+        ],
+        temperature=0.4,
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "today_section", "strict": True, "schema": SECTION_SCHEMA},
+        },
+    )
+    data = json.loads(raw)
+    return {"title": data["title"].strip(), "points": [p.strip() for p in data["points"] if p.strip()]}
+
+
+def gpt_overview(topics):
+    lines = "\n".join(f"- {c['section']['title']} ({c['count']}건)" for c in topics)
+    return cached_chat_completion(
+        get_client(),
+        OVERVIEW_PROMPT_VERSION,
+        model=model_version,
+        messages=[
+            {"role": "system", "content": "넌 뉴스 리포트를 작성하는 시스템이다."},
+            {"role": "user", "content": f"다음은 오늘 지금까지의 기술 뉴스 주제다. 하루 흐름을 2~3문장으로 요약하라.\n\n{lines}"},
+        ],
+        temperature=0.4,
+    ).strip()
+
+
+def render_today(topics, overview, total, now):
+    parts = [f"<p>{now:%H:%M} 기준 {total}건</p>"]
+    for c in topics:
+        section = c["section"]
+        items = "".join(f"<li>{html.escape(p)}</li>" for p in section["points"])
+        parts.append(f"<h3>{html.escape(section['title'])} ({c['count']}건)</h3>\n<ul>{items}</ul>")
+    if overview:
+        parts.append(f"<p><strong>오늘 요약:</strong> {html.escape(overview)}</p>")
+    return "\n".join(parts)
+
+
+def save_state(conn, cursor, day_str, state, now):
+    rows = [
+        (
+            day_str, cid, pack_embedding(c["centroid"]), pack_embedding(c["sum"]), c["count"],
+            json.dumps(c["exemplars"], ensure_ascii=False),
+            json.dumps(c["section"], ensure_ascii=False) if c["section"] else None,
+            c["section_key"],
+        )
+        for cid, c in enumerate(state["clusters"])
+        if c["changed"]
+    ]
+    cursor.executemany(
+        """
+        INSERT INTO summary_clusters
+            (summary_date, cluster_id, centroid, vector_sum, article_count, exemplars, section, section_key)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            centroid = VALUES(centroid), vector_sum = VALUES(vector_sum),
+            article_count = VALUES(article_count), exemplars = VALUES(exemplars),
+            section = VALUES(section), section_key = VALUES(section_key)
+        """,
+        rows,
+    )
+    cursor.execute(
+        """
+        INSERT INTO summary_progress
+            (summary_date, last_updated_at, article_ids, overview, overview_key, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            last_updated_at = VALUES(last_updated_at), article_ids = VALUES(article_ids),
+            overview = VALUES(overview), overview_key = VALUES(overview_key), updated_at = VALUES(updated_at)
+        """,
+        (
+            day_str, state["updated_at"], json.dumps(sorted(state["article_ids"])),
+            state["overview"], state["overview_key"], now,
+        ),
+    )
+    # 지난 날짜 상태 정리 (그날 리포트는 밤 배치가 전체 군집화로 다시 만듦)
+    old = (now - timedelta(days=TODAY_STATE_DAYS)).strftime("%Y-%m-%d")
+    cursor.execute("DELETE FROM summary_clusters WHERE summary_date < %s", (old,))
+    cursor.execute("DELETE FROM summary_progress WHERE summary_date < %s", (old,))
     conn.commit()
-    print("최종 요약 DB 저장 성공")
-except Exception as e:
-    print(f"[DB 저장 실패] {e}")
 
-cursor.close()
-conn.close()
-print("프로세스 종료")
\ No newline at end of file
+
+# day(기본: 오늘)의 중간 리포트를 새 기사만 반영해 갱신 → 리포트를 저장했으면 True
+@timed("summary_incremental")
+def run_incremental(day=None):
+    now = datetime.now()
+    day_str = (day or now).strftime("%Y-%m-%d")
+    print(f"중간 요약 날짜: {day_str}")
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            state = load_state(cursor, day_str)
+            fetched = load_new_rows(cursor, day_str, state["updated_at"])
+        finally:
+            cursor.close()
+    rows = [row for row in fetched if row[0] not in state["article_ids"]]
+    print(f"기존 클러스터 {len(state['clusters'])}개 / 새 기사 {len(rows)}개")
+    if not rows:
+        return False
+
+    vectors = load_vectors(rows)
+    assigned = assign_new(state, [row[1] for row in rows], vectors)
+    # 임베딩에 실패한 기사도 처리한 것으로 둠 (밤 배치 전체 요약에는 다시 포함됨)
+    state["article_ids"].update(row[0] for row in rows)
+    state["updated_at"] = max(row[3] for row in fetched)
+
+    clusters = state["clusters"]
+    order = sorted(range(len(clusters)), key=lambda c: (-clusters[c]["count"], c))
+    topics = [clusters[c] for c in order[:TODAY_TOPICS]]
+    regenerated = 0
+    for c in topics:
+        key = _digest(c["exemplars"])
+        if c["section_key"] == key:
+            continue
+        try:
+            c["section"] = gpt_section(c["exemplars"])
+            c["section_key"] = key
+            c["changed"] = True
+            regenerated += 1
+        except Exception as e:
+            print(f"[GPT 주제 정리 실패] {e}")
+    topics = [c for c in topics if c["section"]]
+
+    overview_key = _digest(sorted(c["section"]["title"] for c in topics))
+    if topics and overview_key != state["overview_key"]:
+        try:
+            state["overview"] = gpt_overview(topics)
+            state["overview_key"] = overview_key
+        except Exception as e:
+            print(f"[GPT 오늘 요약 실패] {e}")
+    print(f"새 기사 {assigned}개 배정, 주제 {regenerated}개 다시 정리")
+
+    total = sum(c["count"] for c in clusters)
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            saved = bool(topics) and save_summary(
+                conn, cursor, day_str, render_today(topics, state["overview"], total, now)
+            )
+            save_state(conn, cursor, day_str, state, now)
+        finally:
+            cursor.close()
+
+    write_report(
+        "summary_incremental",
+        {
+            "date": day_str,
+            "new_articles": len(rows),
+            "clusters": len(clusters),
+            "sections_regenerated": regenerated,
+            "token_usage": usage_stats(),
+        },
+    )
+    return saved
+
+
+# newsdata.embedding 전체를 요약문 벡터로 다시 계산 (예전 main.py가 본문 벡터를 넣은 행 정리용)
+# 바뀐 행은 updated_at이 올라가 웹 벡터 색인이 다음 갱신 때 반영 (색인을 지울 필요 없음) → 갱신한 행 수
+def reembed_all(batch=1000):
+    total, last_id = 0, 0
+    while True:
+        with connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "SELECT id, summary FROM newsdata WHERE id > %s AND summary IS NOT NULL ORDER BY id LIMIT %s",
+                    (last_id, batch),
+                )
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        embs = get_embeddings(get_client(), [row[1] for row in rows], model=embedding_model)
+        ok = ~failed_rows(embs)
+        with connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(
+                    "UPDATE newsdata SET embedding = %s WHERE id = %s",
+                    [(pack_embedding(embs[j]), row[0]) for j, row in enumerate(rows) if ok[j]],
+                )
+                conn.commit()
+            finally:
+                cursor.close()
+        total += int(ok.sum())
+        print(f"요약문 임베딩 {total}건 갱신")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="하루 뉴스 요약 리포트")
+    parser.add_argument("--date", help="요약할 날짜 (YYYY-MM-DD, 기본: 어제, --incremental이면 오늘)")
+    parser.add_argument("--incremental", action="store_true", help="새 기사만 반영해 오늘 중간 리포트 갱신")
+    parser.add_argument("--reembed", action="store_true", help="저장된 임베딩을 모두 요약문 벡터로 다시 계산")
+    args = parser.parse_args()
+    try:
+        day = datetime.strptime(args.date, "%Y-%m-%d") if args.date else None
+        if args.reembed:
+            reembed_all()
+        elif args.incremental:
+            run_incremental(day)
+        else:
+            run_summary(day)
+    except Exception as e:
+        print(f"[요약 실패] {e}")
+    finally:
+        close_connection()
+    print("프로세스 종료")
@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+_ARTICLE = "첫 문장이다.\n둘째 줄이다.\n\n셋째 문단이다."
+
+
+class FakeClient:
+    # chat.completions.create 흉내: 받은 요청을 모아 두고 정해 둔 응답을 돌려줌
+    def __init__(self, analyze="{}"):
+        self.analyze = analyze
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        prompt = kwargs["messages"][-1]["content"]
+        if "response_format" in kwargs:
+            content = self.analyze
+        elif "세부 카테고리" in prompt:
+            content = f"카테고리: {main.subcategories[1]}"
+        elif "자극성" in prompt:
+            content = "자극성: 4"
+        else:
+            content = "개별 요약문."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE", "0")
+    fake = FakeClient()
+    monkeypatch.setattr(main, "get_client", lambda: fake)
+    return fake
+
+
+def _prompts(client):
+    return [r["messages"][-1]["content"] for r in client.requests]
+
+
+def test_prompt_lines_have_no_leading_whitespace(client):
+    main.gpt_summarize(_ARTICLE)
+    main.gpt_summarize_chunk(_ARTICLE, 1, 2)
+    prompt = main.analyze_request("제목", _ARTICLE)["messages"][-1]["content"]
+
+    for text in _prompts(client) + [prompt]:
+        assert _ARTICLE in text
+        assert not [line for line in text.splitlines() if line[:1].isspace()]
+    assert "\n".join(main.subcategories) in prompt
+
+
+def test_combined_result_is_used_when_valid(client):
+    data = {"summary": "통합 요약문.", "subcategory": main.subcategories[0], "headline_score": 7}
+    client.analyze = json.dumps(data, ensure_ascii=False)
+    assert main.analyze_combined("제목", _ARTICLE) == ("통합 요약문.", main.subcategories[0], 7)
+    assert len(client.requests) == 1
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        "요약: JSON이 아님",
+        '{"summary": "잘린 응답',
+        '{"subcategory": "모바일", "headline_score": 3}',
+        '{"summary": "  ", "subcategory": "모바일", "headline_score": 3}',
+        '{"summary": null, "subcategory": "모바일", "headline_score": 3}',
+        '{"summary": "요약.", "subcategory": "없는 카테고리", "headline_score": 3}',
+        '{"summary": "요약.", "subcategory": "모바일", "headline_score": 11}',
+        '{"summary": "요약.", "subcategory": "모바일", "headline_score": -1}',
+        '{"summary": "요약.", "subcategory": "모바일", "headline_score": "5"}',
+        '{"summary": "요약.", "subcategory": "모바일", "headline_score": true}',
+    ],
+)
+def test_bad_combined_result_falls_back_to_three_calls(client, payload):
+    client.analyze = payload
+    assert main.analyze_combined("제목", _ARTICLE) == ("개별 요약문.", main.subcategories[1], 4)
+    # 통합 호출 1번 + 요약/분류/자극성 3번
+    assert len(client.requests) == 4
+    assert "response_format" in client.requests[0]
@@ -0,0 +1,93 @@
+import datetime
+import re
+
+import pymysql
+
+import app as app_module
+from benchmarks import fake_db
+from db import bump_data_version
+
+
+def _client(tmp_path, monkeypatch):
+    path = str(tmp_path / "news.sqlite3")
+    fake_db.create(path)
+    monkeypatch.setattr(pymysql, "connect", lambda **kwargs: fake_db.Connection(path))
+    monkeypatch.setattr(app_module, "VECTOR_INDEX_DIR", str(tmp_path / "vector_index"))
+    # data_version은 매 요청 다시 읽고, 기사 수/검색 색인은 TTL로는 만료되지 않게
+    monkeypatch.setattr(app_module, "DATA_VERSION_TTL", 0)
+    monkeypatch.setattr(app_module, "COUNT_CACHE_TTL", 3600)
+    monkeypatch.setattr(app_module, "HOME_CACHE_TTL", 3600)
+    monkeypatch.setattr(app_module, "SEARCH_REFRESH_INTERVAL", 3600)
+    return path, app_module.create_app().test_client()
+
+
+def _add_articles(path, start, n, subcategory="모바일"):
+    conn = fake_db.Connection(path)
+    cur = conn.cursor()
+    cur.executemany(
+        """
+        INSERT INTO newsdata (press, subcategory, title, link, publish_time, journalist, summary, link_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        [
+            ("연합뉴스", subcategory, f"반도체 기사 {i}", f"https://example.com/{i}",
+             f"2025-01-01 00:{i // 60:02d}:{i % 60:02d}", "홍길동 기자", f"요약 {i}", f"{i:040x}")
+            for i in range(start, start + n)
+        ],
+    )
+    conn.commit()
+    bump_data_version(conn, "newsdata")
+    conn.close()
+
+
+def _page_labels(res):
+    html = res.get_data(as_text=True)
+    block = html.split('class="pagination"', 1)[1].split("</div>", 1)[0]
+    return re.findall(r">\s*(\d+)\s*<", block)
+
+
+def test_list_total_follows_data_version(tmp_path, monkeypatch):
+    path, client = _client(tmp_path, monkeypatch)
+    _add_articles(path, 0, 25)
+    assert _page_labels(client.get("/?category=모바일")) == ["1", "2", "3"]
+
+    _add_articles(path, 25, 30)
+    assert _page_labels(client.get("/?category=모바일")) == ["1", "2", "3", "4", "5", "6"]
+
+
+def test_search_follows_data_version(tmp_path, monkeypatch):
+    path, client = _client(tmp_path, monkeypatch)
+    _add_articles(path, 0, 5)
+    assert "반도체 기사 7" not in client.get("/?category=전체&field=title&query=반도체").get_data(as_text=True)
+
+    _add_articles(path, 5, 5)
+    assert "반도체 기사 7" in client.get("/?category=전체&field=title&query=반도체").get_data(as_text=True)
+
+
+def test_home_follows_upserts_without_new_ids(tmp_path, monkeypatch):
+    path, client = _client(tmp_path, monkeypatch)
+    now = datetime.datetime.now().replace(microsecond=0)
+    conn = fake_db.Connection(path)
+    cur = conn.cursor()
+    cur.executemany(
+        """
+        INSERT INTO newsdata (id, press, subcategory, title, link, publish_time, journalist, summary,
+                              relevance_score, headline_score, link_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        [
+            (i, "연합뉴스", "모바일", f"홈 기사 {i}", f"https://example.com/{i}", now, "홍길동 기자",
+             f"요약 {i}", score, score, f"{i:040x}")
+            for i, score in ((5, 10), (9, 5))
+        ],
+    )
+    conn.commit()
+    bump_data_version(conn, "newsdata")
+    assert "홈 기사 5" in client.get("/home").get_data(as_text=True)
+
+    # 기존 기사 upsert: MAX(id)는 그대로지만 data_version이 올라감
+    cur.execute("UPDATE newsdata SET title = %s, relevance_score = 90 WHERE id = 9", ("홈 기사 9 갱신",))
+    conn.commit()
+    bump_data_version(conn, "newsdata")
+    conn.close()
+    assert "홈 기사 9 갱신" in client.get("/home").get_data(as_text=True)
@@ -0,0 +1,79 @@
+import glob
+import os
+import random
+
+import pytest
+
+import article_parser
+from article_parser import parse_article, parse_article_soup
+from benchmarks.fixtures import RECORDED_FIXTURES
+
+# 네이버 기사 페이지 구조(헤더, dic_area, 사진 설명, byline, 댓글 스크립트)를 따른 저장 페이지
+# + 녹화 픽스처가 있으면 그 기사 페이지도
+PAGES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "pages", "*.html")))
+PAGES += sorted(glob.glob(os.path.join(RECORDED_FIXTURES, "article", "*.html")))
+
+_HEAD = (
+    "<span class='media_end_head_info_datestamp_time' data-date-time='2025-01-01 00:00:00'>t</span>"
+    "<em class='media_end_head_journalist_name'>홍길동 기자</em>"
+    "<span class='media_end_head_top_logo_text'>합성일보</span>"
+)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+@pytest.mark.parametrize("chunk", [16 * 1024, 7])
+def test_saved_pages_match_soup(path, chunk, monkeypatch):
+    # 작은 청크로도 읽어 청크 경계에서 나뉜 태그/문자열 확인
+    monkeypatch.setattr(article_parser, "FEED_CHUNK", chunk)
+    html = _read(path)
+    assert parse_article(html) == parse_article_soup(html)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "<p>a<![CDATA[b]]>c</p>",
+        "<p>a <![CDATA[ b ]]> c</p>",
+        # 닫는 태그는 그 사이에 열린 <p>도 닫음
+        "<span><p>x</span>y</p>",
+        "<b><p>q</b>r</p>s",
+        "<div><p>a</div>b</p>",
+        # 짝이 없는 닫는 태그는 무시
+        "<p>x</i>y</p></p>z",
+        "<p>1<p>2</p>3</p>",
+        "a<br>b<br/>c</br>d",
+        "<template><p>t</p></template><p>z</p>",
+        "<p>a<!--x-->b<?pi x?>c</p>",
+    ],
+)
+def test_malformed_markup_matches_soup(body):
+    html = f"<html><body>{_HEAD}<div id='newsct_article'>{body}</div></body></html>"
+    assert parse_article(html) == parse_article_soup(html)
+
+
+def test_header_capture_closes_with_parent():
+    html = (
+        "<div><span class='media_end_head_top_logo_text'>합성<b>일보</span>바깥</b></div>"
+        "<em class='media_end_head_journalist_name'>홍길동</em>"
+        "<div id='newsct_article'><p>본문</p></div>"
+    )
+    assert parse_article(html) == parse_article_soup(html)
+    assert parse_article(html)["press"] == "합성일보"
+
+
+def test_random_tag_soup_matches_soup():
+    pieces = [
+        "<p>", "</p>", "<div>", "</div>", "<span>", "</span>", "<b>", "</b>", "<br>", "<p/>",
+        "<script>x<p>s</p></script>", "<!-- c -->", "<![CDATA[ cd ]]>", "<template>", "</template>",
+        "<div id='newsct_article'>", "<span class='media_end_head_top_logo_text'>",
+        "<em class='media_end_head_journalist_name'>", "</em>", " 가 ", "나", "&amp;", "<img src=x>",
+    ]
+    rng = random.Random(0)
+    for _ in range(2000):
+        html = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+        assert parse_article(html) == parse_article_soup(html), html
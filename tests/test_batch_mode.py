@@ -0,0 +1,146 @@
+import json
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+import batch_mode
+import main
+from batch_mode import BatchCheckpoints, BatchRequests, CHAT_ENDPOINT, EMBEDDING_ENDPOINT
+from benchmarks import fake_db
+from llm_cache import LLMCache
+
+
+class StubClient:
+    # Batch API 흉내: 올린 JSONL을 보관하고, complete() 전까지 배치는 in_progress
+    def __init__(self):
+        self.uploads = {}
+        self.retrieves = 0
+        self._batches = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.uploads)}"
+        self.uploads[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        batch_id = f"batch-{len(self._batches)}"
+        self._batches[batch_id] = SimpleNamespace(
+            id=batch_id, status="in_progress", output_file_id=None, input_file_id=input_file_id
+        )
+        return self._batches[batch_id]
+
+    def _retrieve(self, batch_id):
+        self.retrieves += 1
+        return self._batches[batch_id]
+
+    def _content(self, file_id):
+        return SimpleNamespace(text=self.uploads[file_id])
+
+    # 올린 요청마다 정상 응답을 만들어 배치를 끝냄 (fail에 든 custom_id는 오류)
+    def complete(self, batch_id, fail=()):
+        batch = self._batches[batch_id]
+        lines = []
+        for raw in self.uploads[batch.input_file_id].splitlines():
+            request = json.loads(raw)
+            if request["custom_id"] in fail:
+                lines.append({"custom_id": request["custom_id"], "response": {"status_code": 500, "body": {}}})
+            elif request["url"] == CHAT_ENDPOINT:
+                body = {"choices": [{"message": {"content": f"응답 {request['custom_id']}"}}]}
+                lines.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}})
+            else:
+                body = {"data": [{"embedding": [0.5, 0.5]}]}
+                lines.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}})
+        output_id = f"file-{len(self.uploads)}"
+        self.uploads[output_id] = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines)
+        batch.status, batch.output_file_id = "completed", output_id
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    client = StubClient()
+    cache = LLMCache(str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setattr(batch_mode, "BATCH_DIR", str(tmp_path / "batch"))
+    monkeypatch.setattr(batch_mode, "get_cache", lambda: cache)
+    client.cache = cache
+    return client
+
+
+def _requests(cache):
+    requests = BatchRequests(cache)
+    requests.add_chat("analyze-0", "v1", {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "기사"}]})
+    requests.add_embedding("title-0", "제목", "text-embedding-3-small")
+    return requests
+
+
+def test_collect_stores_results_in_cache(stub):
+    requests = _requests(stub.cache)
+    batch_ids = batch_mode.submit(stub, requests, "run")
+    assert set(batch_ids) == {CHAT_ENDPOINT, EMBEDDING_ENDPOINT}
+
+    stub.complete(batch_ids[CHAT_ENDPOINT])
+    stub.complete(batch_ids[EMBEDDING_ENDPOINT], fail={"title-0"})
+    assert batch_mode.collect(stub, batch_ids, requests.keys, max_wait=0)
+
+    chat_key = requests.keys["analyze-0"][1]
+    assert stub.cache.get(chat_key) == "응답 analyze-0".encode("utf-8")
+    # 실패한 요청은 캐시에 없음 → 실시간 호출로 처리
+    assert stub.cache.get(requests.keys["title-0"][1]) is None
+    # 캐시에 들어간 요청은 다음 배치에 다시 넣지 않음
+    assert len(_requests(stub.cache)) == 1
+
+
+def test_collect_without_wait_polls_once(stub, monkeypatch):
+    requests = _requests(stub.cache)
+    batch_ids = batch_mode.submit(stub, requests, "run")
+    monkeypatch.setattr(time, "sleep", lambda seconds: pytest.fail("기다리면 안 됨"))
+
+    assert not batch_mode.collect(stub, batch_ids, requests.keys, max_wait=0)
+    assert stub.retrieves == 2
+
+
+def test_wait_stops_at_max_wait(stub):
+    batch_ids = batch_mode.submit(stub, _requests(stub.cache), "run")
+    started = time.monotonic()
+    assert batch_mode.wait(stub, list(batch_ids.values()), max_wait=0.3, poll_interval=0.05) is None
+    assert time.monotonic() - started < 1.0
+
+
+def test_run_batch_does_not_block_on_earlier_runs(stub, monkeypatch, tmp_path):
+    path = str(tmp_path / "news.sqlite3")
+    fake_db.create(path)
+
+    @contextmanager
+    def connection():
+        conn = fake_db.Connection(path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    requests = _requests(stub.cache)
+    batch_ids = batch_mode.submit(stub, requests, "earlier")
+    with connection() as conn:
+        BatchCheckpoints(conn).create(batch_ids, {"items": [], "keys": requests.keys})
+
+    monkeypatch.setattr(main, "get_cache", lambda: stub.cache)
+    monkeypatch.setattr(main, "get_client", lambda: stub)
+    monkeypatch.setattr(main, "connection", connection)
+    monkeypatch.setattr(main, "collect_candidates", lambda: [])
+    monkeypatch.setattr(main, "BATCH_MAX_WAIT", 3600)
+    monkeypatch.setattr(time, "sleep", lambda seconds: pytest.fail("이전 배치를 기다리면 안 됨"))
+
+    assert main.run_batch() == (0, 0)
+    with connection() as conn:
+        assert len(BatchCheckpoints(conn).pending()) == 1
+
+    # 다음 실행에서 끝난 배치를 마무리
+    for batch_id in batch_ids.values():
+        stub.complete(batch_id)
+    assert main.run_batch() == (0, 0)
+    with connection() as conn:
+        assert BatchCheckpoints(conn).pending() == []
+    assert stub.cache.get(requests.keys["analyze-0"][1]) is not None
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from benchmarks.fixtures import ARTICLE_URL, FixtureServer
+from crawler import Crawler, HostRateLimiter, load_sections
+
+
+def _list(aids, cursor=None):
+    rows = "".join(
+        "<li class='sa_item'><div class='sa_text'>"
+        f"<a class='sa_text_title' href='{ARTICLE_URL.format(oid='001', aid=aid)}'><strong>기사 {aid}</strong></a>"
+        "</div></li>"
+        for aid in aids
+    )
+    more = f"<div data-cursor='{cursor}'></div>" if cursor else ""
+    return f"<ul class='sa_list'>{rows}</ul>{more}"
+
+
+def _first_page(latest, headline=(), cursor=None):
+    head = f"<div class='section_component as_headline'>{_list(headline)}</div>" if headline else ""
+    return f"<html><body>{head}<div class='section_latest'>{_list(latest, cursor)}</div></body></html>"
+
+
+# 섹션별 페이지 HTML을 픽스처 폴더로 쓰고 로컬 서버로 띄운 수집기
+@pytest.fixture
+def make_crawler(tmp_path):
+    servers = []
+
+    def make(pages, sids=("105",)):
+        for (sid, page), html in pages.items():
+            path = tmp_path / "section" / sid / f"{page}.html"
+            os.makedirs(path.parent, exist_ok=True)
+            path.write_text(html, encoding="utf-8")
+        server = FixtureServer(str(tmp_path))
+        servers.append(server)
+        crawler = Crawler(
+            load_sections(list(sids)),
+            base_url=server.start(),
+            rate_limiter=HostRateLimiter(rate=1e9, burst=1e9),
+        )
+        requested = []
+        get = crawler.get
+
+        def recording_get(url, **kwargs):
+            requested.append((kwargs.get("params") or {}).get("pageNo", 1))
+            return get(url, **kwargs)
+
+        crawler.get = recording_get
+        return crawler, requested
+
+    yield make
+    for server in servers:
+        server.stop()
+
+
+def known_in_db(*aids):
+    return lambda links: {link for link in links if link.rsplit("/", 1)[1] in aids}
+
+
+def aids_of(candidates):
+    return [c["link"].rsplit("/", 1)[1] for c in candidates]
+
+
+def test_stored_headline_block_does_not_stop_paging(make_crawler):
+    crawler, requested = make_crawler(
+        {
+            ("105", 1): _first_page(["10", "11"], headline=["1", "2"], cursor="c2"),
+            ("105", 2): _list(["12", "13"], "c3"),
+            ("105", 3): _list(["14", "15"], "c4"),
+            ("105", 4): _list(["16"]),
+        }
+    )
+    candidates = crawler.crawl(known_in_db("1", "2", "14"))
+    assert aids_of(candidates) == ["10", "11", "12", "13", "15"]
+    # 최신순 목록이 저장된 기사(14)에 닿은 3페이지에서 멈춤
+    assert requested == [1, 2, 3]
+
+
+def test_links_seen_in_other_section_do_not_stop_paging(make_crawler):
+    crawler, requested = make_crawler(
+        {
+            ("105", 1): _first_page(["1", "2"]),
+            ("101", 1): _first_page(["1", "2"], cursor="c2"),
+            ("101", 2): _list(["3", "4"], "c3"),
+            ("101", 3): _list(["5"]),
+        },
+        sids=("105", "101"),
+    )
+    candidates = crawler.crawl(known_in_db("4"))
+    assert aids_of(candidates) == ["1", "2", "3"]
+    assert [c["sid"] for c in candidates] == ["105", "105", "101"]
+    assert requested == [1, 1, 2]
+
+
+def test_page_of_only_stored_links_stops_paging(make_crawler):
+    crawler, requested = make_crawler(
+        {
+            ("105", 1): _first_page([], headline=["1", "2"], cursor="c2"),
+            ("105", 2): _list(["3"]),
+        }
+    )
+    assert crawler.crawl(known_in_db("1", "2")) == []
+    assert requested == [1]
+
+
+def test_paging_stops_without_next_cursor(make_crawler):
+    crawler, requested = make_crawler({("105", 1): _first_page(["1", "2"])})
+    assert aids_of(crawler.crawl(known_in_db())) == ["1", "2"]
+    assert requested == [1]
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, n):
+        self.n = n
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if self.broken:
+            raise ConnectionError("연결 끊김")
+
+    def rollback(self):
+        if self.broken:
+            raise ConnectionError("연결 끊김")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    # connect() 대역: 만든 커넥션을 순서대로 모아 둠
+    def __init__(self):
+        self.made = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.made))
+        self.made.append(conn)
+        return conn
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=1, max_size=2, wait_timeout=0.05)
+
+    with pool.connection(), pool.connection():
+        started = time.monotonic()
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+        assert time.monotonic() - started >= 0.05
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["waits"] == 1
+    assert stats["in_use"] == 0 and stats["idle"] == 2
+    assert len(factory.made) == 2
+
+
+def test_waiting_checkout_gets_returned_connection():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=1, max_size=1, wait_timeout=2)
+    got = []
+
+    def borrow():
+        with pool.connection() as conn:
+            got.append(conn)
+
+    with pool.connection() as first:
+        worker = threading.Thread(target=borrow)
+        worker.start()
+        time.sleep(0.05)
+        assert not got
+    worker.join(1)
+
+    assert got == [first]
+    assert pool.stats()["waits"] == 1 and len(factory.made) == 1
+
+
+def test_broken_connection_is_replaced():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=1, max_size=2)
+
+    with pool.connection() as conn:
+        assert conn is factory.made[0]
+    # 쉬는 동안 끊긴 커넥션은 대여할 때 ping으로 걸러 새로 만듦
+    conn.broken = True
+    with pool.connection() as conn:
+        assert conn is factory.made[1]
+    assert factory.made[0].closed
+    assert pool.stats()["health_check_failures"] == 1
+
+    # 쓰는 중 끊겨 반납 때 rollback이 실패하면 풀에 돌려놓지 않음
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.broken = True
+            raise RuntimeError("쿼리 실패")
+    assert factory.made[1].closed
+    assert pool.stats()["idle"] == 0
+    with pool.connection() as conn:
+        assert conn is factory.made[2]
+
+
+def test_expired_connection_is_replaced():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=1, max_size=1, max_lifetime=0.01)
+    with pool.connection() as first:
+        pass
+    time.sleep(0.02)
+    with pool.connection() as conn:
+        assert conn is not first
+    assert first.closed and not conn.closed
+    assert pool.stats()["closes"] == 1
+
+
+def test_failed_connect_frees_its_slot():
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("DB 접속 실패")
+        return FakeConnection(len(calls))
+
+    pool = ConnectionPool(connect, min_size=0, max_size=1, wait_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        with pool.connection():
+            pass
+    with pool.connection():
+        assert pool.stats()["in_use"] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork 필요")
+def test_child_process_starts_with_fresh_pool():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=2, max_size=2)
+    with pool.connection():
+        pass
+    parent = list(factory.made)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # 자식: 부모 커넥션은 닫지 않고 버린 뒤 새로 만들어야 함
+        try:
+            with pool.connection() as conn:
+                ok = conn not in parent and not any(c.closed for c in parent)
+                ok = ok and pool.stats()["creates"] == 2 and pool.stats()["borrows"] == 1
+            os.write(write_fd, b"1" if ok else b"0")
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    _, status = os.waitpid(pid, 0)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+
+    assert status == 0 and result == b"1"
+    # 부모 쪽 풀은 그대로
+    assert pool.stats()["idle"] == 2 and pool.stats()["creates"] == 2
+
+
+def test_connection_borrowed_before_fork_is_not_pooled_in_child():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=1, max_size=1)
+    entry = pool._acquire()
+    pool._pid = -1  # fork된 자식에서 반납하는 상황
+    pool._release(entry)
+    assert entry[0].closed
+    assert pool.stats()["idle"] == 0
@@ -0,0 +1,89 @@
+import pytest
+
+import dedup
+from benchmarks import fake_db
+from dedup import find_known_links, link_hash, normalize_url
+
+CANONICAL = "https://n.news.naver.com/mnews/article/001/0014567890"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        CANONICAL,
+        "https://n.news.naver.com/mnews/article/001/0014567890?sid=101",
+        "https://m.news.naver.com/article/001/0014567890",
+        "http://news.naver.com/article/001/0014567890/",
+        "https://mnews.naver.com/mnews/article/001/0014567890#comment",
+        "https://news.naver.com/main/read.naver?mode=LSD&mid=shm&sid1=101&oid=001&aid=0014567890",
+        "https://m.news.naver.com/read.naver?oid=001&aid=0014567890&utm_source=kakao",
+        "  https://N.NEWS.NAVER.COM/mnews/article/001/0014567890  ",
+    ],
+)
+def test_naver_article_forms_share_one_url(url):
+    assert normalize_url(url) == CANONICAL
+    assert link_hash(url) == link_hash(CANONICAL)
+
+
+def test_other_naver_articles_stay_apart():
+    assert normalize_url("https://n.news.naver.com/mnews/article/001/0014567891") != CANONICAL
+    assert normalize_url("https://n.news.naver.com/mnews/article/023/0014567890") != CANONICAL
+    # 기사 번호가 없는 네이버 주소는 일반 URL처럼 정규화
+    assert normalize_url("https://news.naver.com/section/101?utm_medium=x") == "https://news.naver.com/section/101"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        # 모바일 호스트와 데스크톱 호스트
+        ("https://m.example.com/news/1", "https://example.com/news/1"),
+        ("https://mobile.example.com/news/1", "https://example.com/news/1"),
+        # 추적용 파라미터는 버리고 나머지는 정렬
+        ("https://example.com/news?id=7&utm_source=fb&utm_campaign=a&fbclid=x", "https://example.com/news?id=7"),
+        ("https://example.com/news?b=2&ref=main&a=1&gclid=z", "https://example.com/news?a=1&b=2"),
+        ("https://example.com/news?UTM_Source=x&id=7", "https://example.com/news?id=7"),
+        # 프래그먼트, 끝 슬래시, 기본 포트, http
+        ("http://example.com:80/news/1/#top", "https://example.com/news/1"),
+        ("https://example.com:8443/news/1", "https://example.com:8443/news/1"),
+        ("https://example.com", "https://example.com/"),
+    ],
+)
+def test_generic_urls_are_normalized(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_non_tracking_params_are_kept():
+    assert normalize_url("https://example.com/news?id=7") != normalize_url("https://example.com/news?id=8")
+    assert normalize_url("https://example.com/news?id=") == "https://example.com/news?id="
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "news.sqlite3")
+    fake_db.create(path)
+    conn = fake_db.Connection(path)
+    yield conn
+    conn.close()
+
+
+def _store(conn, link):
+    cur = conn.cursor()
+    cur.execute("INSERT INTO newsdata (title, link, link_hash) VALUES (%s, %s, %s)", ("제목", link, link_hash(link)))
+    conn.commit()
+
+
+def test_find_known_links_matches_any_form_of_stored_link(db, monkeypatch):
+    # 조회를 여러 번 나눠 하도록 묶음 크기를 줄임
+    monkeypatch.setattr(dedup, "LOOKUP_CHUNK", 2)
+    _store(db, CANONICAL)
+    _store(db, "https://example.com/news/1")
+
+    links = [
+        "https://m.news.naver.com/read.naver?oid=001&aid=0014567890",
+        "https://news.naver.com/article/001/0014567890#comment",
+        "https://n.news.naver.com/mnews/article/001/0014567891",
+        "https://m.example.com/news/1?utm_source=x",
+        "https://example.com/news/2",
+    ]
+    assert find_known_links(db, links) == set(links[:2] + links[3:4])
+    assert find_known_links(db, []) == set()
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import embedding
+from embedding import EmbeddingError, failed_rows, get_embeddings
+from openai_scheduler import RequestScheduler
+
+BAD = "API가 거부하는 입력"
+
+
+class FakeClient:
+    # embeddings.create 흉내: BAD가 든 요청은 통째로 실패, 나머지는 입력별로 정해진 벡터
+    def __init__(self, bad=(BAD,)):
+        self.bad = set(bad)
+        self.requests = []
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input):
+        self.requests.append(list(input))
+        if self.bad & set(input):
+            raise ValueError("invalid input")
+        data = [SimpleNamespace(index=i, embedding=_vector(t)) for i, t in reversed(list(enumerate(input)))]
+        return SimpleNamespace(data=data, usage=None)
+
+
+def _vector(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE", "0")
+    scheduler = RequestScheduler()
+    monkeypatch.setattr(embedding, "get_scheduler", lambda: scheduler)
+
+
+def test_failing_input_is_bisected_out_of_its_batch():
+    texts = [f"기사 {i} 요약문" for i in range(8)]
+    texts[5] = BAD
+    client = FakeClient()
+
+    result = get_embeddings(client, texts)
+
+    assert result.shape == (8, 3)
+    assert failed_rows(result).tolist() == [i == 5 for i in range(8)]
+    for i, text in enumerate(texts):
+        if i != 5:
+            np.testing.assert_array_equal(result[i], _vector(text))
+    # 8건 → 4+4 → 2+2 → 1+1 로 나누되 실패한 쪽만 더 나눔
+    assert client.requests == [texts, texts[:4], texts[4:], texts[4:6], [texts[4]], [BAD], texts[6:]]
+
+
+def test_batches_are_bisected_independently():
+    texts = [f"기사 {i}" for i in range(5)]
+    client = FakeClient()
+    result = get_embeddings(client, texts[:2] + [BAD] + texts[2:], batch_size=3)
+    assert failed_rows(result).tolist() == [False, False, True, False, False, False]
+    # 실패가 없는 두 번째 배치는 한 번에 보냄
+    assert [texts[2], texts[3], texts[4]] in client.requests
+
+
+def test_all_inputs_failing_raises():
+    with pytest.raises(EmbeddingError):
+        get_embeddings(FakeClient(bad=("a", "b")), ["a", "b"])
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import main
+from benchmarks import fake_db
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "news.sqlite3")
+    fake_db.create(path)
+    conn = fake_db.Connection(path)
+    yield conn
+    conn.close()
+
+
+def _article(n, **kw):
+    return {
+        "언론사": "연합뉴스",
+        "세부카테고리": "반도체",
+        "제목": f"기사 {n}",
+        "URL": f"https://n.news.naver.com/mnews/article/001/{n:010d}",
+        "발행시간": datetime(2025, 1, 1, 9, n),
+        "기자": "홍길동 기자",
+        "요약": f"기사 {n} 요약. 둘째 문장.",
+        "자극성": 3,
+        "연관성": 60,
+        "임베딩": np.ones(4, dtype=np.float32),
+        **kw,
+    }
+
+
+def _titles(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT title FROM newsdata ORDER BY id")
+    return [t for (t,) in cur.fetchall()]
+
+
+def test_failing_row_does_not_drop_its_chunk(db, monkeypatch, capsys):
+    monkeypatch.setattr(main, "INSERT_CHUNK", 3)
+    # 4번은 DB가 받지 못하는 값이라 청크 일괄 저장이 실패함, 6번은 행을 만들다가 실패함
+    articles = [_article(n) for n in range(8)]
+    articles[4]["발행시간"] = object()
+    del articles[6]["연관성"]
+
+    saved, failures = main._insert_rows(db, articles)
+
+    assert saved == 6
+    assert [a["제목"] for a, _ in failures] == ["기사 4", "기사 6"]
+    assert _titles(db) == [f"기사 {n}" for n in (0, 1, 2, 3, 5, 7)]
+    out = capsys.readouterr().out
+    assert "행 단위로 재시도" in out
+    assert "DB 저장 실패: 기사 4" in out
+
+
+def test_saved_rows_bump_data_version(db):
+    cur = db.cursor()
+    cur.execute("SELECT version FROM data_version WHERE name = 'newsdata'")
+    (before,) = cur.fetchone()
+
+    assert main._insert_rows(db, [_article(1), _article(2)]) == (2, [])
+    cur.execute("SELECT version, (SELECT COUNT(*) FROM newsdata) FROM data_version WHERE name = 'newsdata'")
+    assert cur.fetchone() == (before + 1, 2)
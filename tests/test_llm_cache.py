@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, cache_key, cached_chat_completion
+from openai_scheduler import RequestScheduler
+
+_REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "본문"}]}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_age_days=1, max_bytes=100)
+    yield cache
+    cache.close()
+
+
+def test_key_is_stable_and_follows_prompt_version():
+    key = cache_key("gpt-4o-mini", "summarize-v2", _REQUEST)
+    # 실행마다, dict 순서와 무관하게 같은 키 (저장된 캐시를 다음 실행에서도 씀)
+    assert key == "17b801496987680a5845fbd7a228cda2ac157f4d4a66f136e62021c08bb42524"
+    assert cache_key("gpt-4o-mini", "summarize-v2", dict(reversed(list(_REQUEST.items())))) == key
+    # 프롬프트 버전이나 모델, 입력이 바뀌면 다른 키
+    assert cache_key("gpt-4o-mini", "summarize-v3", _REQUEST) != key
+    assert cache_key("gpt-4o", "summarize-v2", _REQUEST) != key
+    assert cache_key("gpt-4o-mini", "summarize-v2", {**_REQUEST, "temperature": 0}) != key
+
+
+def test_expired_entries_are_misses_and_evicted(cache, clock):
+    cache.set("old", "오래된 응답")
+    clock.now += 3600
+    cache.set("new", "새 응답")
+    assert cache.get("old") == "오래된 응답".encode("utf-8")
+
+    clock.now += 86400 - 1800
+    assert cache.get("old") is None
+    assert cache.get("new") == "새 응답".encode("utf-8")
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.evict()
+    assert cache.stats()["entries"] == 1
+
+
+def test_size_cap_evicts_least_recently_used(cache, clock):
+    for key in "abcd":
+        cache.set(key, b"x" * 30)
+        clock.now += 1
+    # a를 다시 읽어 가장 최근에 쓴 항목으로 만듦
+    assert cache.get("a") is not None
+
+    cache.evict()
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert [k for k in "abcd" if cache.get(k) is not None] == ["a", "c", "d"]
+
+
+def test_eviction_runs_every_n_sets(cache, monkeypatch):
+    monkeypatch.setattr(llm_cache, "EVICT_EVERY", 3)
+    cache.set("a", b"x" * 60)
+    cache.set("b", b"x" * 60)
+    assert cache.stats()["bytes"] == 120
+    cache.set("c", b"x" * 10)
+    assert cache.stats()["bytes"] <= 100
+
+
+def test_prompt_version_bump_calls_api_again(cache, monkeypatch):
+    monkeypatch.setattr(llm_cache, "get_cache", lambda: cache)
+    scheduler = RequestScheduler()
+    monkeypatch.setattr(llm_cache, "get_scheduler", lambda: scheduler)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=f"응답 {len(calls)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert cached_chat_completion(client, "summarize-v2", **_REQUEST) == "응답 1"
+    assert cached_chat_completion(client, "summarize-v2", **_REQUEST) == "응답 1"
+    assert cached_chat_completion(client, "summarize-v3", **_REQUEST) == "응답 2"
+    assert len(calls) == 2
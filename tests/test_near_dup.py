@@ -0,0 +1,179 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import main
+import near_dup
+from benchmarks import fake_db
+from dedup import link_hash
+from embedding import pack_embedding
+from near_dup import DuplicateFinder, NearDuplicateIndex, load_recent, resolve_duplicates, signature, similarity
+
+# 같은 통신 기사를 다른 언론사가 옮겨 실은 경우 (바이라인, 띄어쓰기, 저작권 문구만 다름)
+WIRE = (
+    "(세종=연합뉴스) 김철수 기자 = 반도체 수출이 인공지능(AI) 서버 수요에 힘입어 석 달 연속 증가했다. "
+    "산업통상자원부가 4일 발표한 수출입 동향에 따르면 지난달 반도체 수출액은 130억 달러로 1년 전보다 12.4% 늘었다. "
+    "고대역폭메모리(HBM) 등 고부가 제품 비중이 커지면서 D램 고정거래가격도 반등했다. "
+    "정부는 올해 반도체 수출이 역대 최대치를 경신할 것으로 내다봤다. "
+    "다만 미국의 관세 정책과 중국의 자급률 상승은 하반기 변수로 꼽힌다. "
+    "업계는 설비 투자 세액공제 확대 등 추가 지원을 요구하고 있다. "
+    "한편 디스플레이와 이차전지 수출은 각각 3.1%, 8.7% 줄어 업종별 온도 차가 뚜렷했다. "
+    "산업부 관계자는 반도체 호조가 전체 수출 증가를 이끌고 있다며 수출 지원 대책을 이달 중 내놓겠다고 말했다."
+)
+COPY = (
+    "[합성경제 이영희 기자] 반도체 수출이 인공지능(AI)서버 수요에 힘입어 석달 연속 증가했다.\n"
+    "산업통상자원부가 4일 발표한 수출입동향에 따르면 지난달 반도체 수출액은 130억달러로 1년 전보다 12.4% 늘었다.\n"
+    "고대역폭메모리(HBM) 등 고부가 제품 비중이 커지면서 D램 고정거래가격도 반등했다.\n"
+    "정부는 올해 반도체 수출이 역대 최대치를 경신할 것으로 내다봤다.\n"
+    "다만 미국의 관세 정책과 중국의 자급률 상승은 하반기 변수로 꼽힌다.\n"
+    "업계는 설비 투자 세액공제 확대 등 추가 지원을 요구하고 있다.\n"
+    "한편 디스플레이와 이차전지 수출은 각각 3.1%, 8.7% 줄어 업종별 온도차가 뚜렷했다.\n"
+    "산업부 관계자는 반도체 호조가 전체 수출 증가를 이끌고 있다며 수출 지원 대책을 이달 중 내놓겠다고 말했다.\n"
+    "<저작권자 ⓒ 합성경제, 무단 전재 및 재배포 금지>"
+)
+# 같은 발표를 다룬 다른 기사 (주제와 숫자는 겹치지만 문장이 다름)
+SAME_TOPIC = (
+    "지난달 반도체 수출액이 130억 달러를 기록했다. 산업통상자원부 수출입 동향 자료를 보면 "
+    "AI 서버용 메모리 주문이 늘면서 증가세가 석 달째 이어졌다. 한 증권사 연구원은 "
+    "HBM 공급 부족이 내년 상반기까지 이어질 가능성이 높다고 분석했다. "
+    "반면 스마트폰과 PC 수요는 여전히 부진해 범용 D램 재고 조정이 끝나지 않았다는 지적도 나온다. "
+    "정부는 수출 기업 금융 지원을 확대하고 통상 리스크 대응반을 꾸리기로 했다."
+)
+OTHER = (
+    "통신 3사가 5G 중간 요금제를 다시 손본다. 과학기술정보통신부는 요금제 구간을 세분화해 "
+    "이용자 선택권을 넓히겠다고 밝혔다. 업계는 3만원대 요금제 출시를 검토하고 있으며 "
+    "데이터 제공량을 늘리는 방안도 논의 중이다. 알뜰폰 업계는 가입자 이탈을 우려하며 "
+    "도매대가 인하를 요구했다. 정부는 다음 달까지 개편안을 확정할 계획이다. "
+    "소비자 단체는 실질적인 통신비 인하 효과가 있어야 한다고 강조했다."
+)
+
+
+def _item(n, content):
+    return {"link": f"https://n.news.naver.com/mnews/article/001/{n:010d}", "title": f"기사 {n}",
+            "detail": {"content": content}}
+
+
+def test_signature_similarity_separates_copies_from_other_articles():
+    wire = signature(WIRE)
+    assert similarity(wire, signature(COPY)) >= near_dup.NEAR_DUP_THRESHOLD
+    assert similarity(wire, signature(SAME_TOPIC)) < 0.3
+    assert similarity(wire, signature(OTHER)) < 0.1
+    # 짧은 본문은 판별하지 않음
+    assert signature("반도체 수출 증가") is None
+
+
+def test_threshold_decides_partial_overlap():
+    # 끝 두 문장만 다른 기사로 바꾼 본문: 추정 유사도가 기준 아래
+    sentences = WIRE.split(". ")
+    half = ". ".join(sentences[:-2] + OTHER.split(". ")[:2])
+    sim = similarity(signature(WIRE), signature(half))
+    assert 0.5 < sim < near_dup.NEAR_DUP_THRESHOLD
+
+    strict = NearDuplicateIndex()
+    assert strict.match_or_add("wire", signature(WIRE)) is None
+    assert strict.match_or_add("half", signature(half)) is None
+
+    loose = NearDuplicateIndex(threshold=0.5)
+    loose.match_or_add("wire", signature(WIRE))
+    assert loose.match_or_add("half", signature(half)) == "wire"
+
+
+def test_first_seen_article_is_canonical():
+    finder = DuplicateFinder()
+    first = finder.check(_item(1, WIRE))
+    copy = finder.check(_item(2, COPY))
+    other = finder.check(_item(3, OTHER))
+    # 두 번째 사본도 처음 본 기사에 묶임 (사본이 대표가 되지 않음)
+    again = finder.check(_item(4, COPY + " 추가 문장."))
+    short = finder.check(_item(5, "짧은 속보"))
+
+    canonical = link_hash(_item(1, WIRE)["link"])
+    assert "duplicate_of" not in first
+    assert copy["duplicate_of"] == canonical
+    assert again["duplicate_of"] == canonical
+    assert "duplicate_of" not in other
+    assert finder.duplicates == 2
+    # 서명은 저장용으로 붙고, 짧은 본문은 그대로
+    assert bytes.fromhex(copy["minhash"]) and "minhash" not in short
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "news.sqlite3")
+    fake_db.create(path)
+    conn = fake_db.Connection(path)
+    yield conn
+    conn.close()
+
+
+def _store(conn, n, content, canonical=None, summary=None, embedding=None):
+    item = _item(n, content)
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO newsdata (press, subcategory, title, link, publish_time, summary, headline_score,
+                              relevance_score, embedding, link_hash, content_minhash, canonical_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        ("연합뉴스", "반도체", item["title"], item["link"], datetime.now(), summary, 3, 60,
+         pack_embedding(embedding) if embedding is not None else None, link_hash(item["link"]),
+         near_dup.pack_signature(signature(content)), canonical),
+    )
+    conn.commit()
+    return link_hash(item["link"])
+
+
+def test_stored_article_stays_canonical(db):
+    stored = _store(db, 1, WIRE, summary="저장된 요약", embedding=np.ones(4, dtype=np.float32))
+    finder = DuplicateFinder(db)
+    assert len(finder.index) == 1
+    assert finder.check(_item(2, COPY))["duplicate_of"] == stored
+
+    # 묶음에 든 다른 행도 대표 기사 키로 불러옴
+    _store(db, 3, COPY, canonical=stored)
+    index = NearDuplicateIndex()
+    load_recent(db, index)
+    assert index.match_or_add("new", signature(COPY + " 추가.")) == stored
+
+
+def test_resolve_duplicates_copies_canonical_results(db):
+    stored = _store(db, 1, WIRE, summary="저장된 요약", embedding=np.ones(4, dtype=np.float32))
+    done_key = link_hash(_item(10, OTHER)["link"])
+    done = {done_key: {"summary": "이번 실행 요약", "category": "통신", "headline_score": 2,
+                       "relevance_score": 70, "embedding": np.zeros(4, dtype=np.float32)}}
+    items = [
+        {**_item(2, COPY), "duplicate_of": stored},
+        {**_item(11, OTHER), "duplicate_of": done_key},
+        {**_item(20, WIRE), "duplicate_of": "아직 없는 대표 기사"},
+    ]
+    resolved, waiting = resolve_duplicates(db, items, done)
+
+    assert [a["summary"] for a in resolved] == ["저장된 요약", "이번 실행 요약"]
+    assert resolved[0]["category"] == "반도체" and resolved[0]["relevance_score"] == 60
+    assert [a["link"] for a in waiting] == [items[2]["link"]]
+
+
+def test_resolve_copies_drops_orphans_on_final(db, monkeypatch):
+    stored = _store(db, 1, WIRE, summary="저장된 요약", embedding=np.ones(4, dtype=np.float32))
+    monkeypatch.setattr(main, "connection", lambda: _Same(db))
+    waiting = [{**_item(2, COPY), "duplicate_of": stored}, {**_item(3, COPY), "duplicate_of": "없음"}]
+
+    copies = main.resolve_copies(waiting, [])
+    assert [a["link"] for a in copies] == [_item(2, COPY)["link"]]
+    assert [a["link"] for a in waiting] == [_item(3, COPY)["link"]]
+
+    assert main.resolve_copies(waiting, [], final=True) == []
+    assert waiting == []
+
+
+class _Same:
+    # connection() 대역: 테스트가 연 연결을 그대로 빌려줌
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,112 @@
+import time
+
+import openai
+import pytest
+
+from benchmarks.fake_openai import FakeOpenAI
+from openai_scheduler import CircuitBreaker, CircuitOpenError, RateBudget, RequestScheduler
+
+
+@pytest.fixture
+def fake():
+    server = FakeOpenAI()
+    server.base_url = server.start()
+    yield server
+    server.stop()
+
+
+def _client(fake, timeout=5.0):
+    return openai.OpenAI(api_key="test", base_url=fake.base_url, max_retries=0, timeout=timeout)
+
+
+def _scheduler(**kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    kwargs.setdefault("backoff_max", 5.0)
+    return RequestScheduler(**kwargs)
+
+
+def _embed(client):
+    return lambda: client.embeddings.create(model="text-embedding-3-small", input=["기사"])
+
+
+def test_retries_5xx_until_success(fake):
+    fake.inject(500, times=2)
+    fake.inject(503)
+    scheduler = _scheduler()
+
+    res = scheduler.call(_embed(_client(fake)))
+
+    assert len(res.data) == 1
+    assert fake.requests == 4
+    assert scheduler.stats()["retries"] == 3
+    assert scheduler.stats()["failures"] == 0
+
+
+def test_gives_up_after_max_retries(fake):
+    fake.inject(500, times=10)
+    scheduler = _scheduler(max_retries=2)
+
+    with pytest.raises(openai.InternalServerError):
+        scheduler.call(_embed(_client(fake)))
+
+    assert fake.requests == 3
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_honors_retry_after_on_429(fake):
+    fake.inject(429, retry_after=0.5)
+    scheduler = _scheduler()
+
+    scheduler.call(_embed(_client(fake)))
+
+    first, second = fake.request_times
+    assert second - first >= 0.5
+    assert scheduler.stats()["rate_limited"] == 1
+    # 429는 회로 실패로 세지 않음
+    assert scheduler.stats()["circuit_opens"] == 0
+
+
+def test_retries_timeouts(fake):
+    fake.inject("timeout", hang=1.0)
+    scheduler = _scheduler()
+
+    res = scheduler.call(_embed(_client(fake, timeout=0.2)))
+
+    assert len(res.data) == 1
+    assert fake.requests == 2
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_breaker_opens_and_closes(fake):
+    fake.inject(500, times=2)
+    breaker = CircuitBreaker(threshold=2, cooldown=0.3)
+    scheduler = _scheduler(breaker=breaker, max_retries=1)
+    call = _embed(_client(fake))
+
+    with pytest.raises(openai.InternalServerError):
+        scheduler.call(call)
+    assert scheduler.stats()["circuit_opens"] == 1
+
+    # 열린 동안은 서버에 보내지 않고 바로 실패
+    with pytest.raises(CircuitOpenError):
+        scheduler.call(call)
+    assert fake.requests == 2
+
+    # cooldown 뒤 시험 요청이 성공하면 닫힘
+    time.sleep(0.35)
+    scheduler.call(call)
+    scheduler.call(call)
+    assert fake.requests == 4
+
+
+def test_failed_requests_release_token_budget(fake):
+    fake.inject(500, times=2)
+    budget = RateBudget(rpm=1000, tpm=1000)
+    scheduler = _scheduler(budget=budget, max_retries=1)
+
+    with pytest.raises(openai.InternalServerError):
+        scheduler.call(_embed(_client(fake)), tokens=600)
+
+    # 두 번 뺀 600토큰이 모두 돌아왔으면 한도 전체를 기다리지 않고 바로 얻음
+    assert budget.acquire(1000) == 0.0
@@ -0,0 +1,40 @@
+import random
+import time
+
+import pytest
+
+from pipeline import Stage, run_pipeline
+
+
+def _fetch(item):
+    # 작업자마다 끝나는 순서가 뒤섞이게
+    time.sleep(random.random() * 0.01)
+    return item
+
+
+def _fail_some(item):
+    if item % 5 == 3:
+        raise ValueError(item)
+    return item
+
+
+def test_ordered_stage_sees_input_order():
+    seen = []
+    stages = [
+        Stage("fetch", _fetch, 8),
+        Stage("fail", _fail_some, 4),
+        Stage("dedup", lambda item: seen.append(item) or item, ordered=True),
+    ]
+    errors = []
+    results = list(run_pipeline(range(60), stages, on_error=lambda name, item, e: errors.append(item)))
+
+    expected = [i for i in range(60) if i % 5 != 3]
+    # 앞 단계에서 빠진 항목은 건너뛰고 입력 순서대로 처리
+    assert seen == expected
+    assert results == expected
+    assert len(errors) == 12
+
+
+def test_ordered_stage_needs_single_worker():
+    with pytest.raises(ValueError):
+        Stage("dedup", lambda item: item, 2, ordered=True)
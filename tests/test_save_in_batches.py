@@ -0,0 +1,43 @@
+import main
+
+
+class _Journal:
+    def __init__(self):
+        self.saved = []
+
+    def mark_saved(self, links):
+        self.saved.extend(links)
+
+
+def _run(monkeypatch, items):
+    batches = []
+
+    def score(buffer):
+        batches.append(len(buffer))
+        return buffer
+
+    monkeypatch.setattr(main, "gpt_relevance_scores", score)
+    monkeypatch.setattr(main, "build_article", lambda a: {"URL": a["link"]})
+    monkeypatch.setattr(main, "insert_to_db", lambda articles: (len(articles), []))
+    journal = _Journal()
+    saved, failures = main.save_in_batches(iter(items), journal)
+    return batches, saved, journal
+
+
+def _items(n):
+    return [{"link": f"https://example.com/{i}", "title": f"기사 {i}"} for i in range(n)]
+
+
+def test_flushes_when_embedding_batch_is_full(monkeypatch):
+    batches, saved, journal = _run(monkeypatch, _items(40))
+    # 기사 17건 = 임베딩 텍스트 51개
+    assert batches == [17, 17, 6]
+    assert saved == 40
+    assert len(journal.saved) == 40
+
+
+def test_flushes_after_flush_seconds(monkeypatch):
+    monkeypatch.setattr(main, "FLUSH_SECONDS", 0)
+    batches, saved, _ = _run(monkeypatch, _items(3))
+    assert batches == [1, 1, 1]
+    assert saved == 3
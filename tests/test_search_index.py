@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+
+from app.search_index import SearchIndex
+from benchmarks import fake_db
+
+
+def _index(path):
+    @contextmanager
+    def get_db_connection():
+        conn = fake_db.Connection(str(path))
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    return SearchIndex(get_db_connection, refresh_interval=0)
+
+
+def _insert(path, link_hash, title, summary, subcategory="모바일"):
+    conn = fake_db.Connection(str(path))
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO newsdata (press, subcategory, title, link, publish_time, journalist, summary, link_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE summary = VALUES(summary), subcategory = VALUES(subcategory)
+        """,
+        ("연합뉴스", subcategory, title, f"https://example.com/{link_hash}", "2025-01-01 00:00:00",
+         "홍길동 기자", summary, link_hash),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _ids(path, *link_hashes):
+    conn = fake_db.Connection(str(path))
+    cur = conn.cursor()
+    placeholders = ", ".join(["%s"] * len(link_hashes))
+    cur.execute(f"SELECT id FROM newsdata WHERE link_hash IN ({placeholders}) ORDER BY id", link_hashes)
+    ids = [row[0] for row in cur.fetchall()]
+    conn.close()
+    return ids
+
+
+def test_refresh_picks_up_rows_changed_by_upsert(tmp_path):
+    path = tmp_path / "news.sqlite3"
+    fake_db.create(str(path))
+    _insert(path, "a", "반도체 기사", "메모리 가격 상승")
+    _insert(path, "b", "통신 기사", "요금제 개편")
+    index = _index(path)
+    assert [doc_id for _, doc_id in index.search("summary", "메모리")] == [1]
+
+    # 같은 링크 다시 저장 → 요약/카테고리만 바뀜 (id 그대로)
+    _insert(path, "a", "반도체 기사", "파운드리 수주 확대", subcategory="컴퓨터")
+    _insert(path, "c", "보안 기사", "파운드리 해킹 시도")
+    index.refresh(force=True)
+
+    assert index.search("summary", "메모리") == []
+    assert sorted(doc_id for _, doc_id in index.search("summary", "파운드리")) == _ids(path, "a", "c")
+    assert [doc_id for _, doc_id in index.search("summary", "파운드리", "컴퓨터")] == [1]
+    # 다시 읽어도 같은 결과 (게시 목록에 id가 중복으로 들어가지 않음)
+    index.refresh(force=True)
+    assert sorted(doc_id for _, doc_id in index.search("title", "기사")) == _ids(path, "a", "b", "c")
@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import summary
+from benchmarks import fake_db
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "news.sqlite3")
+    fake_db.create(path)
+
+    @contextmanager
+    def connection():
+        conn = fake_db.Connection(path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    monkeypatch.setattr(summary, "connection", connection)
+    monkeypatch.setattr(summary, "gpt_section", lambda exemplars: {"title": exemplars[0], "points": exemplars})
+    monkeypatch.setattr(summary, "gpt_overview", lambda topics: "오늘 개요")
+    monkeypatch.setenv("METRICS_REPORT", str(tmp_path / "report.json"))
+    return connection
+
+
+def _insert(connection, doc_id, publish_time, topic):
+    vec = np.zeros(8, dtype=np.float32)
+    vec[topic] = 1
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO newsdata (id, press, subcategory, title, link, publish_time, journalist, summary,
+                                  embedding, link_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (doc_id, "연합뉴스", "모바일", f"기사 {doc_id}", f"https://example.com/{doc_id}", publish_time,
+             "홍길동 기자", f"주제 {topic} 요약 {doc_id}.", vec.tobytes(), f"{doc_id:040x}"),
+        )
+        conn.commit()
+
+
+def _total(connection, day_str):
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT SUM(article_count) FROM summary_clusters WHERE summary_date = %s", (day_str,))
+        return cur.fetchone()[0]
+
+
+def test_picks_up_rows_with_smaller_ids_and_skips_overlap(db):
+    # 지난 날짜 상태는 정리되므로 오늘 기준
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    today, tomorrow = day.strftime("%Y-%m-%d"), (day + timedelta(days=1)).strftime("%Y-%m-%d")
+    _insert(db, 9000, f"{today} 09:00:00", 0)
+    _insert(db, 9001, f"{today} 09:10:00", 1)
+    # 다른 날 기사는 범위 밖
+    _insert(db, 9002, f"{tomorrow} 00:00:00", 1)
+    assert summary.run_incremental(day)
+    assert _total(db, today) == 2
+
+    # id가 더 작은 기사가 나중에 들어옴 (TiDB 자동 증가 id는 순서가 보장되지 않음)
+    _insert(db, 10, f"{today} 10:00:00", 0)
+    assert summary.run_incremental(day)
+    # 겹침 구간에서 다시 읽은 9000/9001은 세지 않음
+    assert _total(db, today) == 3
+
+    # 새 기사가 없으면 다시 만들지 않음
+    assert not summary.run_incremental(day)
+    assert _total(db, today) == 3
+
+
+def test_load_rows_uses_publish_time_range(db):
+    _insert(db, 1, "2025-03-01 00:00:00", 0)
+    _insert(db, 2, "2025-03-01 23:59:59", 1)
+    _insert(db, 3, "2025-03-02 00:00:00", 1)
+    with db() as conn:
+        cur = conn.cursor()
+        assert sorted(row[0] for row in summary.load_rows(cur, "2025-03-01")) == [1, 2]
@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+import token_budget
+from token_budget import BudgetStats, count_tokens, plan_chunks, split_chunks
+
+_SENTENCES = [
+    "반도체 수출이 인공지능 서버 수요에 힘입어 석 달 연속 증가했다.",
+    "산업통상자원부는 지난달 반도체 수출액이 130억 달러로 1년 전보다 12.4% 늘었다고 밝혔다.",
+    "고대역폭메모리 등 고부가 제품 비중이 커진 덕분일까?",
+    "업계는 설비 투자 세액공제 확대를 요구하고 있다!",
+    "Exports of chips rose for a third month as AI server demand grew.",
+]
+ARTICLE = "\n\n".join(" ".join(_SENTENCES[(i + j) % 5] for j in range(3)) for i in range(40))
+# 문장부호 없이 긴 문장 (표/목록을 붙여 넣은 본문 등)
+RUN_ON = "가나다라마바사 " * 400
+
+
+def _squash(text):
+    return re.sub(r"\s+", "", text)
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(token_budget, "stats", BudgetStats())
+    monkeypatch.setitem(token_budget.BUDGETS, "summarize", 300)
+    monkeypatch.setattr(token_budget, "CHUNK_TOKENS", 200)
+    return token_budget.stats
+
+
+@pytest.mark.parametrize("max_tokens", [30, 200, 1000])
+def test_chunks_stay_under_budget_and_keep_all_text(max_tokens):
+    for text in (ARTICLE, RUN_ON, ARTICLE + " " + RUN_ON + " " + ARTICLE):
+        chunks = split_chunks(text, max_tokens)
+        assert chunks and all(count_tokens(c) <= max_tokens for c in chunks)
+        # 공백만 다르고 빠지거나 겹친 글자가 없음
+        assert _squash("".join(chunks)) == _squash(text)
+
+
+def test_chunks_split_on_sentence_boundaries():
+    chunks = split_chunks(ARTICLE, 200)
+    assert len(chunks) > 1
+    sentences = set(_SENTENCES)
+    for chunk in chunks:
+        # 조각마다 온전한 문장으로만 이루어짐
+        parts = re.split(r"(?<=[.?!])\s+", chunk)
+        assert all(p in sentences for p in parts), chunk
+
+
+def test_long_sentence_is_cut_only_when_needed():
+    chunks = split_chunks(RUN_ON, 200)
+    assert len(chunks) > 1
+    assert split_chunks(_SENTENCES[0], 200) == [_SENTENCES[0]]
+    assert split_chunks("   ", 200) == []
+
+
+def test_short_text_is_sent_whole(budget):
+    assert plan_chunks("summarize", " ".join(_SENTENCES)) is None
+    tokens = count_tokens(" ".join(_SENTENCES))
+    assert budget.snapshot()["summarize"] == {
+        "calls": 1, "original": tokens, "sent": tokens, "truncated": 0, "chunked": 0,
+    }
+
+
+def test_long_text_is_planned_in_chunks(budget):
+    chunks = plan_chunks("summarize", ARTICLE)
+    assert len(chunks) > 1 and all(count_tokens(c) <= 200 for c in chunks)
+    assert _squash("".join(chunks)) == _squash(ARTICLE)
+    entry = budget.snapshot()["summarize"]
+    assert entry["chunked"] == 1 and entry["original"] == count_tokens(ARTICLE)
+    assert entry["sent"] == sum(count_tokens(c) for c in chunks)
@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+
+import os
+
+import numpy as np
+
+from app import vector_index
+from app.vector_index import CURRENT, VectorIndex, reduce_vectors
+from benchmarks import fake_db
+
+
+def _connect(path):
+    @contextmanager
+    def get_db_connection():
+        conn = fake_db.Connection(str(path))
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    return get_db_connection
+
+
+def _vectors(path):
+    conn = fake_db.Connection(str(path))
+    cur = conn.cursor()
+    cur.execute("SELECT id, subcategory, embedding FROM newsdata ORDER BY id")
+    rows = [(doc_id, category, np.frombuffer(blob, dtype="<f4")) for doc_id, category, blob in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+def test_category_search_fills_k_from_that_category(tmp_path):
+    path = tmp_path / "news.sqlite3"
+    fake_db.create(str(path))
+    fake_db.seed_articles(str(path), 200, ["모바일", "반도체", "통신"], days=1, dim=64)
+    rows = _vectors(path)
+    index = VectorIndex(str(tmp_path / "index"), _connect(path), dims=64, refresh_interval=3600)
+    index.refresh()
+
+    query = rows[0][2]
+    hits = index.search(query, k=20, category="반도체")
+    by_id = {doc_id: category for doc_id, category, _ in rows}
+    assert len(hits) == 20
+    assert all(by_id[doc_id] == "반도체" for doc_id, _ in hits)
+
+    # 카테고리 안에서 브루트포스로 구한 순서와 같음
+    expected = sorted(
+        ((float(reduce_vectors(vec, 64) @ reduce_vectors(query, 64)), doc_id)
+         for doc_id, category, vec in rows if category == "반도체"),
+        reverse=True,
+    )[:20]
+    assert [doc_id for doc_id, _ in hits] == [doc_id for _, doc_id in expected]
+    assert index.search(query, k=5, category="없는 카테고리") == []
+
+
+def test_refresh_replaces_changed_embeddings(tmp_path):
+    path = tmp_path / "news.sqlite3"
+    fake_db.create(str(path))
+    fake_db.seed_articles(str(path), 50, ["모바일", "반도체"], days=1, dim=64)
+    index = VectorIndex(str(tmp_path / "index"), _connect(path), dims=64, refresh_interval=3600)
+    index.refresh()
+    assert len(index) == 50
+
+    # 요약 임베딩을 다시 계산하고 카테고리도 바꾼 기사 (summary.py --reembed, upsert)
+    target = np.zeros(64, dtype=np.float32)
+    target[0] = 1
+    conn = fake_db.Connection(str(path))
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE newsdata SET embedding = %s, subcategory = %s WHERE id = 7",
+        (target.astype("<f4").tobytes(), "통신"),
+    )
+    conn.commit()
+    conn.close()
+    index.refresh()
+
+    assert len(index) == 50
+    assert index.search(target, k=1, category="통신") == [(7, 1.0)]
+    assert 7 not in {doc_id for doc_id, _ in index.search(target, k=50, category="모바일")}
+
+    # 다른 워커(새 인스턴스)는 파일에서 그대로 읽음
+    other = VectorIndex(str(tmp_path / "index"), _connect(path), dims=64, refresh_interval=3600)
+    assert other.search(target, k=1, category="통신") == [(7, 1.0)]
+
+
+def test_ivf_search_finds_each_article(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "IVF_MIN_ROWS", 100)
+    monkeypatch.setattr(vector_index, "IVF_LISTS", 8)
+    monkeypatch.setattr(vector_index, "IVF_PROBES", 2)
+    path = tmp_path / "news.sqlite3"
+    fake_db.create(str(path))
+    fake_db.seed_articles(str(path), 300, ["모바일", "반도체", "통신"], days=1, dim=64)
+    rows = _vectors(path)
+    index = VectorIndex(str(tmp_path / "index"), _connect(path), dims=64, refresh_interval=3600)
+    index.refresh()
+    assert len(index._centroids) == 8
+
+    # 기사 벡터로 찾으면 그 기사가 속한 목록을 반드시 읽으므로 자기 자신이 1위
+    for doc_id, category, vec in rows[::10]:
+        assert index.search(vec, k=1)[0][0] == doc_id
+        assert index.search(vec, k=1, category=category)[0][0] == doc_id
+
+    # 바뀐 행은 기존 중심에 다시 배정
+    target = reduce_vectors(rows[0][2] + rows[1][2], 64)
+    conn = fake_db.Connection(str(path))
+    cur = conn.cursor()
+    cur.execute("UPDATE newsdata SET embedding = %s WHERE id = %s", (target.astype("<f4").tobytes(), rows[5][0]))
+    conn.commit()
+    conn.close()
+    centroids = np.array(index._centroids)
+    index.refresh()
+    assert np.array_equal(index._centroids, centroids)
+    assert index.search(target, k=1)[0] == (rows[5][0], 1.0)
+
+
+def test_load_skips_inconsistent_version(tmp_path):
+    path = tmp_path / "news.sqlite3"
+    fake_db.create(str(path))
+    fake_db.seed_articles(str(path), 50, ["모바일", "반도체"], days=1, dim=64)
+    index = VectorIndex(str(tmp_path / "index"), _connect(path), dims=64, refresh_interval=3600)
+    index.refresh()
+    query = _vectors(path)[0][2]
+    before = index.search(query, k=3)
+
+    # 행 수가 맞지 않는 버전을 가리키면 읽지 않고 지금 색인을 계속 씀
+    directory = tmp_path / "index"
+    broken = directory / "vbroken"
+    os.makedirs(broken)
+    current = directory / (open(directory / CURRENT).read())
+    for name in ("meta.json", "offsets.npy", "centroids.npy", "ids.npy"):
+        (broken / name).write_bytes((current / name).read_bytes())
+    np.save(broken / "vectors.npy", np.zeros((49, 64), dtype=np.float32))
+    (directory / CURRENT).write_text("vbroken")
+    index._load()
+    assert index.search(query, k=3) == before
+
+    other = VectorIndex(str(directory), _connect(path), dims=64, refresh_interval=3600)
+    assert len(other) == 0
+
+
+def test_refresh_keeps_only_current_and_previous_versions(tmp_path):
+    path = tmp_path / "news.sqlite3"
+    fake_db.create(str(path))
+    fake_db.seed_articles(str(path), 20, ["모바일"], days=1, dim=64)
+    index = VectorIndex(str(tmp_path / "index"), _connect(path), dims=64, refresh_interval=3600)
+    for i in range(3):
+        conn = fake_db.Connection(str(path))
+        cur = conn.cursor()
+        cur.execute("UPDATE newsdata SET subcategory = %s WHERE id = 1", (f"카테고리 {i}",))
+        conn.commit()
+        conn.close()
+        index.refresh()
+    versions = [name for name in os.listdir(tmp_path / "index") if name.startswith("v")]
+    assert len(versions) == 2
+    assert open(tmp_path / "index" / CURRENT).read() in versions
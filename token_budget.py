@@ -0,0 +1,134 @@
+import os
+import re
+import threading
+from embedding import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # 없으면 embedding.estimate_tokens의 보수적인 추정치 사용
+    tiktoken = None
+
+# 호출 종류별 기사 본문 토큰 상한
+# - summarize/analyze: 넘으면 조각별 요약(map) 후 합쳐서 한 번 더 요약(reduce)
+# - evaluate: 제목 자극성 평가는 앞부분(리드 문단)만 봄
+BUDGETS = {
+    "summarize": int(os.getenv("SUMMARIZE_MAX_TOKENS", 3000)),
+    "analyze": int(os.getenv("ANALYZE_MAX_TOKENS", 3000)),
+    "evaluate": int(os.getenv("EVALUATE_MAX_TOKENS", 400)),
+}
+# 긴 기사를 나누는 조각 크기 / 조각 요약 동시 요청 수
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 2000))
+CHUNK_WORKERS = 4
+
+# 문장 경계 (마침표/물음표/느낌표 뒤 공백)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.?!])\s+")
+
+_encoding = None
+
+
+def count_tokens(text):
+    global _encoding
+    if tiktoken is None:
+        return estimate_tokens(text)
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("o200k_base")
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def _sentences(text):
+    return [s for s in _SENTENCE_SPLIT.split(text.strip()) if s]
+
+
+# 문장 하나가 max_tokens보다 길면 글자 수 기준으로 자름
+def _split_long(sentence, max_tokens):
+    pieces = []
+    while count_tokens(sentence) > max_tokens:
+        lo, hi = 1, len(sentence)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if count_tokens(sentence[:mid]) <= max_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        pieces.append(sentence[:lo])
+        sentence = sentence[lo:]
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+# 문장 단위로 max_tokens 이하 조각들로 나누기
+def split_chunks(text, max_tokens=CHUNK_TOKENS):
+    chunks, current, current_tokens = [], [], 0
+    for sentence in _sentences(text):
+        for piece in _split_long(sentence, max_tokens):
+            tokens = count_tokens(piece) + 1
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+# 앞에서부터 max_tokens를 넘지 않는 문장까지 (리드 문단)
+def lead(text, max_tokens):
+    chunks = split_chunks(text, max_tokens)
+    return chunks[0] if chunks else ""
+
+
+class BudgetStats:
+    # 호출 종류별 원래 본문 토큰 / 실제로 보낸 토큰 / 앞부분만 보낸 기사, 나눠 요약한 기사 수
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, kind, original, sent, mode=None):
+        with self._lock:
+            entry = self._data.setdefault(
+                kind, {"calls": 0, "original": 0, "sent": 0, "truncated": 0, "chunked": 0}
+            )
+            entry["calls"] += 1
+            entry["original"] += original
+            entry["sent"] += sent
+            if mode:
+                entry[mode] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {kind: dict(entry) for kind, entry in self._data.items()}
+
+
+stats = BudgetStats()
+
+
+# 상한 안이면 그대로, 넘으면 앞부분만 (evaluate용)
+def fit_lead(kind, text):
+    original = count_tokens(text)
+    if original <= BUDGETS[kind]:
+        stats.record(kind, original, original)
+        return text
+    text = lead(text, BUDGETS[kind])
+    stats.record(kind, original, count_tokens(text), "truncated")
+    return text
+
+
+# 상한 안이면 None, 넘으면 조각 목록 (summarize/analyze용, 보낸 토큰은 조각 합계로 기록)
+def plan_chunks(kind, text):
+    original = count_tokens(text)
+    if original <= BUDGETS[kind]:
+        stats.record(kind, original, original)
+        return None
+    chunks = split_chunks(text, CHUNK_TOKENS)
+    stats.record(kind, original, sum(count_tokens(c) for c in chunks), "chunked")
+    return chunks
+
+
+def print_budget_stats():
+    for kind, s in sorted(stats.snapshot().items()):
+        print(
+            f"본문 토큰 ({kind}): {s['calls']}건, 원문 {s['original']} → 전송 {s['sent']}"
+            f" (앞부분만 {s['truncated']}건, 나눠 요약 {s['chunked']}건)"
+        )